@@ -2,12 +2,20 @@
  * TAS-2: Table sorting functionality using REST API
  */
 
-function initTableSorting(tableId, apiUrl) {
+// Per table: embedded sort data and the active sort (shared with live updates)
+const tableStates = new Map();
+
+function initTableSorting(tableId, apiUrl, dataId) {
     const table = document.getElementById(tableId);
     if (!table) return;
     
+    // Sort data embedded by the server (json_script) - absent for large tables
+    const dataElement = dataId ? document.getElementById(dataId) : null;
+    const sortData = dataElement ? JSON.parse(dataElement.textContent) : null;
+    
     const headers = table.querySelectorAll('th.sortable');
-    let currentSort = { field: null, order: 'asc' };
+    const currentSort = { field: null, order: 'asc' };
+    tableStates.set(tableId, { sortData: sortData, currentSort: currentSort, pager: null });
     
     headers.forEach(header => {
         header.addEventListener('click', function() {
@@ -24,8 +32,12 @@ function initTableSorting(tableId, apiUrl) {
             // Update sort icons
             updateSortIcons(table, sortField, currentSort.order);
             
-            // Fetch sorted data from API
-            fetchSortedData(table, apiUrl, sortField, currentSort.order);
+            if (sortData) {
+                sortRowsInMemory(table, sortData, sortField, currentSort.order);
+            } else {
+                // Fetch sorted data from API
+                fetchSortedData(table, apiUrl, sortField, currentSort.order);
+            }
         });
     });
 }
@@ -43,35 +55,145 @@ function updateSortIcons(table, activeField, order) {
     });
 }
 
-async function fetchSortedData(table, apiUrl, sortBy, sortOrder) {
+/**
+ * Comparator matching the API ordering (SORT_FIELD_MAP + id tie-breaker):
+ * NULL sorts first ascending / last descending (SQLite), strings compare
+ * by code point like SQLite's BINARY collation, dates are ISO strings.
+ */
+function compareSortValues(a, b) {
+    if (a === b) return 0;
+    if (a === null) return -1;
+    if (b === null) return 1;
+    return a < b ? -1 : 1;
+}
+
+function sortRowsInMemory(table, sortData, sortBy, sortOrder) {
+    const column = sortData.fields.indexOf(sortBy);
+    const idColumn = sortData.fields.indexOf('id');
+    if (column === -1) return;
+    
+    const direction = sortOrder === 'desc' ? -1 : 1;
+    sortData.rows.sort((a, b) =>
+        direction * (compareSortValues(a[column], b[column]) || compareSortValues(a[idColumn], b[idColumn]))
+    );
+    
+    // Reorder the server-rendered rows (keeps translations and links intact)
+    const tbody = table.querySelector('tbody');
+    const rowsById = new Map();
+    tbody.querySelectorAll('tr[data-task-id]').forEach(row => {
+        rowsById.set(String(row.dataset.taskId), row);
+    });
+    const fragment = document.createDocumentFragment();
+    sortData.rows.forEach(row => {
+        const tr = rowsById.get(String(row[idColumn]));
+        if (tr) fragment.appendChild(tr);
+    });
+    tbody.appendChild(fragment);
+}
+
+// Conditional GET: ETag of every page already fetched, sent back as If-None-Match
+const responseCache = new Map();
+
+async function fetchWithValidators(url) {
+    const cached = responseCache.get(url);
+    const headers = { 'X-Requested-With': 'XMLHttpRequest' };
+    if (cached) {
+        headers['If-None-Match'] = cached.etag;
+    }
+    
+    const response = await fetch(url, {
+        headers: headers,
+        credentials: 'same-origin',
+        cache: 'no-store'
+    });
+    
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+    if (!response.ok) {
+        throw new Error('Network response was not ok');
+    }
+    
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) {
+        responseCache.set(url, { etag: etag, data: data });
+    }
+    return data;
+}
+
+/**
+ * Sorted table without embedded data: only the first page comes from the API,
+ * the next ones (keyset cursors) when the end of the table scrolls into view,
+ * like initLazyTable. Sorting again restarts paging.
+ */
+function fetchSortedData(table, apiUrl, sortBy, sortOrder) {
+    const state = tableStates.get(table.id);
+    if (!state.pager) {
+        state.pager = createTablePager(table);
+    }
+    const pager = state.pager;
+    pager.url = `${apiUrl}?sort_by=${sortBy}&sort_order=${sortOrder}`;
+    pager.cursor = null;
+    pager.done = false;
+    pager.generation += 1;
+    return loadSortedPage(table, pager);
+}
+
+function createTablePager(table) {
+    // generation changes with the sort - responses for an older sort are dropped
+    const pager = { url: null, cursor: null, done: true, generation: 0, loading: null };
+    pager.sentinel = document.createElement('p');
+    pager.sentinel.className = 'lazy-sentinel';
+    table.after(pager.sentinel);
+    pager.observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadSortedPage(table, pager);
+        }
+    });
+    return pager;
+}
+
+async function loadSortedPage(table, pager) {
+    if (pager.done || pager.loading === pager.generation) return;
+    const generation = pager.generation;
+    const firstPage = !pager.cursor;
     const tbody = table.querySelector('tbody');
+    pager.loading = generation;
     tbody.classList.add('loading');
+    pager.sentinel.textContent = table.dataset.labelLoading || 'Loading...';
     
     try {
-        const url = `${apiUrl}?sort_by=${sortBy}&sort_order=${sortOrder}`;
-        const response = await fetch(url, {
-            headers: {
-                'X-Requested-With': 'XMLHttpRequest',
-            },
-            credentials: 'same-origin'
-        });
-        
-        if (!response.ok) {
-            throw new Error('Network response was not ok');
+        let url = pager.url;
+        if (pager.cursor) {
+            url += `&cursor=${encodeURIComponent(pager.cursor)}`;
         }
-        
-        const data = await response.json();
+        const data = await fetchWithValidators(url);
+        if (generation !== pager.generation) return;
         
         // Determine if this is completed or uncompleted table
         const isCompleted = table.id === 'completed-tasks-table';
-        
-        // Update table with new data
-        updateTableBody(tbody, data.tasks, isCompleted);
-        
+        if (firstPage) {
+            updateTableBody(tbody, data.tasks, isCompleted);
+        } else {
+            appendTaskRows(tbody, data.tasks, isCompleted);
+        }
+        pager.cursor = data.next_cursor;
+        pager.done = !data.next_cursor;
     } catch (error) {
         console.error('Error fetching sorted data:', error);
     } finally {
-        tbody.classList.remove('loading');
+        if (pager.loading === generation) {
+            pager.loading = null;
+            tbody.classList.remove('loading');
+            pager.sentinel.textContent = '';
+        }
+    }
+    
+    // Short page: the sentinel may still be visible - observe again for a fresh callback
+    pager.observer.unobserve(pager.sentinel);
+    if (!pager.done) {
+        pager.observer.observe(pager.sentinel);
     }
 }
 
@@ -82,33 +204,147 @@ function updateTableBody(tbody, tasks, isCompleted) {
         return;
     }
     
-    tbody.innerHTML = tasks.map(task => {
-        const completionDate = task.completion_date ? task.completion_date : '-';
+    tbody.innerHTML = tasks.map(task => renderTaskRow(task, isCompleted)).join('');
+}
+
+/**
+ * Lazily loaded table (completed tasks): collapsed by default, pages come
+ * from the sorting API (keyset cursors) when the section is opened and
+ * whenever the end of the table scrolls into view. Sorting restarts paging.
+ */
+function initLazyTable(sectionId, tableId, apiUrl) {
+    const section = document.getElementById(sectionId);
+    const table = document.getElementById(tableId);
+    if (!section || !table) return;
+    
+    const tbody = table.querySelector('tbody');
+    const sentinel = section.querySelector('.lazy-sentinel');
+    const labels = section.dataset;
+    // generation changes with the sort - responses for an older sort are dropped
+    const state = { field: null, order: 'desc', cursor: null, done: false, generation: 0, loading: null };
+    
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadPage();
+        }
+    });
+    
+    async function loadPage() {
+        if (!section.open || state.done || state.loading === state.generation) return;
+        const generation = state.generation;
+        state.loading = generation;
+        sentinel.textContent = labels.labelLoading || 'Loading...';
         
-        // Build action buttons based on completion status
-        let actionButtons = `
-            <a href="/task/${task.id}/" class="btn btn-small btn-secondary">Details</a>
-            <a href="/task/${task.id}/edit/" class="btn btn-small">Edit</a>
-            <a href="/task/${task.id}/delete/" class="btn btn-small btn-danger">Delete</a>
-        `;
+        try {
+            let url = `${apiUrl}?sort_order=${state.order}`;
+            if (state.field) {
+                url += `&sort_by=${state.field}`;
+            }
+            if (state.cursor) {
+                url += `&cursor=${encodeURIComponent(state.cursor)}`;
+            }
+            const data = await fetchWithValidators(url);
+            if (generation !== state.generation) return;
+            
+            appendTaskRows(tbody, data.tasks, true);
+            state.cursor = data.next_cursor;
+            state.done = !data.next_cursor;
+            if (state.done && !tbody.querySelector('tr')) {
+                const emptyText = escapeHtml(labels.labelEmpty || 'No completed tasks.');
+                tbody.innerHTML = `<tr><td colspan="6">${emptyText}</td></tr>`;
+            }
+        } catch (error) {
+            console.error('Error loading tasks:', error);
+        } finally {
+            if (state.loading === generation) {
+                state.loading = null;
+                sentinel.textContent = '';
+            }
+        }
         
-        if (isCompleted) {
-            actionButtons += `<a href="/task/${task.id}/restore/" class="btn btn-small btn-warning">Restore</a>`;
+        // Short page: the sentinel may still be visible - observe again for a fresh callback
+        observer.unobserve(sentinel);
+        observer.observe(sentinel);
+    }
+    
+    section.addEventListener('toggle', () => {
+        if (section.open) {
+            observer.observe(sentinel);
         } else {
-            actionButtons += `<a href="/task/${task.id}/complete/" class="btn btn-small btn-success">Complete</a>`;
+            observer.unobserve(sentinel);
         }
-        
-        return `
-            <tr data-task-id="${task.id}">
-                <td>${task.id}</td>
-                <td>${escapeHtml(task.title)}</td>
-                <td>${task.date_added}</td>
-                <td>${escapeHtml(task.priority.name)}</td>
-                <td>${completionDate}</td>
-                <td>${actionButtons}</td>
-            </tr>
-        `;
-    }).join('');
+    });
+    
+    table.querySelectorAll('th.sortable').forEach(header => {
+        header.addEventListener('click', function() {
+            const sortField = this.dataset.sort;
+            state.order = state.field === sortField && state.order === 'asc' ? 'desc' : 'asc';
+            state.field = sortField;
+            state.cursor = null;
+            state.done = false;
+            state.generation += 1;
+            updateSortIcons(table, sortField, state.order);
+            tbody.innerHTML = '';
+            loadPage();
+        });
+    });
+}
+
+function appendTaskRows(tbody, tasks, isCompleted) {
+    const template = document.createElement('template');
+    // Skip rows already inserted by a live update
+    template.innerHTML = tasks
+        .filter(task => !tbody.querySelector(`tr[data-task-id="${task.id}"]`))
+        .map(task => renderTaskRow(task, isCompleted))
+        .join('');
+    tbody.querySelectorAll('tr:not([data-task-id])').forEach(placeholder => placeholder.remove());
+    tbody.appendChild(template.content);
+}
+
+/**
+ * Button labels: translated ones from the live-update config element
+ * (rendered by the template), English otherwise.
+ */
+function rowLabels() {
+    const config = document.getElementById('task-live');
+    const data = config ? config.dataset : {};
+    return {
+        details: data.labelDetails || 'Details',
+        edit: data.labelEdit || 'Edit',
+        delete: data.labelDelete || 'Delete',
+        complete: data.labelComplete || 'Complete',
+        restore: data.labelRestore || 'Restore'
+    };
+}
+
+function renderActionButtons(taskId, isCompleted) {
+    const labels = rowLabels();
+    let actionButtons = `
+        <a href="/task/${taskId}/" class="btn btn-small btn-secondary">${escapeHtml(labels.details)}</a>
+        <a href="/task/${taskId}/edit/" class="btn btn-small">${escapeHtml(labels.edit)}</a>
+        <a href="/task/${taskId}/delete/" class="btn btn-small btn-danger">${escapeHtml(labels.delete)}</a>
+    `;
+    
+    if (isCompleted) {
+        actionButtons += `<a href="/task/${taskId}/restore/" class="btn btn-small btn-warning">${escapeHtml(labels.restore)}</a>`;
+    } else {
+        actionButtons += `<a href="/task/${taskId}/complete/" class="btn btn-small btn-success">${escapeHtml(labels.complete)}</a>`;
+    }
+    return actionButtons;
+}
+
+function renderTaskRow(task, isCompleted) {
+    const completionDate = task.completion_date ? task.completion_date : '-';
+    return `
+        <tr data-task-id="${task.id}">
+            <td>${task.id}</td>
+            <td>${escapeHtml(task.title)}</td>
+            <td>${task.date_added}</td>
+            <td>${escapeHtml(task.priority.name)}</td>
+            <td>${completionDate}</td>
+            <td>${renderActionButtons(task.id, isCompleted)}</td>
+        </tr>
+    `;
 }
 
 function escapeHtml(text) {
@@ -116,3 +352,143 @@ function escapeHtml(text) {
     div.textContent = text;
     return div.innerHTML;
 }
+
+/**
+ * Live updates (Server-Sent Events): completes, restores, deletes and form
+ * saves made by other users are applied to the tables in place, without
+ * reloading the page. Events carry only what changed (see tasks/events.py).
+ */
+const LIVE_TABLES = { open: 'uncompleted-tasks-table', done: 'completed-tasks-table' };
+
+function initLiveUpdates(configId) {
+    const config = document.getElementById(configId);
+    if (!config || !window.EventSource) return;
+    
+    // EventSource reconnects by itself and resumes with Last-Event-ID
+    const source = new EventSource(config.dataset.eventsUrl);
+    source.onmessage = function(message) {
+        applyTaskEvent(JSON.parse(message.data));
+    };
+}
+
+function applyTaskEvent(event) {
+    switch (event.type) {
+        case 'complete':
+            event.ids.forEach(id => moveTaskRow(id, LIVE_TABLES.open, LIVE_TABLES.done, event.completion_date));
+            break;
+        case 'restore':
+            // Rows come with the event: the completed table is loaded lazily,
+            // so the restored task may have no row on this page yet
+            event.tasks.forEach(task => upsertTaskRow(task));
+            break;
+        case 'delete':
+            event.ids.forEach(id => removeTaskRow(id));
+            break;
+        case 'save':
+            upsertTaskRow(event.task);
+            break;
+        case 'reset':
+            // Missed events (reconnect after a long break, server restart)
+            window.location.reload();
+            break;
+    }
+}
+
+function findTaskRow(tableId, taskId) {
+    const table = document.getElementById(tableId);
+    return table ? table.querySelector(`tbody tr[data-task-id="${taskId}"]`) : null;
+}
+
+function moveTaskRow(taskId, fromId, toId, completionDate) {
+    const row = findTaskRow(fromId, taskId);
+    if (!row) return;  // not on this page (e.g. table sorted through the API)
+    
+    row.cells[4].textContent = completionDate || '-';
+    row.cells[5].innerHTML = renderActionButtons(taskId, completionDate !== null);
+    
+    const values = takeSortRow(fromId, taskId);
+    if (values) {
+        values.completion_date = completionDate;
+    }
+    insertTaskRow(toId, row, values);
+}
+
+function removeTaskRow(taskId) {
+    Object.values(LIVE_TABLES).forEach(tableId => {
+        const row = findTaskRow(tableId, taskId);
+        if (row) {
+            row.remove();
+            takeSortRow(tableId, taskId);
+        }
+    });
+}
+
+function upsertTaskRow(task) {
+    const tableId = task.completion_date ? LIVE_TABLES.done : LIVE_TABLES.open;
+    const template = document.createElement('template');
+    template.innerHTML = renderTaskRow(task, Boolean(task.completion_date)).trim();
+    const row = template.content.firstChild;
+    const values = {
+        id: task.id,
+        title: task.title,
+        date_added: task.date_added,
+        priority: task.priority.weight,
+        completion_date: task.completion_date
+    };
+    
+    const existing = findTaskRow(tableId, task.id);
+    if (existing) {
+        // Edit: keep the row where it is
+        existing.replaceWith(row);
+        takeSortRow(tableId, task.id);
+        putSortRow(tableId, values);
+        markUpdated(row);
+        return;
+    }
+    removeTaskRow(task.id);
+    insertTaskRow(tableId, row, values);
+}
+
+function insertTaskRow(tableId, row, values) {
+    const table = document.getElementById(tableId);
+    if (!table) return;
+    const tbody = table.querySelector('tbody');
+    // "No tasks" placeholder
+    tbody.querySelectorAll('tr:not([data-task-id])').forEach(placeholder => placeholder.remove());
+    tbody.prepend(row);
+    
+    const state = tableStates.get(tableId);
+    if (values) {
+        putSortRow(tableId, values);
+    }
+    if (state && state.sortData && state.currentSort.field) {
+        sortRowsInMemory(table, state.sortData, state.currentSort.field, state.currentSort.order);
+    }
+    markUpdated(row);
+}
+
+/** Remove a task from the table's embedded sort data; returns its values by field. */
+function takeSortRow(tableId, taskId) {
+    const state = tableStates.get(tableId);
+    if (!state || !state.sortData) return null;
+    const fields = state.sortData.fields;
+    const idColumn = fields.indexOf('id');
+    const index = state.sortData.rows.findIndex(row => String(row[idColumn]) === String(taskId));
+    if (index === -1) return null;
+    const [row] = state.sortData.rows.splice(index, 1);
+    const values = {};
+    fields.forEach((field, column) => { values[field] = row[column]; });
+    return values;
+}
+
+function putSortRow(tableId, values) {
+    const state = tableStates.get(tableId);
+    if (!state || !state.sortData) return;
+    state.sortData.rows.push(state.sortData.fields.map(field => values[field]));
+}
+
+function markUpdated(row) {
+    row.classList.remove('live-updated');
+    void row.offsetWidth;  // restart the animation
+    row.classList.add('live-updated');
+}
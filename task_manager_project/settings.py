@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.instrumentation.InstrumentationMiddleware',  # opt-in: TASK_INSTRUMENTATION
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # TAS-1: i18n middleware
@@ -57,7 +58,8 @@ ROOT_URLCONF = 'task_manager_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates + pomiar czasu renderowania (tasks/instrumentation.py)
+        'BACKEND': 'tasks.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -82,9 +84,59 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Połączenia trwałe: bez ponownego otwierania (i PRAGM) w każdym requeście
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Profil SQLite (tasks/sqlite.py, sygnał connection_created). WAL: czytelnicy
+# nie czekają na zapis; synchronous=NORMAL w WAL nie psuje bazy przy awarii,
+# najwyżej traci ostatnie transakcje. busy_timeout w ms, cache_size < 0 w KiB.
+# None = bez PRAGM (domyślne ustawienia SQLite).
+TASK_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache (dane listy zadań, tasks/cache.py)
+# LocMemCache jest per proces - przy wielu workerach użyj wspólnego backendu
+# (Redis/Memcached), inaczej unieważnienie nie dotrze do pozostałych procesów.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-manager',
+    },
+    # Fragmenty wierszy listy zadań (TASK_ROW_RENDERER = 'cached') - po jednym
+    # na task, osobno, żeby nie wypierały danych listy (domyślnie 300 kluczy)
+    'task_rows': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-manager-rows',
+        'OPTIONS': {'MAX_ENTRIES': 50_000},
+    },
+}
+
+TASK_CACHE_TIMEOUT = 300
+
+# Sortowanie tabel zadań w przeglądarce (bez API) do tej liczby wierszy
+TASK_CLIENT_SORT_MAX_ROWS = 1000
+
+# Renderowanie wierszy listy zadań (tasks/rows.py): 'compiled', 'cached'
+# (fragmenty w cache per task + change_seq + język) albo 'template'
+TASK_ROW_RENDERER = 'compiled'
+TASK_ROW_CACHE = 'task_rows'
+TASK_ROW_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Import/eksport tasków (CSV/NDJSON): rozmiar paczki bulk_create
+# i paczki kursora przy eksporcie (QuerySet.iterator)
+TASK_IMPORT_BATCH_SIZE = 1000
+TASK_EXPORT_CHUNK_SIZE = 2000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -140,6 +192,15 @@ STATICFILES_DIRS = [
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Limit rozmiaru załącznika (strumieniowy upload, tasks/uploads.py)
+ATTACHMENT_MAX_UPLOAD_SIZE = 2 * 1024 ** 3  # 2 GB
+
+# Pobieranie załączników (tasks/downloads.py): None = FileResponse z Django,
+# 'x-sendfile' (Apache/lighttpd) albo 'x-accel-redirect' (nginx, location
+# internal pod ATTACHMENT_SENDFILE_URL_PREFIX wskazująca na MEDIA_ROOT)
+ATTACHMENT_SENDFILE_BACKEND = None
+ATTACHMENT_SENDFILE_URL_PREFIX = '/protected-media/'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -154,4 +215,38 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'tasks.instrumentation.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Zmiany tasków na żywo (tasks/events.py, SSE pod /events/, tylko ASGI):
+# historia do wznowień (Last-Event-ID), kolejka na klienta, heartbeat (s),
+# opóźnienie ponownego połączenia przeglądarki (ms), maks. czas połączenia (s)
+TASK_EVENTS_HISTORY = 256
+TASK_EVENTS_QUEUE_SIZE = 100
+TASK_EVENTS_HEARTBEAT = 15
+TASK_EVENTS_RETRY_MS = 3000
+TASK_EVENTS_MAX_AGE = 300
+
+# Instrumentacja requestów (tasks/instrumentation.py): Server-Timing,
+# metryki Prometheus pod /metrics/ (staff albo Authorization: Bearer <token>)
+TASK_INSTRUMENTATION = False
+TASK_METRICS_TOKEN = None
+
+# Budżet zapytań per nazwa URL; przekroczenie: 'log' (warning) albo 'raise' (testy)
+TASK_QUERY_BUDGETS = {
+    'task_list': 8,
+    'task_detail': 4,
+    'api_tasks_uncompleted': 5,
+    'api_tasks_completed': 5,
+    'api_tasks_search': 6,
+    'api_tasks_stats': 4,
+    'api_tasks_changes': 7,
+    'task_list_async': 8,
+    'task_detail_async': 4,
+    'api_tasks_uncompleted_async': 5,
+    'api_tasks_completed_async': 5,
 }
+TASK_QUERY_BUDGET_ACTION = 'log'
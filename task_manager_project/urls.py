@@ -1,7 +1,5 @@
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -9,6 +7,5 @@ urlpatterns = [
     path('', include('tasks.urls')),
 ]
 
-# Media files (TAS-3: Attachments)
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Media files (TAS-3: Attachments): bez publicznej ścieżki /media/ - pliki tylko
+# przez attachment_download (login_required), również przy DEBUG
@@ -1,13 +1,22 @@
 from django.contrib import admin
+from . import services as srs
+from .dao import TaskDAO
 from .models import Task, Priority
 
 
+# Zapisy z admina przez services - jak z widoków: synchronizacja wagi,
+# zdarzenia na żywo (cache/ETag unieważnia licznik zmian w bazie)
+
+
 @admin.register(Priority)
 class PriorityAdmin(admin.ModelAdmin):
     list_display = ['id', 'name', 'weight', 'deleted']
     list_filter = ['deleted']
     search_fields = ['name']
 
+    def save_model(self, request, obj, form, change):
+        srs.save_priority_form(form)
+
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
@@ -15,3 +24,24 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ['deleted', 'priority', 'completion_date']
     search_fields = ['title', 'content']
     date_hierarchy = 'date_added'
+
+    def get_search_results(self, request, queryset, search_term):
+        # Indeks FTS5 zamiast LIKE '%...%' po całej treści
+        return TaskDAO.filter_matching(queryset, search_term), False
+
+    def save_model(self, request, obj, form, change):
+        srs.save_task_form(form)
+
+    def delete_model(self, request, obj):
+        # Aktywny task: soft delete jak w aplikacji; usunięty miękko: trwale
+        if obj.deleted:
+            super().delete_model(request, obj)
+        else:
+            srs.delete_task(obj.pk)
+
+    def delete_queryset(self, request, queryset):
+        purged = list(queryset.filter(deleted=True).values_list('pk', flat=True))
+        active = list(queryset.filter(deleted=False).values_list('pk', flat=True))
+        if active:
+            srs.bulk_task_action('delete', active)
+        super().delete_queryset(request, queryset.model.objects.filter(pk__in=purged))
@@ -3,72 +3,315 @@ TAS-2: REST API dla sortowania.
 Używa services.py - nie ma bezpośredniego dostępu do bazy (DRY, Single Responsibility).
 """
 
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from . import services as srs
-from .serializers import TaskSerializer
+from .conditional import async_task_data_conditional, task_data_conditional
+from .decorators import async_api_view
+from .instrumentation import TimedJSONRenderer, timed
+from .serializers import PrioritySerializer, TaskSerializer
+from .transfer import CONTENT_TYPES
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@task_data_conditional
 def api_tasks_uncompleted(request):
     """
     GET /api/tasks/uncompleted/
-    Query params: sort_by, sort_order
+    Query params: sort_by, sort_order, cursor, page_size
     """
-    sort_by = request.query_params.get('sort_by', 'priority')
-    sort_order = request.query_params.get('sort_order', 'desc')
+    params, error = _parse_sort_params(request.query_params, 'priority')
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Pobierz dane przez services
+    try:
+        data = srs.get_sorted_uncompleted_tasks(**params)
+    except srs.InvalidCursorError:
+        return Response({'error': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(_sorted_page_body(data))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@task_data_conditional
+def api_tasks_completed(request):
+    """
+    GET /api/tasks/completed/
+    Query params: sort_by, sort_order, cursor, page_size
+    """
+    params, error = _parse_sort_params(request.query_params, 'completion_date')
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Pobierz dane przez services
+    try:
+        data = srs.get_sorted_completed_tasks(**params)
+    except srs.InvalidCursorError:
+        return Response({'error': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(_sorted_page_body(data))
+
+
+def _parse_sort_params(params, default_sort_by: str) -> tuple:
+    """
+    Walidacja query params endpointów sortowania (DRY - widoki sync i async).
+    Zwraca (argumenty dla services, None) albo (None, komunikat błędu).
+    """
+    sort_by = params.get('sort_by', default_sort_by)
+    sort_order = params.get('sort_order', 'desc')
     
-    # Walidacja
     if sort_order not in ['asc', 'desc']:
         sort_order = 'desc'
     
     if not srs.is_valid_sort_field(sort_by):
-        return Response(
-            {'error': f'Invalid sort_by. Allowed: {srs.get_allowed_sort_fields()}'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+        return None, f'Invalid sort_by. Allowed: {srs.get_allowed_sort_fields()}'
     
-    # Pobierz dane przez services
-    data = srs.get_sorted_uncompleted_tasks(sort_by, sort_order)
-    serializer = TaskSerializer(data['tasks'], many=True)
+    page_size = _parse_page_size(params)
+    if page_size is None:
+        return None, 'Invalid page_size. Expected a positive integer.'
     
-    return Response({
-        'tasks': serializer.data,
+    return {
+        'sort_by': sort_by,
+        'sort_order': sort_order,
+        'cursor': params.get('cursor'),
+        'page_size': page_size,
+    }, None
+
+
+def _sorted_page_body(data: dict) -> dict:
+    """Treść odpowiedzi strony sortowania."""
+    with timed('serialize'):
+        tasks = TaskSerializer(data['tasks'], many=True).data
+    
+    return {
+        'tasks': tasks,
         'sort_by': data['sort_by'],
         'sort_order': data['sort_order'],
-    })
+        'page_size': data['page_size'],
+        'next_cursor': data['next_cursor'],
+    }
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def api_tasks_completed(request):
+@task_data_conditional
+def api_tasks_search(request):
     """
-    GET /api/tasks/completed/
-    Query params: sort_by, sort_order
+    GET /api/tasks/search/
+    Query params: q, state (uncompleted|completed, domyślnie wszystkie), cursor, page_size
     """
-    sort_by = request.query_params.get('sort_by', 'completion_date')
-    sort_order = request.query_params.get('sort_order', 'desc')
+    query = request.query_params.get('q', '').strip()
+    state = request.query_params.get('state') or None
     
     # Walidacja
-    if sort_order not in ['asc', 'desc']:
-        sort_order = 'desc'
+    if not query:
+        return Response({'error': 'Missing q.'}, status=status.HTTP_400_BAD_REQUEST)
     
-    if not srs.is_valid_sort_field(sort_by):
+    if not srs.is_valid_search_state(state):
         return Response(
-            {'error': f'Invalid sort_by. Allowed: {srs.get_allowed_sort_fields()}'},
+            {'error': f'Invalid state. Allowed: {list(srs.SEARCH_STATES)}'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Pobierz dane przez services
-    data = srs.get_sorted_completed_tasks(sort_by, sort_order)
-    serializer = TaskSerializer(data['tasks'], many=True)
+    page_size = _parse_page_size(request.query_params)
+    if page_size is None:
+        return Response(
+            {'error': 'Invalid page_size. Expected a positive integer.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        data = srs.search_tasks(
+            query, state,
+            cursor=request.query_params.get('cursor'),
+            page_size=page_size,
+        )
+    except srs.InvalidCursorError:
+        return Response({'error': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+    with timed('serialize'):
+        tasks = TaskSerializer(data['tasks'], many=True).data
     
     return Response({
-        'tasks': serializer.data,
-        'sort_by': data['sort_by'],
-        'sort_order': data['sort_order'],
+        'tasks': tasks,
+        'query': data['query'],
+        'state': data['state'],
+        'page_size': data['page_size'],
+        'next_cursor': data['next_cursor'],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@task_data_conditional
+def api_tasks_stats(request):
+    """
+    GET /api/tasks/stats/
+    Liczniki open/completed per priorytet i ukończenia per dzień.
+    """
+    return Response(srs.get_task_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_tasks_changes(request):
+    """
+    GET /api/tasks/changes/
+    Query params: token (z next_token poprzedniej odpowiedzi; brak = pełny stan), page_size
+    Zmienione taski i priorytety + ID usuniętych; has_more = pobierz od razu kolejną stronę.
+    """
+    page_size = _parse_page_size(request.query_params)
+    if page_size is None:
+        return Response(
+            {'error': 'Invalid page_size. Expected a positive integer.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        data = srs.get_task_changes(request.query_params.get('token'), page_size)
+    except srs.InvalidCursorError:
+        return Response({'error': 'Invalid token.'}, status=status.HTTP_400_BAD_REQUEST)
+    with timed('serialize'):
+        tasks = TaskSerializer(data['tasks'], many=True).data
+        priorities = PrioritySerializer(data['priorities'], many=True).data
+    
+    return Response({
+        'tasks': tasks,
+        'deleted_tasks': data['deleted_tasks'],
+        'priorities': priorities,
+        'deleted_priorities': data['deleted_priorities'],
+        'page_size': data['page_size'],
+        'has_more': data['has_more'],
+        'next_token': data['next_token'],
     })
+
+
+def _parse_page_size(params):
+    """Odczytaj page_size z query params (domyślny gdy brak, None gdy błędny)."""
+    raw = params.get('page_size')
+    if raw is None:
+        return srs.API_PAGE_SIZE
+    try:
+        page_size = int(raw)
+    except ValueError:
+        return None
+    return page_size if page_size > 0 else None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_tasks_bulk(request, action):
+    """
+    POST /api/tasks/bulk/<complete|restore|delete>/
+    Body: {"ids": [1, 2, 3]}
+    """
+    if not srs.is_valid_bulk_action(action):
+        return Response(
+            {'error': f'Invalid action. Allowed: {list(srs.BULK_ACTIONS)}'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    ids = request.data.get('ids') if hasattr(request.data, 'get') else None
+    if (not isinstance(ids, list) or not ids
+            or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)):
+        return Response(
+            {'error': 'Invalid ids. Expected a non-empty list of integers.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(ids) > srs.BULK_MAX_IDS:
+        return Response(
+            {'error': f'Too many ids. Maximum: {srs.BULK_MAX_IDS}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return Response(srs.bulk_task_action(action, ids))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_tasks_export(request, fmt):
+    """
+    GET /api/tasks/export/<csv|ndjson>/
+    Strumień wszystkich aktywnych tasków (stała pamięć).
+    """
+    if not srs.is_valid_transfer_format(fmt):
+        return Response(
+            {'error': f'Invalid format. Allowed: {list(CONTENT_TYPES)}'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    response = StreamingHttpResponse(srs.export_tasks(fmt), content_type=CONTENT_TYPES[fmt])
+    response.headers['Content-Disposition'] = content_disposition_header(True, f'tasks.{fmt}')
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_tasks_import(request, fmt):
+    """
+    POST /api/tasks/import/<csv|ndjson>/
+    Body: plik CSV/NDJSON (surowe body albo pole "file" multipart), czytany strumieniowo.
+    """
+    if not srs.is_valid_transfer_format(fmt):
+        return Response(
+            {'error': f'Invalid format. Allowed: {list(CONTENT_TYPES)}'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    if request.content_type.startswith('multipart/form-data'):
+        stream = request.FILES.get('file')
+    else:
+        # Bez request.data - body czytane linia po linii, nie w całości
+        stream = request.stream
+    if stream is None:
+        return Response({'error': 'Empty body.'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(srs.import_tasks(stream, fmt))
+
+
+# ==================== ASYNC (ASGI) ====================
+# Natywne widoki async endpointów sortowania - async ORM (services.aget_*),
+# bez przejścia przez wątek dla całego widoku. Odpowiedź jak z DRF
+# (ten sam renderer JSON), walidacja wspólna z wersją sync.
+
+@async_api_view
+@async_task_data_conditional
+async def api_tasks_uncompleted_async(request):
+    """
+    GET /async/api/tasks/uncompleted/
+    Query params jak api_tasks_uncompleted.
+    """
+    params, error = _parse_sort_params(request.GET, 'priority')
+    if error:
+        return _json_response({'error': error}, status.HTTP_400_BAD_REQUEST)
+    try:
+        data = await srs.aget_sorted_uncompleted_tasks(**params)
+    except srs.InvalidCursorError:
+        return _json_response({'error': 'Invalid cursor.'}, status.HTTP_400_BAD_REQUEST)
+    return _json_response(_sorted_page_body(data))
+
+
+@async_api_view
+@async_task_data_conditional
+async def api_tasks_completed_async(request):
+    """
+    GET /async/api/tasks/completed/
+    Query params jak api_tasks_completed.
+    """
+    params, error = _parse_sort_params(request.GET, 'completion_date')
+    if error:
+        return _json_response({'error': error}, status.HTTP_400_BAD_REQUEST)
+    try:
+        data = await srs.aget_sorted_completed_tasks(**params)
+    except srs.InvalidCursorError:
+        return _json_response({'error': 'Invalid cursor.'}, status.HTTP_400_BAD_REQUEST)
+    return _json_response(_sorted_page_body(data))
+
+
+def _json_response(data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    return HttpResponse(TimedJSONRenderer().render(data), content_type='application/json', status=status_code)
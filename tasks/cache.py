@@ -0,0 +1,49 @@
+"""
+Cache danych listy zadań wersjonowany wersją danych z bazy (change_counter,
+tasks.dao.ChangeCounterDAO). Każda modyfikacja tasków/priorytetów przesuwa
+licznik w tej samej transakcji - klucze starej wersji przestają być czytane
+i same wygasają. Unieważnienie O(1), bez skanowania kluczy, i wspólne dla
+wszystkich procesów (workerów, komend manage.py) - nie tylko dla tego,
+który wykonał zapis.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .dao import ChangeCounterDAO
+
+
+def get_version() -> tuple:
+    """(generacja, czas ostatniej modyfikacji) - nieznany czas = teraz, klient musi pobrać dane."""
+    generation, modified = ChangeCounterDAO.get_version()
+    return generation, modified or timezone.now()
+
+
+def get_generation():
+    """Aktualna generacja danych tasków (wartość licznika zmian)."""
+    return ChangeCounterDAO.get_version()[0]
+
+
+def get_or_build(name: str, builder):
+    """Read-through: wartość dla bieżącej generacji albo builder() zapisany w cache."""
+    key = f'tasks:{name}:{get_generation()}'
+    return cache.get_or_set(key, builder, timeout=settings.TASK_CACHE_TIMEOUT)
+
+
+# ===== ASYNC (widoki ASGI) =====
+
+async def aget_version() -> tuple:
+    """get_version przez async ORM."""
+    generation, modified = await ChangeCounterDAO.aget_version()
+    return generation, modified or timezone.now()
+
+
+async def aget_or_build(name: str, builder):
+    """Read-through jak get_or_build; builder to funkcja async. Klucze wspólne z wersją sync."""
+    key = f'tasks:{name}:{(await ChangeCounterDAO.aget_version())[0]}'
+    value = await cache.aget(key)
+    if value is None:
+        value = await builder()
+        await cache.aadd(key, value, timeout=settings.TASK_CACHE_TIMEOUT)
+    return value
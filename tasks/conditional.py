@@ -0,0 +1,101 @@
+"""
+Conditional GET (ETag / Last-Modified) dla listy zadań i API sortowania.
+Walidatory liczone z wersji danych w bazie (tasks/cache.py, jeden wiersz
+change_counter - aktualna w każdym procesie) i bieżącej daty (statystyki
+"dziś" / ostatnie 30 dni zmieniają się o północy bez zapisu) - odpowiedź 304
+nie uruchamia zapytania o taski ani serializera.
+"""
+
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from . import cache
+
+
+def _version(request) -> tuple:
+    # Raz na request - condition() woła osobno funkcję ETag i Last-Modified
+    if not hasattr(request, '_task_data_version'):
+        request._task_data_version = cache.get_version()
+    return request._task_data_version
+
+
+def _etag(request, *args, **kwargs) -> str:
+    return _etag_for(request, _version(request)[0])
+
+
+def _etag_for(request, generation) -> str:
+    """
+    Silny ETag: generacja danych + wszystko, od czego zależy treść odpowiedzi
+    (data, parametry, język, format, użytkownik, sekret CSRF osadzony w stronie).
+    """
+    parts = [
+        str(generation),
+        timezone.now().date().isoformat(),
+        request.path,
+        request.META.get('QUERY_STRING', ''),
+        get_language() or '',
+        request.META.get('HTTP_ACCEPT', ''),
+        str(request.user.pk),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ]
+    return '"%s"' % hashlib.sha256('\n'.join(parts).encode()).hexdigest()[:32]
+
+
+def _last_modified(request, *args, **kwargs):
+    return _not_before_today(_version(request)[1])
+
+
+def _not_before_today(modified):
+    """Last-Modified nie starszy niż dzisiejsza północ (jak data w ETag)."""
+    midnight = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(modified, midnight)
+
+
+def task_data_conditional(view):
+    """
+    Dekorator widoku: 304 gdy If-None-Match pasuje do bieżącego ETag.
+    Cache-Control: no-cache wymusza rewalidację przy każdym użyciu.
+    """
+    @condition(etag_func=_etag, last_modified_func=_last_modified)
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        return view(request, *args, **kwargs)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = inner(request, *args, **kwargs)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    return wrapper
+
+
+def async_task_data_conditional(view):
+    """
+    task_data_conditional dla widoków async (django.views.decorators.http.condition
+    w Django 4.2 obsługuje tylko widoki sync) - te same walidatory i nagłówki.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        generation, modified = await cache.aget_version()
+        etag = _etag_for(request, generation)
+        last_modified = timegm(_not_before_today(modified).utctimetuple())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                response.headers.setdefault('ETag', etag)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    return wrapper
@@ -4,21 +4,38 @@ Zasada DRY:
   - Bazowe query zdefiniowane raz w _base_query()
   - Filtry aktywnych rekordów w _active()
   - Domyślne sortowanie w DEFAULT_ORDER
-  - Metoda save() używana przez wszystkie modyfikacje
+  - Zmiany stanu jako warunkowy UPDATE w _transition()
+  - Każdy zapis podbija change_seq w tym samym zapytaniu (synchronizacja przyrostowa),
+    a triggery - licznik change_counter = wersja danych (ETag, klucze cache)
 Zasada Single Responsibility: DAO odpowiada TYLKO za operacje na bazie.
 """
 
-from django.db.models import QuerySet
-from .models import Task, Priority, Attachment
+import re
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from . import events
+from .models import (
+    Task, Priority, Attachment, AttachmentBlob, FileDeletion, ChangeCounter, Tombstone,
+    PriorityStats, DailyCompletionStats, DONE_TASKS, next_change_seq,
+)
 
 
 class TaskDAO:
     """Data Access Object for Task model"""
     
     # Domyślne sortowanie (DRY - zdefiniowane raz)
-    DEFAULT_ORDER_UNCOMPLETED = ['-priority__weight', 'date_added']
+    DEFAULT_ORDER_UNCOMPLETED = ['-priority_weight', 'date_added']
     DEFAULT_ORDER_COMPLETED = ['-completion_date']
     
+    # Rozmiar paczki ID w operacjach masowych (limit parametrów SQLite)
+    BULK_BATCH_SIZE = 500
+    
     # ===== BAZOWE QUERY (DRY) =====
     
     @staticmethod
@@ -50,6 +67,73 @@ class TaskDAO:
         """Pobierz task po ID."""
         return TaskDAO._active().get(pk=pk)
     
+    @staticmethod
+    def with_attachments(queryset: QuerySet) -> QuerySet:
+        """Załączniki pobrane jednym zapytaniem dla całej strony (bez N+1 w API)."""
+        return queryset.prefetch_related('attachments')
+    
+    @staticmethod
+    def get_page(queryset: QuerySet, field: str, descending: bool,
+                 after: tuple = None, limit: int = 50) -> list:
+        """
+        Stronicowanie keyset: sortowanie po (field, id), strona zaczyna się
+        za kluczem `after` = (wartość, id). Koszt nie zależy od głębokości.
+        Zwraca do limit + 1 rekordów (nadmiarowy = jest kolejna strona).
+        """
+        return list(TaskDAO._page_query(queryset, field, descending, after, limit))
+    
+    @staticmethod
+    def _page_query(queryset: QuerySet, field: str, descending: bool,
+                    after: tuple = None, limit: int = 50) -> QuerySet:
+        """Query strony keyset (DRY - wspólne dla get_page i AsyncTaskDAO.get_page)."""
+        if after is not None:
+            queryset = queryset.filter(TaskDAO._after_key(field, descending, *after))
+        prefix = '-' if descending else ''
+        order_by = [f'{prefix}{field}']
+        if field != 'id':
+            order_by.append(f'{prefix}id')
+        return queryset.order_by(*order_by)[:limit + 1]
+    
+    @staticmethod
+    def _after_key(field: str, descending: bool, value, pk: int) -> Q:
+        """
+        Warunek "za kluczem (value, pk)" - id rozstrzyga remisy.
+        Zewnętrzne field >= value (<= przy DESC) pozwala SQLite wejść
+        w indeks zakresem zamiast skanować go od początku.
+        """
+        lookup = 'lt' if descending else 'gt'
+        id_after = Q(**{f'id__{lookup}': pk})
+        if field == 'id':
+            return id_after
+        if value is None:
+            # SQLite: NULL na początku przy ASC, na końcu przy DESC
+            same_key = Q(**{f'{field}__isnull': True}) & id_after
+            if descending:
+                return same_key
+            return same_key | Q(**{f'{field}__isnull': False})
+        condition = Q(**{f'{field}__{lookup}e': value}) & (Q(**{f'{field}__{lookup}': value}) | id_after)
+        if descending and TaskDAO._is_nullable(field):
+            condition |= Q(**{f'{field}__isnull': True})
+        return condition
+    
+    @staticmethod
+    def _is_nullable(field: str) -> bool:
+        """Czy kolumna sortowania dopuszcza NULL (tylko pola własne Task)."""
+        try:
+            return Task._meta.get_field(field).null
+        except FieldDoesNotExist:
+            return False
+    
+    @staticmethod
+    def get_changes(after: tuple = None, limit: int = 50) -> list:
+        """
+        Taski zmienione za kluczem (change_seq, id), rosnąco - razem z usuniętymi
+        (tombstone). Bez klucza (pierwsza synchronizacja) tylko aktywne.
+        Zwraca do limit + 1 rekordów (nadmiarowy = jest kolejna strona).
+        """
+        queryset = TaskDAO._base_query() if after is not None else TaskDAO._active()
+        return TaskDAO.get_page(TaskDAO.with_attachments(queryset), 'change_seq', False, after, limit)
+    
     @staticmethod
     def get_for_completion(pk: int) -> Task:
         """Pobierz task do ukończenia (nieukończony)."""
@@ -60,31 +144,207 @@ class TaskDAO:
         """Pobierz task do przywrócenia (ukończony)."""
         return TaskDAO._active().get(pk=pk, completion_date__isnull=False)
     
+    # ===== WYSZUKIWANIE (FTS5, migracja 0008) =====
+    
+    # Wagi bm25 kolumn (title, content) - trafienie w tytule waży więcej
+    SEARCH_WEIGHTS = (10.0, 1.0)
+    SEARCH_MAX_TERMS = 8
+    SEARCH_MIN_PREFIX = 3
+    
+    # Filtry stanu w SQL wyszukiwania - odpowiadają OPEN_TASKS / DONE_TASKS
+    SEARCH_STATE_SQL = {
+        None: 'tasks.deleted = 0',
+        'uncompleted': 'tasks.deleted = 0 AND tasks.completion_date IS NULL',
+        'completed': 'tasks.deleted = 0 AND tasks.completion_date IS NOT NULL',
+    }
+    
+    @staticmethod
+    def search(query: str, state: str = None, limit: int = 50, offset: int = 0) -> list:
+        """
+        Wyszukiwanie w tytule i treści, ranking bm25 (najtrafniejsze pierwsze).
+        state: None (wszystkie aktywne), 'uncompleted' albo 'completed'.
+        Zwraca do limit + 1 tasków (nadmiarowy = jest kolejna strona).
+        """
+        terms = TaskDAO._search_terms(query)
+        if not terms:
+            return []
+        if connection.vendor != 'sqlite':
+            scope = {None: TaskDAO._active(), 'uncompleted': TaskDAO.get_uncompleted(),
+                     'completed': TaskDAO.get_completed()}[state]
+            matching = TaskDAO.filter_matching(TaskDAO.with_attachments(scope), query)
+            return list(matching.order_by('id')[offset:offset + limit + 1])
+        
+        sql = (
+            'SELECT tasks.id FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid '
+            f'WHERE tasks_fts MATCH %s AND {TaskDAO.SEARCH_STATE_SQL[state]} '
+            'ORDER BY bm25(tasks_fts, %s, %s), tasks.id LIMIT %s OFFSET %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [TaskDAO._match_expression(terms), *TaskDAO.SEARCH_WEIGHTS,
+                                 limit + 1, offset])
+            ids = [row[0] for row in cursor.fetchall()]
+        tasks = TaskDAO.with_attachments(TaskDAO._base_query()).in_bulk(ids)
+        return [tasks[pk] for pk in ids if pk in tasks]
+    
+    @staticmethod
+    def filter_matching(queryset: QuerySet, query: str) -> QuerySet:
+        """Zawęź queryset do tasków pasujących do zapytania (bez rankingu, np. admin)."""
+        terms = TaskDAO._search_terms(query)
+        if connection.vendor != 'sqlite':
+            for term in terms:
+                queryset = queryset.filter(Q(title__icontains=term) | Q(content__icontains=term))
+            return queryset
+        if not terms:
+            return queryset
+        return queryset.filter(pk__in=RawSQL(
+            'SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH %s', [TaskDAO._match_expression(terms)]))
+    
+    @staticmethod
+    def _search_terms(query: str) -> list:
+        """Słowa zapytania (bez składni FTS5 - operatory i cudzysłowy ignorowane)."""
+        return re.findall(r'\w+', query or '')[:TaskDAO.SEARCH_MAX_TERMS]
+    
+    @staticmethod
+    def _match_expression(terms: list) -> str:
+        """
+        Wyrażenie MATCH: wszystkie słowa muszą wystąpić, każde jako prefiks.
+        Krótkie słowa tylko w całości - prefiks 1-2 znaków pasuje do prawie wszystkiego.
+        """
+        return ' '.join(
+            f'"{term}"*' if len(term) >= TaskDAO.SEARCH_MIN_PREFIX else f'"{term}"' for term in terms)
+    
     # ===== MODYFIKACJA DANYCH =====
     
+    # Warunki stanu przejść (bez select_related - tylko pod UPDATE)
+    @staticmethod
+    def _state_active() -> QuerySet:
+        return Task.objects.filter(deleted=False)
+    
+    @staticmethod
+    def _state_uncompleted() -> QuerySet:
+        return Task.objects.filter(deleted=False, completion_date__isnull=True)
+    
     @staticmethod
-    def _save(instance: Task) -> Task:
-        """Zapisz task (DRY - używane przez wszystkie modyfikacje)."""
-        instance.save()
-        return instance
+    def _state_completed() -> QuerySet:
+        return Task.objects.filter(deleted=False, completion_date__isnull=False)
     
     @staticmethod
-    def soft_delete(task: Task) -> Task:
+    def _transition(state: QuerySet, pk: int, **changes) -> None:
+        """
+        Zmiana stanu jednym UPDATE tylko zmienianych kolumn, z warunkiem stanu
+        (DRY - używane przez wszystkie przejścia). Bez wcześniejszego SELECT,
+        odporne na wyścigi: 0 zmienionych wierszy = DoesNotExist. Dlatego POST
+        widoków potwierdzeń (jak PriorityDAO.soft_delete) nie pobiera obiektu.
+        """
+        if not state.filter(pk=pk).update(**changes, change_seq=next_change_seq(Task)):
+            raise Task.DoesNotExist
+    
+    @staticmethod
+    def soft_delete(pk: int) -> None:
         """Miękkie usunięcie."""
-        task.deleted = True
-        return TaskDAO._save(task)
+        TaskDAO._transition(TaskDAO._state_active(), pk, deleted=True)
+        events.publish('delete', ids=[pk])
+    
+    @staticmethod
+    def complete(pk: int, completion_date) -> None:
+        """Oznacz jako ukończony (tylko nieukończony)."""
+        TaskDAO._transition(TaskDAO._state_uncompleted(), pk, completion_date=completion_date)
+        events.publish('complete', ids=[pk], completion_date=completion_date)
+    
+    @staticmethod
+    def restore(pk: int) -> None:
+        """Przywróć do nieukończonych (tylko ukończony)."""
+        TaskDAO._transition(TaskDAO._state_completed(), pk, completion_date=None)
+        events.publish('restore', ids=[pk], tasks=TaskDAO.get_event_rows([pk]))
+    
+    @staticmethod
+    def get_event_rows(ids: list) -> list:
+        """
+        Wiersze tasków do zdarzeń na żywo (pola jak w zdarzeniu save), paczkami
+        po ID, bez instancji modelu. Przywrócony task może nie mieć wiersza
+        u klienta (tabela ukończonych ładowana leniwie) - klient wstawia go z tych danych.
+        """
+        rows = []
+        for start in range(0, len(ids), TaskDAO.BULK_BATCH_SIZE):
+            rows.extend(
+                Task.objects.filter(id__in=ids[start:start + TaskDAO.BULK_BATCH_SIZE]).order_by('id').values(
+                    'id', 'title', 'date_added', 'completion_date',
+                    'priority__id', 'priority__name', 'priority__weight'))
+        return [{
+            'id': row['id'],
+            'title': row['title'],
+            'date_added': row['date_added'],
+            'completion_date': row['completion_date'],
+            'priority': {'id': row['priority__id'], 'name': row['priority__name'],
+                         'weight': row['priority__weight']},
+        } for row in rows]
+    
+    @staticmethod
+    def mark_changed(pk: int) -> None:
+        """Podbij change_seq bez zmiany pól (np. nowy/usunięty załącznik w danych API)."""
+        Task.objects.filter(pk=pk).update(change_seq=next_change_seq(Task))
+    
+    # ===== OPERACJE MASOWE =====
+    
+    @staticmethod
+    def bulk_soft_delete(ids: list) -> list:
+        """Miękkie usunięcie wielu tasków. Zwraca ID faktycznie usuniętych."""
+        updated = TaskDAO._bulk_update(TaskDAO._state_active(), ids, deleted=True)
+        if updated:
+            events.publish('delete', ids=updated)
+        return updated
+    
+    @staticmethod
+    def bulk_complete(ids: list, completion_date) -> list:
+        """Ukończ wiele tasków. Zwraca ID faktycznie ukończonych."""
+        updated = TaskDAO._bulk_update(
+            TaskDAO._state_uncompleted(), ids, completion_date=completion_date)
+        if updated:
+            events.publish('complete', ids=updated, completion_date=completion_date)
+        return updated
     
     @staticmethod
-    def complete(task: Task, completion_date) -> Task:
-        """Oznacz jako ukończony."""
-        task.completion_date = completion_date
-        return TaskDAO._save(task)
+    def bulk_restore(ids: list) -> list:
+        """Przywróć wiele tasków. Zwraca ID faktycznie przywróconych."""
+        updated = TaskDAO._bulk_update(TaskDAO._state_completed(), ids, completion_date=None)
+        if updated:
+            events.publish('restore', ids=updated, tasks=TaskDAO.get_event_rows(updated))
+        return updated
     
     @staticmethod
-    def restore(task: Task) -> Task:
-        """Przywróć do nieukończonych."""
-        task.completion_date = None
-        return TaskDAO._save(task)
+    def bulk_insert(rows: list) -> int:
+        """
+        Wstaw paczkę tasków (słowniki pól) jednym bulk_create w jednej transakcji.
+        bulk_create pomija Task.save() - priority_weight i change_seq ustawiane tutaj.
+        """
+        change_seq = next_change_seq(Task)
+        tasks = [Task(**row, priority_weight=row['priority'].weight, change_seq=change_seq)
+                 for row in rows]
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+        return len(tasks)
+    
+    @staticmethod
+    def get_for_export() -> QuerySet:
+        """Aktywne taski jako krotki wartości (bez instancji modelu), rosnąco po ID."""
+        return Task.objects.filter(deleted=False).order_by('id').values_list(
+            'title', 'content', 'priority__name', 'priority__weight', 'date_added', 'completion_date')
+    
+    @staticmethod
+    def _bulk_update(queryset: QuerySet, ids: list, **changes) -> list:
+        """
+        UPDATE ... WHERE id IN (...) AND <warunek stanu> w paczkach, w jednej
+        transakcji. queryset = warunek stanu; rekordy spoza niego są pomijane.
+        """
+        updated = []
+        with transaction.atomic():
+            for start in range(0, len(ids), TaskDAO.BULK_BATCH_SIZE):
+                batch = ids[start:start + TaskDAO.BULK_BATCH_SIZE]
+                matched = list(queryset.filter(id__in=batch).values_list('id', flat=True))
+                if matched:
+                    queryset.filter(id__in=matched).update(**changes, change_seq=next_change_seq(Task))
+                    updated.extend(matched)
+        return updated
 
 
 class PriorityDAO:
@@ -118,19 +378,115 @@ class PriorityDAO:
         """Pobierz priorytet po ID."""
         return PriorityDAO._active().get(pk=pk)
     
+    @staticmethod
+    def get_changes(since: int = None) -> list:
+        """
+        Priorytety zmienione po numerze `since`, rosnąco - razem z usuniętymi.
+        Bez numeru (pierwsza synchronizacja) wszystkie aktywne.
+        """
+        if since is None:
+            queryset = PriorityDAO._active()
+        else:
+            queryset = PriorityDAO._base_query().filter(change_seq__gt=since)
+        return list(queryset.order_by('change_seq', 'id'))
+    
+    @staticmethod
+    def get_by_names() -> dict:
+        """Aktywne priorytety jako {nazwa: priorytet} - przy powtórzonej nazwie najstarszy."""
+        priorities = {}
+        for priority in PriorityDAO._active().order_by('pk'):
+            priorities.setdefault(priority.name, priority)
+        return priorities
+    
     # ===== MODYFIKACJA DANYCH =====
     
     @staticmethod
-    def _save(instance: Priority) -> Priority:
-        """Zapisz priorytet (DRY)."""
-        instance.save()
-        return instance
+    def create(name: str, weight: int) -> Priority:
+        """Utwórz priorytet."""
+        return Priority.objects.create(name=name, weight=weight)
     
     @staticmethod
-    def soft_delete(priority: Priority) -> Priority:
-        """Miękkie usunięcie."""
-        priority.deleted = True
-        return PriorityDAO._save(priority)
+    def sync_task_weights(priority: Priority) -> int:
+        """Przepisz nową wagę do Task.priority_weight jednym UPDATE."""
+        return Task.objects.filter(priority=priority).update(priority_weight=priority.weight)
+    
+    @staticmethod
+    def soft_delete(pk: int) -> None:
+        """Miękkie usunięcie (warunkowy UPDATE, DoesNotExist gdy brak)."""
+        changes = {'deleted': True, 'change_seq': next_change_seq(Priority)}
+        if not PriorityDAO._active().filter(pk=pk).update(**changes):
+            raise Priority.DoesNotExist
+
+
+class ChangeCounterDAO:
+    """
+    Data Access Object for ChangeCounter model - wersja danych tasków wspólna
+    dla wszystkich procesów (walidatory HTTP, klucze cache). Zapisy tasków
+    i priorytetów przesuwają licznik triggerami (migracje 0012/0013);
+    bump() tylko dla zmian danych odpowiedzi poza tymi tabelami.
+    """
+    
+    @staticmethod
+    def get_version() -> tuple:
+        """(wersja, czas ostatniej zmiany albo None)."""
+        if connection.vendor != 'sqlite':
+            return ChangeCounterDAO._live_version(ChangeCounterDAO._counter().first())
+        return ChangeCounterDAO._counter().first() or (0, None)
+    
+    @staticmethod
+    async def aget_version() -> tuple:
+        """get_version przez async ORM."""
+        if connection.vendor != 'sqlite':
+            return await sync_to_async(ChangeCounterDAO.get_version)()
+        return await ChangeCounterDAO._counter().afirst() or (0, None)
+    
+    @staticmethod
+    def bump() -> None:
+        """Nowa wersja danych (np. po zmianie załączników lub liczników statystyk)."""
+        now = timezone.now()
+        if not ChangeCounter.objects.filter(pk=1).update(value=F('value') + 1, modified=now):
+            ChangeCounter.objects.create(pk=1, value=1, modified=now)
+    
+    @staticmethod
+    def _counter() -> QuerySet:
+        return ChangeCounter.objects.filter(pk=1).values_list('value', 'modified')
+    
+    @staticmethod
+    def _live_version(counter) -> tuple:
+        # Bez triggerów licznik rośnie tylko z bump() - wersja = także najwyższe change_seq
+        value, modified = counter or (0, None)
+        tasks = Task.objects.aggregate(top=Max('change_seq'))['top'] or 0
+        priorities = Priority.objects.aggregate(top=Max('change_seq'))['top'] or 0
+        return f'{value}.{tasks}.{priorities}', modified
+
+
+class TombstoneDAO:
+    """
+    Data Access Object for Tombstone model - trwale usunięte taski/priorytety
+    (wpisy z triggerów, migracja 0012) dla synchronizacji przyrostowej.
+    """
+    
+    @staticmethod
+    def _for(model) -> QuerySet:
+        return Tombstone.objects.filter(table_name=model._meta.db_table)
+    
+    @staticmethod
+    def get_task_changes(after: tuple, limit: int = 50) -> list:
+        """(change_seq, id) tasków usuniętych za kluczem (change_seq, id), rosnąco, do limit + 1."""
+        seq, pk = after
+        return list(
+            TombstoneDAO._for(Task)
+            .filter(Q(change_seq__gt=seq) | Q(change_seq=seq, object_id__gt=pk))
+            .order_by('change_seq', 'object_id').values_list('change_seq', 'object_id')[:limit + 1]
+        )
+    
+    @staticmethod
+    def get_priority_changes(since: int) -> list:
+        """(change_seq, id) priorytetów usuniętych po numerze `since`, rosnąco."""
+        return list(
+            TombstoneDAO._for(Priority).filter(change_seq__gt=since)
+            .order_by('change_seq', 'object_id').values_list('change_seq', 'object_id')
+        )
 
 
 class AttachmentDAO:
@@ -166,13 +522,197 @@ class AttachmentDAO:
     # ===== MODYFIKACJA DANYCH =====
     
     @staticmethod
-    def create(task: Task, file, filename: str) -> Attachment:
-        """Utwórz załącznik."""
-        return AttachmentDAO._base_query().create(task=task, file=file, filename=filename)
+    def _storage():
+        return Attachment._meta.get_field('file').storage
+    
+    @staticmethod
+    def store_temp(file) -> tuple:
+        """Zapisz przesłany plik do pliku tymczasowego storage -> (nazwa, sha256, rozmiar)."""
+        return AttachmentDAO._storage().write_temp(file)
+    
+    @staticmethod
+    def create(task: Task, temp_name: str, filename: str, sha256: str, size: int) -> Attachment:
+        """
+        Utwórz załącznik z pliku tymczasowego storage. Referencja do bloba
+        (+1 albo nowy blob) i przeniesienie pliku w jednej transakcji.
+        """
+        with transaction.atomic():
+            blob_name = AttachmentDAO._acquire_blob(temp_name, sha256, size)
+            TaskDAO.mark_changed(task.pk)
+            return AttachmentDAO._base_query().create(
+                task=task, file=blob_name, filename=filename, sha256=sha256, size=size)
+    
+    @staticmethod
+    def delete(pk: int) -> int:
+        """
+        Usuń załącznik (trwale) - SELECT tylko potrzebnych kolumn + DELETE.
+        Plik trafia do kolejki usuwania razem z ostatnią referencją do bloba.
+        Referencję zwalnia tylko DELETE, który faktycznie usunął wiersz -
+        równoległe usunięcie tego samego załącznika nie zdejmie jej drugi raz.
+        Zwraca task_id; DoesNotExist gdy brak.
+        """
+        with transaction.atomic():
+            task_id, file_name, sha256 = AttachmentDAO._base_query().values_list(
+                'task_id', 'file', 'sha256').get(pk=pk)
+            if not AttachmentDAO._base_query().filter(pk=pk).delete()[0]:
+                raise Attachment.DoesNotExist
+            TaskDAO.mark_changed(task_id)
+            AttachmentDAO._release_blob(sha256, file_name)
+        return task_id
+    
+    @staticmethod
+    def purge_for_deleted_tasks(limit: int) -> int:
+        """
+        Usuń paczkę załączników tasków usuniętych miękko (pliki do kolejki).
+        Zwraca liczbę usuniętych załączników (0 = nic więcej do zrobienia).
+        """
+        with transaction.atomic():
+            rows = list(AttachmentDAO._base_query().filter(task__deleted=True)
+                        .order_by('pk').values_list('pk', 'file', 'sha256')[:limit])
+            if not rows:
+                return 0
+            AttachmentDAO._base_query().filter(pk__in=[pk for pk, _, _ in rows]).delete()
+            released = Counter((sha256, file_name) for _, file_name, sha256 in rows)
+            for (sha256, file_name), count in released.items():
+                AttachmentDAO._release_blob(sha256, file_name, count)
+            ChangeCounterDAO.bump()
+        return len(rows)
+    
+    # ===== BLOBY (licznik referencji) =====
+    
+    @staticmethod
+    def _acquire_blob(temp_name: str, sha256: str, size: int) -> str:
+        """+1 referencja (UPDATE najpierw - blokada zapisu zanim ruszymy plik)."""
+        storage = AttachmentDAO._storage()
+        if not AttachmentBlob.objects.filter(pk=sha256).update(ref_count=F('ref_count') + 1):
+            AttachmentBlob.objects.create(
+                sha256=sha256, name=storage.blob_name(sha256), size=size, ref_count=1)
+        return storage.commit_temp(temp_name, sha256)
+    
+    @staticmethod
+    def _release_blob(sha256: str, file_name: str, count: int = 1) -> None:
+        """
+        -count referencji; przy ostatniej (albo dla pliku sprzed deduplikacji)
+        plik trafia do kolejki usuwania - samo kasowanie poza requestem.
+        """
+        blobs = AttachmentBlob.objects.filter(pk=sha256)
+        if sha256 and blobs.update(ref_count=F('ref_count') - count):
+            if not blobs.filter(ref_count__lte=0).delete()[0]:
+                return
+        if file_name:
+            FileDeletion.objects.create(name=file_name)
+
+
+class StatsDAO:
+    """
+    Data Access Object for task statistics.
+    Liczniki w priority_stats / daily_completion_stats utrzymują triggery
+    (migracja 0009) - odczyt to kilka wierszy zamiast GROUP BY po tasks.
+    """
+    
+    # ===== POBIERANIE DANYCH =====
+    
+    @staticmethod
+    def get_priority_counts() -> list:
+        """Liczniki per priorytet (open_count, completed_count), od najwyższej wagi."""
+        if connection.vendor != 'sqlite':
+            return list(StatsDAO._count_by_priority())  # bez triggerów - na bieżąco
+        return list(
+            PriorityStats.objects.filter(Q(open_count__gt=0) | Q(completed_count__gt=0))
+            .order_by('-priority__weight', 'priority_id')
+            .values('priority_id', 'priority__name', 'priority__weight', 'open_count', 'completed_count')
+        )
+    
+    @staticmethod
+    def get_daily_completions(since) -> list:
+        """Liczba ukończeń per dzień od `since` (włącznie), rosnąco po dacie."""
+        if connection.vendor != 'sqlite':
+            return list(StatsDAO._count_by_day().filter(completion_date__gte=since))
+        return list(
+            DailyCompletionStats.objects.filter(date__gte=since, completed_count__gt=0)
+            .order_by('date').values('date', 'completed_count')
+        )
+    
+    # ===== AGREGATY NA BIEŻĄCO (DRY - odbudowa i bazy bez triggerów) =====
+    
+    @staticmethod
+    def _count_by_priority() -> QuerySet:
+        return (
+            Task.objects.filter(deleted=False)
+            .values('priority_id', 'priority__name', 'priority__weight')
+            .annotate(
+                open_count=Count('pk', filter=Q(completion_date__isnull=True)),
+                completed_count=Count('pk', filter=Q(completion_date__isnull=False)),
+            )
+            .order_by('-priority__weight', 'priority_id')
+        )
+    
+    @staticmethod
+    def _count_by_day() -> QuerySet:
+        return (
+            Task.objects.filter(DONE_TASKS)
+            .values(date=F('completion_date'))
+            .annotate(completed_count=Count('pk'))
+            .order_by('date')
+        )
+    
+    # ===== MODYFIKACJA DANYCH =====
+    
+    @staticmethod
+    def rebuild() -> tuple:
+        """
+        Przelicz liczniki od zera (jedna transakcja - blokada zapisu SQLite
+        wstrzymuje triggery równoległych zapisów). Zwraca (priorytety, dni).
+        """
+        with transaction.atomic():
+            PriorityStats.objects.all().delete()
+            DailyCompletionStats.objects.all().delete()
+            priorities = PriorityStats.objects.bulk_create([
+                PriorityStats(priority_id=row['priority_id'], open_count=row['open_count'],
+                              completed_count=row['completed_count'])
+                for row in StatsDAO._count_by_priority()
+            ], batch_size=TaskDAO.BULK_BATCH_SIZE)
+            days = DailyCompletionStats.objects.bulk_create([
+                DailyCompletionStats(date=row['date'], completed_count=row['completed_count'])
+                for row in StatsDAO._count_by_day()
+            ], batch_size=TaskDAO.BULK_BATCH_SIZE)
+            ChangeCounterDAO.bump()
+        return len(priorities), len(days)
+
+
+# ==================== ASYNC (widoki ASGI) ====================
+
+class AsyncTaskDAO:
+    """
+    Asynchroniczne odczyty tasków - te same query co TaskDAO, wykonane async
+    ORM (aiterator, aget). Zwraca listy: w widoku async nie wolno leniwie
+    dociągać danych z bazy (SynchronousOnlyOperation).
+    """
+    
+    @staticmethod
+    async def get_uncompleted(order_by: list = None) -> list:
+        """Nieukończone taski (aiterator - paczki kursora bez blokowania pętli)."""
+        return [task async for task in TaskDAO.get_uncompleted(order_by).aiterator()]
+    
+    @staticmethod
+    async def get_by_id(pk: int) -> Task:
+        """Task po ID (DoesNotExist jak w TaskDAO.get_by_id)."""
+        return await TaskDAO._active().aget(pk=pk)
+    
+    @staticmethod
+    async def get_page(queryset: QuerySet, field: str, descending: bool,
+                       after: tuple = None, limit: int = 50) -> list:
+        """
+        Strona keyset jak TaskDAO.get_page. Bez aiterator - w Django 4.2 nie
+        obsługuje prefetch_related; async for pobiera stronę jednym przejściem.
+        """
+        return [task async for task in TaskDAO._page_query(queryset, field, descending, after, limit)]
+
+
+class AsyncAttachmentDAO:
+    """Asynchroniczne odczyty załączników."""
     
     @staticmethod
-    def delete(attachment: Attachment) -> None:
-        """Usuń załącznik (trwale)."""
-        if attachment.file:
-            attachment.file.delete(save=False)
-        attachment.delete()
+    async def get_for_task(task_id: int) -> list:
+        """Załączniki taska (kolejność jak AttachmentDAO.get_for_task)."""
+        return [attachment async for attachment in AttachmentDAO.get_for_task(task_id)]
@@ -0,0 +1,46 @@
+"""
+Dekoratory widoków async (ASGI). W Django 4.2 login_required,
+require_http_methods i @api_view z DRF obsługują tylko widoki sync.
+request.user jest ładowany przez sync_to_async - odczyt sesji i użytkownika
+to zapytania do bazy, niedozwolone bezpośrednio w pętli zdarzeń. Później
+request.user jest już w pamięci (np. dla ETag).
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import JsonResponse
+
+
+async def _is_authenticated(request) -> bool:
+    return await sync_to_async(lambda: request.user.is_authenticated)()
+
+
+def async_login_required(view):
+    """login_required dla widoku async (przekierowanie na LOGIN_URL)."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not await _is_authenticated(request):
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_api_view(view):
+    """
+    @api_view(['GET']) + IsAuthenticated dla widoku async: te same kody
+    i komunikaty co DRF (403 przed 405, jak w APIView.dispatch).
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not await _is_authenticated(request):
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+        if request.method not in ('GET', 'HEAD'):
+            response = JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+            response.headers['Allow'] = 'GET, HEAD'
+            return response
+        return await view(request, *args, **kwargs)
+
+    return wrapper
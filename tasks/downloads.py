@@ -0,0 +1,127 @@
+"""
+Serwowanie plików załączników.
+Kolejno: 304 po ETag (SHA-256 treści) -> offload do serwera WWW
+(X-Sendfile / X-Accel-Redirect) -> Range (206) -> FileResponse
+(wsgi.file_wrapper = sendfile bez kopiowania przez Pythona).
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+def serve_attachment(request, attachment):
+    """Odpowiedź z plikiem załącznika (pobieranie jako attachment)."""
+    etag = f'"{attachment.sha256}"' if attachment.sha256 else None
+    last_modified = int(attachment.uploaded_at.timestamp())
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    content_type = mimetypes.guess_type(attachment.filename)[0] or 'application/octet-stream'
+    backend = settings.ATTACHMENT_SENDFILE_BACKEND
+    if backend:
+        response = _offload_response(attachment, backend, content_type)
+    else:
+        response = _file_response(request, attachment, etag, content_type)
+
+    response.headers['Content-Disposition'] = content_disposition_header(True, attachment.filename)
+    response.headers['Last-Modified'] = http_date(last_modified)
+    if etag:
+        response.headers['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _offload_response(attachment, backend, content_type):
+    """Pusta odpowiedź - plik (wraz z Range) wysyła serwer WWW."""
+    response = HttpResponse(content_type=content_type)
+    if backend == 'x-accel-redirect':
+        prefix = settings.ATTACHMENT_SENDFILE_URL_PREFIX.rstrip('/')
+        response.headers['X-Accel-Redirect'] = f'{prefix}/{quote(attachment.file.name)}'
+    elif backend == 'x-sendfile':
+        response.headers['X-Sendfile'] = attachment.file.path
+    else:
+        raise ValueError(f'Unknown ATTACHMENT_SENDFILE_BACKEND: {backend!r}')
+    return response
+
+
+def _file_response(request, attachment, etag, content_type):
+    """Odpowiedź z Django: 206 dla pojedynczego zakresu, inaczej cały plik."""
+    path = attachment.file.path
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        raise Http404('Attachment file is missing')
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and _if_range_matches(request, etag):
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response.headers['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(path, start, end - start + 1),
+            status=206, content_type=content_type)
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response.headers['Content-Length'] = str(end - start + 1)
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _if_range_matches(request, etag):
+    """If-Range: zakres tylko gdy klient ma aktualną wersję (porównanie silne)."""
+    if_range = request.headers.get('If-Range')
+    return if_range is None or (etag is not None and if_range == etag)
+
+
+def _parse_range(header, size):
+    """
+    Nagłówek Range -> (start, end) włącznie. None = zignoruj (cały plik,
+    np. wiele zakresów), False = zakres niespełnialny (416).
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-N: ostatnie N bajtów
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        while length > 0:
+            chunk = source.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
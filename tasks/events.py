@@ -0,0 +1,159 @@
+"""
+Zdarzenia zmian tasków na żywo (SSE, widok task_events). Broker w pamięci
+procesu rozsyła zdarzenia do subskrybentów (połączeń SSE) - bez zewnętrznej
+usługi. Jak LocMemCache: zdarzenie dociera tylko do klientów podłączonych
+do procesu, który wykonał zmianę; przy wielu workerach potrzebny wspólny
+kanał (np. Redis pub/sub) albo jeden proces ASGI.
+
+Zdarzenia (kompaktowe, JS nakłada je na istniejące tabele):
+    complete - ids, completion_date
+    restore  - ids, tasks (wiersze jak w save - wiersza może nie być u klienta)
+    delete   - ids
+    save     - task (id, title, date_added, completion_date, priority)
+    reset    - klient nie nadążył / zgubił ciągłość: pełne przeładowanie
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+class Subscription:
+    """Kolejka zdarzeń jednego połączenia SSE (w jego pętli zdarzeń)."""
+
+    def __init__(self, loop, maxsize: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.backlog = []
+        # ID ostatniego zdarzenia znanego klientowi (Last-Event-ID przy wznowieniu)
+        self.last_id = None
+
+    def put(self, event: dict):
+        """Wywoływane z dowolnego wątku (publish z widoku sync)."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # pętla zamknięta - subskrypcja zaraz zostanie usunięta
+
+    def _put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Wolny klient: zamiast gubić zdarzenia po cichu - pełne przeładowanie
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_reset_event(event['id']))
+
+
+class EventBroker:
+    """Fan-out zdarzeń do subskrybentów + krótka historia do wznowień (Last-Event-ID)."""
+
+    def __init__(self, history: int = 256):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history)
+        # ID od znacznika czasu - po restarcie procesu stare Last-Event-ID nie pasują
+        self._last_id = time.time_ns()
+
+    def publish(self, event_type: str, data: dict) -> dict:
+        with self._lock:
+            self._last_id += 1
+            event = {'id': self._last_id, 'type': event_type, **data}
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+        return event
+
+    def subscribe(self, loop, last_event_id: int = None, queue_size: int = 100) -> Subscription:
+        """
+        Nowa subskrypcja. Z last_event_id backlog zawiera zdarzenia, które
+        klient przegapił, albo reset gdy nie ma ich już w historii.
+        """
+        subscription = Subscription(loop, queue_size)
+        with self._lock:
+            subscription.last_id = self._last_id
+            if last_event_id is not None and last_event_id != self._last_id:
+                missed = [event for event in self._history if event['id'] > last_event_id]
+                oldest = self._history[0]['id'] if self._history else self._last_id + 1
+                if last_event_id < oldest - 1 or last_event_id > self._last_id:
+                    subscription.backlog = [_reset_event(self._last_id)]
+                else:
+                    subscription.backlog = missed
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+broker = EventBroker(settings.TASK_EVENTS_HISTORY)
+
+
+def publish(event_type: str, **data) -> None:
+    """Wyślij zdarzenie po zatwierdzeniu bieżącej transakcji."""
+    transaction.on_commit(lambda: broker.publish(event_type, data))
+
+
+def _reset_event(event_id: int) -> dict:
+    return {'id': event_id, 'type': 'reset'}
+
+
+def format_event(event: dict) -> str:
+    """Zdarzenie w formacie text/event-stream (id = Last-Event-ID przy wznowieniu)."""
+    data = json.dumps({key: value for key, value in event.items() if key != 'id'},
+                      cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f'id: {event["id"]}\ndata: {data}\n\n'
+
+
+def parse_last_event_id(value: str):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def stream(last_event_id: int = None):
+    """
+    Strumień SSE dla StreamingHttpResponse (async generator, ASGI).
+    Komentarz heartbeat co TASK_EVENTS_HEARTBEAT s - proxy nie zamyka
+    bezczynnego połączenia. Django 4.2 nie przerywa strumienia po rozłączeniu
+    klienta (serwer po cichu gubi zapisy), więc połączenie kończy się samo po
+    TASK_EVENTS_MAX_AGE s: EventSource łączy się ponownie z Last-Event-ID
+    (wysłanym na końcu), a porzucona subskrypcja nie wisi w nieskończoność.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.TASK_EVENTS_MAX_AGE
+    subscription = broker.subscribe(loop, last_event_id, settings.TASK_EVENTS_QUEUE_SIZE)
+    try:
+        yield f'retry: {settings.TASK_EVENTS_RETRY_MS}\n\n'
+        for event in subscription.backlog:
+            yield _delivered(subscription, event)
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), min(settings.TASK_EVENTS_HEARTBEAT, remaining))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield _delivered(subscription, event)
+        # Samo id (bez data) ustawia Last-Event-ID w przeglądarce - wznowienie bez luki
+        yield f'id: {subscription.last_id}\n\n'
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def _delivered(subscription: Subscription, event: dict) -> str:
+    subscription.last_id = event['id']
+    return format_event(event)
@@ -0,0 +1,256 @@
+"""
+Instrumentacja requestów (opt-in: TASK_INSTRUMENTATION = True).
+Per request: liczba zapytań i czas bazy (connection.execute_wrapper), czas
+serializacji (DRF) i renderowania szablonów. Wynik trafia do nagłówka
+Server-Timing i jest sumowany per nazwa URL do endpointu metrics (format
+Prometheus). Budżety zapytań per widok w TASK_QUERY_BUDGETS.
+Metryki są per proces (jak LocMemCache) - przy wielu workerach scrapuj każdy.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('db', 'serialize', 'render')
+
+# Progi histogramu czasu odpowiedzi (sekundy)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_current = contextvars.ContextVar('tasks_request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Widok wykonał więcej zapytań niż pozwala TASK_QUERY_BUDGETS."""
+
+
+class RequestMetrics:
+    """Pomiary jednego requestu; instancja jest też wrapperem execute połączeń."""
+
+    def __init__(self):
+        self.queries = 0
+        self.durations = dict.fromkeys(STAGES, 0.0)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.durations['db'] += time.perf_counter() - start
+
+
+@contextmanager
+def timed(stage: str):
+    """Dolicz czas bloku do etapu bieżącego requestu (no-op bez instrumentacji)."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.durations[stage] += time.perf_counter() - start
+
+
+# ===== AGREGACJA =====
+
+class MetricsRegistry:
+    """Sumy per widok (nazwa URL) - liczniki i histogram czasu odpowiedzi."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view: str, metrics: RequestMetrics, elapsed: float):
+        with self._lock:
+            entry = self._views.get(view)
+            if entry is None:
+                entry = self._views[view] = {
+                    'requests': 0,
+                    'queries': 0,
+                    'seconds': dict.fromkeys(STAGES + ('total',), 0.0),
+                    'buckets': [0] * len(LATENCY_BUCKETS),
+                }
+            entry['requests'] += 1
+            entry['queries'] += metrics.queries
+            for stage, duration in metrics.durations.items():
+                entry['seconds'][stage] += duration
+            entry['seconds']['total'] += elapsed
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if elapsed <= bound:
+                    entry['buckets'][index] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                view: {**entry, 'seconds': dict(entry['seconds']), 'buckets': list(entry['buckets'])}
+                for view, entry in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render_prometheus(self) -> str:
+        """Format tekstowy Prometheus (exposition format 0.0.4)."""
+        views = sorted(self.snapshot().items())
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+
+        family('tasks_http_requests_total', 'counter', 'Requests per view.',
+               [f'tasks_http_requests_total{{view="{view}"}} {entry["requests"]}'
+                for view, entry in views])
+        family('tasks_db_queries_total', 'counter', 'Database queries per view.',
+               [f'tasks_db_queries_total{{view="{view}"}} {entry["queries"]}'
+                for view, entry in views])
+        family('tasks_stage_seconds_total', 'counter', 'Time per view and stage (db, serialize, render).',
+               [f'tasks_stage_seconds_total{{view="{view}",stage="{stage}"}} {entry["seconds"][stage]:.6f}'
+                for view, entry in views for stage in STAGES])
+
+        samples = []
+        for view, entry in views:
+            for bound, count in zip(LATENCY_BUCKETS, entry['buckets']):
+                samples.append(f'tasks_http_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {count}')
+            samples.append(f'tasks_http_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {entry["requests"]}')
+            samples.append(f'tasks_http_request_duration_seconds_sum{{view="{view}"}} {entry["seconds"]["total"]:.6f}')
+            samples.append(f'tasks_http_request_duration_seconds_count{{view="{view}"}} {entry["requests"]}')
+        family('tasks_http_request_duration_seconds', 'histogram', 'Response time per view.', samples)
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+# ===== MIDDLEWARE =====
+
+class InstrumentationMiddleware:
+    """
+    Pomiar requestu: Server-Timing, rejestr metryk, budżet zapytań.
+    Działa sync i async (ASGI): async ORM wykonuje zapytania w wątku
+    sync_to_async(thread_sensitive) requestu - tam zakładane są wrappery.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.TASK_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                _wrap_connections(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        stack = ExitStack()
+        try:
+            await sync_to_async(_wrap_connections)(stack, metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics, time.perf_counter() - start)
+
+    def _finish(self, request, response, metrics: RequestMetrics, elapsed: float):
+        match = request.resolver_match
+        view = (match.url_name if match else None) or 'unresolved'
+        registry.record(view, metrics, elapsed)
+        response.headers['Server-Timing'] = _server_timing(metrics, elapsed)
+        _check_query_budget(view, metrics.queries)
+        return response
+
+
+def _wrap_connections(stack: ExitStack, metrics: RequestMetrics):
+    """Wrapper execute na połączeniach bieżącego wątku (połączenia są per wątek)."""
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(metrics))
+
+
+def _server_timing(metrics: RequestMetrics, elapsed: float) -> str:
+    entries = [f'db;dur={metrics.durations["db"] * 1000:.2f};desc="{metrics.queries} queries"']
+    entries += [f'{stage};dur={metrics.durations[stage] * 1000:.2f}' for stage in STAGES[1:]]
+    entries.append(f'total;dur={elapsed * 1000:.2f}')
+    return ', '.join(entries)
+
+
+def _check_query_budget(view: str, queries: int):
+    budget = settings.TASK_QUERY_BUDGETS.get(view)
+    if budget is None or queries <= budget:
+        return
+    message = f'View {view!r} ran {queries} queries (budget {budget})'
+    if settings.TASK_QUERY_BUDGET_ACTION == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def is_metrics_request_allowed(request) -> bool:
+    """Endpoint metrics: token (Authorization: Bearer) albo zalogowany staff."""
+    token = settings.TASK_METRICS_TOKEN
+    if token and request.headers.get('Authorization') == f'Bearer {token}':
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+# ===== ETAPY: SERIALIZACJA I SZABLONY =====
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer DRF liczony do etapu 'serialize'."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('serialize'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Backend szablonów Django z pomiarem renderowania (etap 'render')."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
+
+class _TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        with timed('render'):
+            return self.template.render(context, request)
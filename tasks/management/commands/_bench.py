@@ -0,0 +1,182 @@
+"""
+Wspólne elementy komend bench_* (moduł z "_" - Django nie traktuje go jako komendy).
+"""
+
+import asyncio
+import datetime
+import io
+import os
+import secrets
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from tasks.models import Priority, Task
+
+
+@contextmanager
+def temporary_database():
+    """
+    Osobna baza SQLite w katalogu tymczasowym (migracje jak w testach),
+    db.sqlite3 nietknięta. Po wyjściu baza jest usuwana.
+    """
+    directory = tempfile.mkdtemp(prefix='bench_')
+    connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'bench.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection.settings_dict['NAME']
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def create_tasks(count: int, rng, priorities: int = 5, completed_ratio: float = 0.0) -> list:
+    """Priorytety i taski z losową treścią i datami. Zwraca [(id, completion_date)]."""
+    created = Priority.objects.bulk_create(
+        Priority(name=f'Priority {i}', weight=i * 10) for i in range(priorities))
+    today = timezone.now().date()
+    tasks = []
+    for i in range(count):
+        priority = rng.choice(created)
+        tasks.append(Task(
+            title=f'Task {i}', content='Lorem ipsum dolor sit amet. ' * rng.randint(1, 20),
+            priority=priority, priority_weight=priority.weight,
+            date_added=today - datetime.timedelta(days=rng.randint(0, 365)),
+            completion_date=today if rng.random() < completed_ratio else None,
+        ))
+    Task.objects.bulk_create(tasks, batch_size=2000)
+    return list(Task.objects.values_list('id', 'completion_date'))
+
+
+def session_credentials(user) -> tuple:
+    """
+    (ciasteczka, nagłówki) zalogowanej sesji dla wsgi_request/asgi_request:
+    sesja + token CSRF (ciasteczko i X-CSRFToken) dla requestów POST.
+    """
+    client = Client()
+    client.force_login(user)
+    csrf_token = secrets.token_hex(16)
+    cookies = {
+        settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value,
+        settings.CSRF_COOKIE_NAME: csrf_token,
+    }
+    return cookies, {'HTTP_X_CSRFTOKEN': csrf_token}
+
+
+def latency_summary(seconds: list) -> dict:
+    """p50/p95/p99 i średnia w milisekundach."""
+    if len(seconds) < 2:
+        value = round(seconds[0] * 1000, 3) if seconds else None
+        return {'p50_ms': value, 'p95_ms': value, 'p99_ms': value, 'mean_ms': value}
+    cuts = statistics.quantiles(seconds, n=100, method='inclusive')
+    return {
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'mean_ms': round(statistics.fmean(seconds) * 1000, 3),
+    }
+
+
+def git_revision() -> str:
+    """Bieżący commit (do porównań wyników między commitami), None poza repozytorium."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def wsgi_request(handler, method: str, path: str, cookies: dict = None, headers: dict = None) -> int:
+    """
+    Request przez handler WSGI (jak serwer aplikacji, nie klient testowy:
+    request_started/finished zamykają połączenia wg CONN_MAX_AGE).
+    Zwraca kod statusu; treść odpowiedzi jest konsumowana.
+    """
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'testserver',
+        'CONTENT_LENGTH': '0',
+        'HTTP_COOKIE': _cookie_header(cookies),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        **(headers or {}),
+    }
+    status = []
+
+    def start_response(value, response_headers, exc_info=None):
+        status.append(int(value.split(' ', 1)[0]))
+
+    result = handler(environ, start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return status[0]
+
+
+async def asgi_request(handler, method: str, path: str, cookies: dict = None, headers: dict = None) -> int:
+    """
+    Request przez handler ASGI, tak jak wywołuje go serwer (uvicorn): scope,
+    receive, send w pętli zdarzeń. headers w formacie META (HTTP_X_...).
+    Zwraca kod statusu.
+    """
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+        'headers': [(b'host', b'testserver'), (b'cookie', _cookie_header(cookies).encode())] + [
+            (name[5:].replace('_', '-').lower().encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ],
+    }
+    body_sent = False
+    status = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Klient nie rozłącza się przed końcem odpowiedzi
+        await asyncio.Future()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await handler(scope, receive, send)
+    return status[0]
+
+
+def _cookie_header(cookies: dict = None) -> str:
+    return '; '.join(f'{name}={value}' for name, value in (cookies or {}).items())
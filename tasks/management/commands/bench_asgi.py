@@ -0,0 +1,168 @@
+"""
+Benchmark ASGI vs WSGI: lista, szczegóły i oba endpointy API sortowania
+przy C równoległych requestach. Tryby:
+    wsgi       - WSGIHandler w C wątkach (jak gunicorn --threads), widoki sync
+    asgi-sync  - ASGIHandler w jednej pętli zdarzeń, C korutyn (jak uvicorn),
+                 widoki sync (każdy request przechodzi przez sync_to_async)
+    asgi-async - jak wyżej, natywne widoki async (*_async, async ORM)
+Wynik: requests/s, p50/p95/p99 i liczba otwartych połączeń do bazy per tryb
+i scenariusz (JSON).
+
+    python manage.py bench_asgi --concurrency 8 --requests 10
+"""
+
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ._bench import (
+    asgi_request, create_tasks, git_revision, latency_summary, session_credentials,
+    temporary_database, wsgi_request,
+)
+
+MODES = ['wsgi', 'asgi-sync', 'asgi-async']
+SCENARIOS = ['task_list', 'task_detail', 'api_uncompleted', 'api_completed']
+
+# Scenariusz -> nazwa URL widoku sync (wariant async: nazwa + '_async')
+SCENARIO_URLS = {
+    'task_list': 'task_list',
+    'task_detail': 'task_detail',
+    'api_uncompleted': 'api_tasks_uncompleted',
+    'api_completed': 'api_tasks_completed',
+}
+
+
+class Command(BaseCommand):
+    help = 'Porównanie ASGI (widoki sync i async) z WSGI: requests/s i opóźnienia ogonowe.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8, help='Równoległe requesty.')
+        parser.add_argument('--requests', type=int, default=10, help='Requestów na "klienta" i scenariusz.')
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+        parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+        parser.add_argument('--output', help='Zapisz wynik JSON do pliku.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency and --requests must be positive.')
+        rng = random.Random(options['seed'])
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']), temporary_database():
+            cache.clear()
+            rows = create_tasks(options['tasks'], rng, completed_ratio=0.3)
+            cookies, headers = session_credentials(User.objects.create_user('bench', password='bench'))
+            self.data = {'ids': [pk for pk, _ in rows], 'cookies': cookies, 'headers': headers, 'rng': rng}
+            connections.close_all()
+            results = {
+                'meta': {
+                    'revision': git_revision(),
+                    'timestamp': timezone.now().isoformat(timespec='seconds'),
+                    'tasks': options['tasks'],
+                    'concurrency': options['concurrency'],
+                    'requests_per_client': options['requests'],
+                },
+                'modes': {mode: self._run_mode(mode, options) for mode in options['modes']},
+            }
+            cache.clear()
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as target:
+                target.write(output + '\n')
+        self.stdout.write(output)
+
+    def _paths(self, mode, scenario, count):
+        url_name = SCENARIO_URLS[scenario] + ('_async' if mode == 'asgi-async' else '')
+        if scenario == 'task_detail':
+            return [reverse(url_name, args=[self.data['rng'].choice(self.data['ids'])]) for _ in range(count)]
+        return [reverse(url_name)] * count
+
+    def _run_mode(self, mode, options):
+        results = {}
+        for scenario in options['scenarios']:
+            opened = []
+
+            def counter(sender, **kwargs):
+                opened.append(1)
+
+            connection_created.connect(counter)
+            try:
+                # Rozgrzewka: cache listy i pierwsze połączenia nie wchodzą do pomiaru
+                run = self._run_wsgi if mode == 'wsgi' else self._run_asgi
+                run(self._paths(mode, scenario, options['concurrency']), options['concurrency'])
+                opened.clear()
+                paths = self._paths(mode, scenario, options['concurrency'] * options['requests'])
+                timings, elapsed = run(paths, options['concurrency'])
+            finally:
+                connection_created.disconnect(counter)
+                connections.close_all()
+            results[scenario] = {
+                'requests': len(timings),
+                **latency_summary(timings),
+                'throughput_rps': round(len(timings) / elapsed, 1),
+                'connections_opened': len(opened),
+            }
+        return results
+
+    def _run_wsgi(self, paths, concurrency):
+        """C wątków, każdy z własnym połączeniem (jak worker WSGI z wątkami)."""
+        handler = WSGIHandler()
+        data = self.data
+
+        def worker(chunk):
+            timings = []
+            try:
+                for path in chunk:
+                    start = time.perf_counter()
+                    _check(path, wsgi_request(handler, 'GET', path, data['cookies'], data['headers']))
+                    timings.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+            return timings
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            chunks = list(executor.map(worker, _split(paths, concurrency)))
+        return [timing for chunk in chunks for timing in chunk], time.perf_counter() - start
+
+    def _run_asgi(self, paths, concurrency):
+        """C korutyn w jednej pętli zdarzeń (jak uvicorn z jednym workerem)."""
+        return asyncio.run(self._asgi_load(ASGIHandler(), paths, concurrency))
+
+    async def _asgi_load(self, handler, paths, concurrency):
+        data = self.data
+
+        async def worker(chunk):
+            timings = []
+            for path in chunk:
+                start = time.perf_counter()
+                _check(path, await asgi_request(handler, 'GET', path, data['cookies'], data['headers']))
+                timings.append(time.perf_counter() - start)
+            return timings
+
+        start = time.perf_counter()
+        chunks = await asyncio.gather(*(worker(chunk) for chunk in _split(paths, concurrency)))
+        return [timing for chunk in chunks for timing in chunk], time.perf_counter() - start
+
+
+def _split(items: list, parts: int) -> list:
+    return [items[index::parts] for index in range(parts)]
+
+
+def _check(path: str, status_code: int):
+    if status_code >= 400:
+        raise CommandError(f'{path} returned {status_code}')
@@ -0,0 +1,194 @@
+"""
+Benchmark współbieżności SQLite: R wątków czyta (API i szczegóły taska),
+a w tym samym czasie W wątków na przemian kończy i przywraca taski.
+Requesty idą przez handler WSGI, więc połączenia żyją wg CONN_MAX_AGE jak
+pod serwerem aplikacji. Profile:
+    baseline   - journal_mode=DELETE, synchronous=FULL, CONN_MAX_AGE=0
+    wal        - TASK_SQLITE_PRAGMAS, CONN_MAX_AGE=0
+    production - TASK_SQLITE_PRAGMAS i CONN_MAX_AGE z settings
+
+    python manage.py bench_concurrency --readers 4 --writers 2 --duration 5
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.sqlite import read_pragmas
+
+from ._bench import (
+    create_tasks, git_revision, latency_summary, session_credentials, temporary_database, wsgi_request,
+)
+
+PROFILES = {
+    'baseline': ({'journal_mode': 'DELETE', 'synchronous': 'FULL'}, 0),
+    'wal': (settings.TASK_SQLITE_PRAGMAS, 0),
+    'production': (settings.TASK_SQLITE_PRAGMAS, settings.DATABASES['default'].get('CONN_MAX_AGE', 0)),
+}
+
+
+class Command(BaseCommand):
+    help = 'Przepustowość odczytów SQLite przy równoległych complete/restore (profile PRAGM i połączeń).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5.0, help='Sekundy na profil.')
+        parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+        parser.add_argument('--output', help='Zapisz wynik JSON do pliku.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['readers'] < 1 or options['duration'] <= 0:
+            raise CommandError('--readers and --duration must be positive.')
+        rng = random.Random(options['seed'])
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']), temporary_database():
+            cache.clear()
+            self.data = self._populate(options, rng)
+            results = {
+                'meta': {
+                    'revision': git_revision(),
+                    'timestamp': timezone.now().isoformat(timespec='seconds'),
+                    'tasks': options['tasks'],
+                    'readers': options['readers'],
+                    'writers': options['writers'],
+                    'duration_s': options['duration'],
+                },
+                'profiles': {name: self._run_profile(name, options) for name in options['profiles']},
+            }
+            cache.clear()
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as target:
+                target.write(output + '\n')
+        self.stdout.write(output)
+
+    # ===== DANE =====
+
+    def _populate(self, options, rng):
+        ids = [pk for pk, _ in create_tasks(options['tasks'], rng)]
+        cookies, headers = session_credentials(User.objects.create_user('bench', password='bench'))
+        writers = max(options['writers'], 1)
+        return {
+            'ids': ids,
+            # Każdy pisarz ma własną pulę tasków - konflikty tylko na poziomie blokad bazy
+            'writer_ids': [ids[index::writers] for index in range(writers)],
+            'cookies': cookies,
+            'headers': headers,
+        }
+
+    # ===== PROFIL =====
+
+    def _run_profile(self, name, options):
+        pragmas, conn_max_age = PROFILES[name]
+        connections.close_all()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        opened = []
+
+        def counter(sender, **kwargs):
+            opened.append(1)
+
+        connection_created.connect(counter)
+        request_logger = logging.getLogger('django.request')
+        log_level = request_logger.level
+        # 500 (database is locked) liczymy w wynikach zamiast logować każdy
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            with override_settings(TASK_SQLITE_PRAGMAS=pragmas):
+                applied = read_pragmas(connection, ['journal_mode', 'synchronous', 'busy_timeout'])
+                connection.close()
+                return {
+                    'pragmas': applied,
+                    'conn_max_age': conn_max_age,
+                    **self._run_load(WSGIHandler(), options),
+                    'connections_opened': len(opened),
+                }
+        finally:
+            request_logger.setLevel(log_level)
+            connection_created.disconnect(counter)
+            connections.close_all()
+
+    def _run_load(self, handler, options):
+        data = self.data
+        stop = threading.Event()
+        lock = threading.Lock()
+        reads, writes = [], []
+        errors = {'read': 0, 'write': 0}
+        read_urls = [reverse('api_tasks_uncompleted'), reverse('api_tasks_completed')]
+
+        def request(method, path):
+            start = time.perf_counter()
+            status = wsgi_request(handler, method, path, data['cookies'], data['headers'])
+            return status, time.perf_counter() - start
+
+        def reader(index):
+            rng = random.Random(index)
+            local, failed = [], 0
+            while not stop.is_set():
+                if len(local) % 3 == 2:
+                    path = reverse('task_detail', args=[rng.choice(data['ids'])])
+                else:
+                    path = read_urls[len(local) % 3]
+                status, elapsed = request('GET', path)
+                local.append(elapsed)
+                failed += status >= 400
+            connection.close()
+            with lock:
+                reads.extend(local)
+                errors['read'] += failed
+
+        def writer(index):
+            ids = data['writer_ids'][index]
+            local, failed = [], 0
+            position = 0
+            while not stop.is_set():
+                pk = ids[position % len(ids)]
+                position += 1
+                for url_name in ('task_complete', 'task_restore'):
+                    status, elapsed = request('POST', reverse(url_name, args=[pk]))
+                    local.append(elapsed)
+                    failed += status >= 400
+            connection.close()
+            with lock:
+                writes.extend(local)
+                errors['write'] += failed
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(options['readers'])]
+        threads += [threading.Thread(target=writer, args=(i,)) for i in range(options['writers'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        return {
+            'reads': {
+                'requests': len(reads),
+                'errors': errors['read'],
+                **latency_summary(reads),
+                'throughput_rps': round(len(reads) / elapsed, 1),
+            },
+            'writes': {
+                'requests': len(writes),
+                'errors': errors['write'],
+                **latency_summary(writes),
+                'throughput_rps': round(len(writes) / elapsed, 1),
+            },
+        }
@@ -0,0 +1,110 @@
+"""
+Benchmark renderowania wierszy listy zadań (tasks/rows.py) przy N wierszach:
+    template           - szablon wiersza dla każdego taska (jak przed zmianą)
+    compiled           - wiersz skompilowany do str.format raz na tabelę
+    cached_cold        - fragmenty w cache, pusty cache (wszystkie renderowane)
+    cached_warm        - wszystkie fragmenty w cache
+    cached_one_changed - jeden task zmieniony od poprzedniego renderu
+Do tego cała strona task_list (klient testowy, dane listy z cache) per strategia.
+Wynik JSON: p50/p95/mean w ms.
+
+    python manage.py bench_rows --tasks 10000
+"""
+
+import json
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import rows
+from tasks.dao import TaskDAO
+
+from ._bench import create_tasks, git_revision, latency_summary, temporary_database
+
+
+class Command(BaseCommand):
+    help = 'Czas renderowania wierszy listy zadań: szablon vs skompilowany wiersz vs cache fragmentów.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--output', help='Zapisz wynik JSON do pliku.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive.')
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']), temporary_database():
+            cache.clear()
+            caches[settings.TASK_ROW_CACHE].clear()
+            create_tasks(options['tasks'], random.Random(options['seed']))
+            tasks = list(TaskDAO.get_uncompleted())
+            results = {
+                'meta': {
+                    'revision': git_revision(),
+                    'timestamp': timezone.now().isoformat(timespec='seconds'),
+                    'rows': len(tasks),
+                    'repeat': options['repeat'],
+                },
+                'rows': self._measure_rows(tasks, options['repeat']),
+                'page': self._measure_page(options['repeat']),
+            }
+            cache.clear()
+            caches[settings.TASK_ROW_CACHE].clear()
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as target:
+                target.write(output + '\n')
+        self.stdout.write(output)
+
+    def _measure_rows(self, tasks, repeat):
+        row_cache = caches[settings.TASK_ROW_CACHE]
+        expected = rows.render_rows(tasks, False, 'template')
+
+        def render(renderer):
+            html = rows.render_rows(tasks, False, renderer)
+            if html != expected:
+                raise CommandError(f'{renderer} renderer output differs from the template')
+
+        def change_one():
+            # Jak po edycji taska: nowy change_seq = nowy klucz fragmentu
+            tasks[0].change_seq += 1
+
+        return {
+            'template': _timed(lambda: render('template'), repeat),
+            'compiled': _timed(lambda: render('compiled'), repeat),
+            'cached_cold': _timed(lambda: render('cached'), repeat, setup=row_cache.clear),
+            'cached_warm': _timed(lambda: render('cached'), repeat),
+            'cached_one_changed': _timed(lambda: render('cached'), repeat, setup=change_one),
+        }
+
+    def _measure_page(self, repeat):
+        client = Client()
+        client.force_login(User.objects.create_user('bench', password='bench'))
+        url = reverse('task_list')
+        results = {}
+        for renderer in rows.RENDERERS:
+            with override_settings(TASK_ROW_RENDERER=renderer):
+                client.get(url)  # rozgrzewka: dane listy i fragmenty w cache
+                results[renderer] = _timed(lambda: client.get(url), repeat)
+        return results
+
+
+def _timed(func, repeat, setup=None) -> dict:
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    summary = latency_summary(timings)
+    return {'p50_ms': summary['p50_ms'], 'p95_ms': summary['p95_ms'], 'mean_ms': summary['mean_ms']}
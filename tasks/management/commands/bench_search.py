@@ -0,0 +1,100 @@
+"""
+Benchmark wyszukiwania: indeks FTS5 (TaskDAO.search) vs dotychczasowe
+LIKE '%...%' po title/content (jak TaskAdmin.search_fields).
+Dane generowane w osobnej, tymczasowej bazie - db.sqlite3 nietknięta.
+
+    python manage.py bench_search --tasks 1000000
+"""
+
+import json
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from tasks.dao import TaskDAO
+from tasks.models import Priority, Task
+
+from ._bench import temporary_database
+
+# Słownik syntetyczny: sylaby -> słowa o zróżnicowanej częstości (Zipf)
+SYLLABLES = ['ra', 'port', 'ko', 'mi', 'sja', 'bu', 'dżet', 'spot', 'ka', 'nie', 'plan', 'zad',
+             'wy', 'da', 'nie', 'stra', 'te', 'gia', 'klient', 'umo', 'wa', 'fak', 'tu', 'ra']
+
+
+def _vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, round(statistics.median(timings) * 1000, 2)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark wyszukiwania tasków (FTS5 vs LIKE) na wygenerowanych danych.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000)
+        parser.add_argument('--words', type=int, default=40, help='Słów w treści taska.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            vocabulary = self._populate(options)
+            results = self._measure(vocabulary, options['repeat'])
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def _populate(self, options):
+        rng = random.Random(42)
+        vocabulary = _vocabulary(5000, rng)
+        # Rozkład Zipfa: kilka słów bardzo częstych, długi ogon rzadkich
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+        priority = Priority.objects.create(name='Bench', weight=1)
+        start = time.perf_counter()
+        created = 0
+        while created < options['tasks']:
+            size = min(options['batch_size'], options['tasks'] - created)
+            tasks = []
+            for i in range(size):
+                words = rng.choices(vocabulary, weights, k=options['words'] + 4)
+                tasks.append(Task(
+                    title=' '.join(words[:4]), content=' '.join(words[4:]),
+                    priority=priority, priority_weight=1,
+                    completion_date=None if (created + i) % 4 else '2024-01-01'))
+            Task.objects.bulk_create(tasks)
+            created += size
+        self.stderr.write(f'Populated {created} tasks in {time.perf_counter() - start:.1f}s')
+        return vocabulary
+
+    def _measure(self, vocabulary, repeat):
+        # Słowo częste, średnie i rzadkie (pozycja w rankingu Zipfa)
+        terms = {'common': vocabulary[0], 'medium': vocabulary[200], 'rare': vocabulary[4000]}
+        results = []
+        for label, term in terms.items():
+            like = TaskDAO.get_uncompleted().filter(Q(title__icontains=term) | Q(content__icontains=term))
+            fts = TaskDAO.filter_matching(TaskDAO.get_uncompleted(), term)
+            like_count, like_count_ms = _timed(like.count, repeat)
+            fts_count, fts_count_ms = _timed(fts.count, repeat)
+            _, like_page_ms = _timed(lambda: list(like[:50]), repeat)
+            _, fts_page_ms = _timed(lambda: TaskDAO.search(term, 'uncompleted', 50), repeat)
+            results.append({
+                'term': label,
+                'matches_like': like_count,
+                'matches_fts': fts_count,
+                'like_count_ms': like_count_ms,
+                'fts_count_ms': fts_count_ms,
+                'like_first_page_ms': like_page_ms,
+                'fts_ranked_page_ms': fts_page_ms,
+            })
+        return results
@@ -0,0 +1,224 @@
+"""
+Benchmark aplikacji end-to-end przez klienta testowego Django (pełny stos
+middleware, widoki, szablony) na wygenerowanych danych w tymczasowej bazie.
+Scenariusze: task_list (z cache i zimny), task_detail, oba endpointy API,
+przejścia complete/restore/delete; do tego odczyty z W wątków naraz
+(workery WSGI w jednym procesie). Wynik: p50/p95/p99, zapytania na request,
+przepustowość - JSON do porównań między commitami (--compare).
+
+    python manage.py bench_suite --tasks 2000 --output bench.json
+    python manage.py bench_suite --compare bench.json
+"""
+
+import json
+import platform
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.instrumentation import RequestMetrics
+from tasks.models import Attachment
+
+from ._bench import create_tasks, git_revision, latency_summary, temporary_database
+
+READ_SCENARIOS = ['task_list', 'task_list_cold', 'task_detail', 'api_uncompleted', 'api_completed']
+WRITE_SCENARIOS = ['complete', 'restore', 'delete']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark widoków i API (latencja p50/p95/p99, zapytania, przepustowość).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--priorities', type=int, default=5)
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--attachments', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=50, help='Requestów na scenariusz.')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--workers', type=int, default=4, help='Wątki w teście współbieżnym (0 = pomiń).')
+        parser.add_argument('--scenarios', nargs='+', choices=READ_SCENARIOS + WRITE_SCENARIOS,
+                            default=READ_SCENARIOS + WRITE_SCENARIOS)
+        parser.add_argument('--output', help='Zapisz wynik JSON do pliku.')
+        parser.add_argument('--compare', help='Porównaj z wcześniejszym wynikiem JSON.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive.')
+        self.rng = random.Random(options['seed'])
+        # Bez setup_test_environment: szablony nie są instrumentowane (sygnały testowe)
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']), temporary_database():
+            cache.clear()
+            started = time.perf_counter()
+            self.data = self._populate(options)
+            self.stderr.write(f'Generated data in {time.perf_counter() - started:.1f}s')
+            results = {
+                'meta': self._meta(options),
+                'scenarios': {name: self._run_scenario(name, options) for name in options['scenarios']},
+            }
+            if options['workers']:
+                results['concurrent'] = self._run_concurrent(options)
+            cache.clear()
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as target:
+                target.write(output + '\n')
+        self.stdout.write(output)
+        if options['compare']:
+            self._compare(options['compare'], results)
+
+    # ===== DANE =====
+
+    def _populate(self, options):
+        user = User.objects.create_user('bench', password='bench')
+        ids = create_tasks(options['tasks'], self.rng, options['priorities'], completed_ratio=0.3)
+        attachments = [
+            Attachment(task_id=self.rng.choice(ids)[0], file=f'attachments/bench_{i}.bin',
+                       filename=f'bench_{i}.bin', sha256='', size=1024)
+            for i in range(options['attachments'])
+        ]
+        Attachment.objects.bulk_create(attachments, batch_size=2000)
+        return {
+            'user': user,
+            'open_ids': [pk for pk, done in ids if done is None],
+            'done_ids': [pk for pk, done in ids if done is not None],
+        }
+
+    def _meta(self, options):
+        return {
+            'revision': git_revision(),
+            'timestamp': timezone.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'priorities': options['priorities'],
+            'tasks': options['tasks'],
+            'attachments': options['attachments'],
+            'requests_per_scenario': options['requests'],
+            'workers': options['workers'],
+        }
+
+    # ===== SCENARIUSZE =====
+
+    def _client(self):
+        client = Client()
+        client.force_login(self.data['user'])
+        return client
+
+    def _request(self, client, name):
+        """(metoda, URL) następnego requestu scenariusza; przejścia zużywają ID z puli."""
+        data = self.data
+        if name in ('task_list', 'task_list_cold'):
+            return client.get, reverse('task_list')
+        if name == 'task_detail':
+            return client.get, reverse('task_detail', args=[self.rng.choice(data['open_ids'])])
+        if name == 'api_uncompleted':
+            return client.get, reverse('api_tasks_uncompleted')
+        if name == 'api_completed':
+            return client.get, reverse('api_tasks_completed')
+        if name == 'complete':
+            pk = data['open_ids'].pop()
+            data['done_ids'].append(pk)
+            return client.post, reverse('task_complete', args=[pk])
+        if name == 'restore':
+            pk = data['done_ids'].pop()
+            data['open_ids'].append(pk)
+            return client.post, reverse('task_restore', args=[pk])
+        pk = data['open_ids'].pop()
+        return client.post, reverse('task_delete', args=[pk])
+
+    def _timed_request(self, client, name):
+        method, url = self._request(client, name)
+        if name == 'task_list_cold':
+            cache.clear()
+        start = time.perf_counter()
+        response = method(url)
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise CommandError(f'{name}: {url} returned {response.status_code}')
+        return elapsed
+
+    def _run_scenario(self, name, options):
+        client = self._client()
+        for _ in range(options['warmup'] if name in READ_SCENARIOS else 0):
+            self._timed_request(client, name)
+        timings = []
+        metrics = RequestMetrics()
+        with connection.execute_wrapper(metrics):
+            for _ in range(options['requests']):
+                timings.append(self._timed_request(client, name))
+        total = sum(timings)
+        return {
+            'requests': len(timings),
+            **latency_summary(timings),
+            'queries_per_request': round(metrics.queries / len(timings), 2),
+            'throughput_rps': round(len(timings) / total, 1),
+        }
+
+    def _run_concurrent(self, options):
+        """Mieszanka odczytów z W wątków; każdy wątek = własny klient i połączenie."""
+        workers = options['workers']
+        per_worker = options['requests']
+        timings, lock = [], threading.Lock()
+        mix = ['task_list', 'task_detail', 'api_uncompleted', 'api_completed']
+
+        def worker(index):
+            client = self._client()
+            local = []
+            try:
+                for i in range(per_worker):
+                    local.append(self._timed_request(client, mix[(index + i) % len(mix)]))
+            finally:
+                connection.close()
+            with lock:
+                timings.extend(local)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(worker, range(workers)))
+        elapsed = time.perf_counter() - start
+        return {
+            'workers': workers,
+            'requests': len(timings),
+            **latency_summary(timings),
+            'throughput_rps': round(len(timings) / elapsed, 1),
+        }
+
+    # ===== PORÓWNANIE =====
+
+    def _compare(self, path, results):
+        with open(path) as source:
+            baseline = json.load(source)
+        self.stdout.write(f"\nvs {path} (revision {baseline['meta'].get('revision')}):")
+        for key in ('priorities', 'tasks', 'attachments', 'requests_per_scenario', 'workers'):
+            if baseline['meta'].get(key) != results['meta'][key]:
+                self.stdout.write(self.style.WARNING(
+                    f"  different {key}: {baseline['meta'].get(key)} vs {results['meta'][key]}"))
+        rows = [(name, baseline['scenarios'].get(name), current)
+                for name, current in results['scenarios'].items()]
+        if 'concurrent' in results and 'concurrent' in baseline:
+            rows.append(('concurrent', baseline['concurrent'], results['concurrent']))
+        for name, before, after in rows:
+            if not before:
+                continue
+            changes = ', '.join(
+                f'{key} {before[key]} -> {after[key]} ({_percent(before[key], after[key])})'
+                for key in ('p50_ms', 'p95_ms', 'throughput_rps') if key in before and key in after)
+            self.stdout.write(f'  {name}: {changes}')
+
+
+def _percent(before, after):
+    if not before:
+        return 'n/a'
+    return f'{(after - before) / before * 100:+.1f}%'
@@ -0,0 +1,137 @@
+"""
+Benchmark uploadu załączników: strumieniowy handler vs domyślne handlery Django.
+Mierzy czas, przepustowość i szczyt RSS (każdy tryb w osobnym procesie).
+
+    python manage.py bench_upload --size-mb 1024
+"""
+
+import hashlib
+import json
+import multiprocessing
+import resource
+import shutil
+import tempfile
+import time
+
+from django.core.files.storage import default_storage
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from tasks.uploads import StreamingAttachmentUploadHandler
+
+BOUNDARY = 'BenchUploadBoundary'
+
+
+class MultipartStream:
+    """wsgi.input generujący treść multipart w locie - klient nie trzyma pliku w pamięci."""
+
+    def __init__(self, size, block=1024 * 1024):
+        self.head = (
+            f'--{BOUNDARY}\r\n'
+            'Content-Disposition: form-data; name="file"; filename="bench.bin"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode()
+        self.tail = f'\r\n--{BOUNDARY}--\r\n'.encode()
+        self.size = size
+        self.block = b'\xa5' * block
+        self.length = len(self.head) + size + len(self.tail)
+        self.pos = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.length - self.pos
+        out = bytearray()
+        while size > 0 and self.pos < self.length:
+            if self.pos < len(self.head):
+                part = self.head[self.pos:self.pos + size]
+            elif self.pos < len(self.head) + self.size:
+                offset = self.pos - len(self.head)
+                part = self.block[:min(size, self.size - offset, len(self.block))]
+            else:
+                offset = self.pos - len(self.head) - self.size
+                part = self.tail[offset:offset + size]
+            out += part
+            self.pos += len(part)
+            size -= len(part)
+        return bytes(out)
+
+    def readline(self, size=-1):
+        # Wymagane przez LimitedStream; parser multipart z tego nie korzysta
+        line = bytearray()
+        while size < 0 or len(line) < size:
+            char = self.read(1)
+            line += char
+            if not char or char == b'\n':
+                break
+        return bytes(line)
+
+
+def _max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run(mode, size, media_root, queue):
+    with override_settings(MEDIA_ROOT=media_root, ATTACHMENT_MAX_UPLOAD_SIZE=size * 2):
+        stream = MultipartStream(size)
+        request = WSGIRequest({
+            'REQUEST_METHOD': 'POST',
+            'PATH_INFO': '/',
+            'CONTENT_TYPE': f'multipart/form-data; boundary={BOUNDARY}',
+            'CONTENT_LENGTH': str(stream.length),
+            'wsgi.input': stream,
+        })
+        if mode == 'streaming':
+            request.upload_handlers.insert(0, StreamingAttachmentUploadHandler(request))
+
+        rss_before = _max_rss_mb()
+        start = time.perf_counter()
+        uploaded = request.FILES['file']
+        if mode == 'streaming':
+            name = uploaded.storage_name
+        else:
+            # Dotychczasowa ścieżka: plik tymczasowy + zapis do storage przy zapisie
+            # modelu (przeniesienie albo kopia, zależnie od systemu plików)
+            # + osobny odczyt całego pliku, żeby mieć ten sam SHA-256
+            name = default_storage.save(f'attachments/{uploaded.name}', uploaded)
+            digest = hashlib.sha256()
+            with default_storage.open(name, 'rb') as stored:
+                for chunk in stored.chunks():
+                    digest.update(chunk)
+        elapsed = time.perf_counter() - start
+        assert default_storage.size(name) == size
+
+    queue.put({
+        'mode': mode,
+        'size_mb': round(size / 1024 ** 2, 1),
+        'seconds': round(elapsed, 3),
+        'throughput_mb_s': round(size / 1024 ** 2 / elapsed, 1),
+        'peak_rss_delta_mb': round(_max_rss_mb() - rss_before, 1),
+    })
+
+
+class Command(BaseCommand):
+    help = 'Benchmark uploadu załączników (czas, przepustowość, szczyt RSS).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-mb', type=int, default=1024)
+        parser.add_argument('--modes', nargs='+', default=['streaming', 'default'],
+                            choices=['streaming', 'default'])
+
+    def handle(self, *args, **options):
+        size = options['size_mb'] * 1024 ** 2
+        context = multiprocessing.get_context('fork')
+        results = []
+        for mode in options['modes']:
+            media_root = tempfile.mkdtemp(prefix='bench_upload_')
+            try:
+                queue = context.Queue()
+                process = context.Process(target=_run, args=(mode, size, media_root, queue))
+                process.start()
+                process.join()
+                if process.exitcode != 0:
+                    raise CommandError(f'Benchmark mode {mode!r} failed (exit code {process.exitcode}).')
+                results.append(queue.get())
+            finally:
+                shutil.rmtree(media_root, ignore_errors=True)
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,126 @@
+"""
+Odśmiecanie plików załączników (uruchamiane z crona).
+  1. (opcjonalnie) usunięcie załączników tasków usuniętych miękko,
+  2. uzgodnienie MEDIA_ROOT/attachments i blobs z tabelą attachments -
+     pliki bez odwołań (starsze niż okres karencji) trafiają do kolejki,
+  3. opróżnienie kolejki file_deletion_queue.
+Katalogi czytane strumieniowo (os.scandir), wszystko w paczkach - pamięć
+ograniczona rozmiarem paczki, nie liczbą plików.
+
+    python manage.py collect_attachment_garbage [--purge-deleted-tasks] [--grace-hours 24]
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.dao import AttachmentDAO
+from tasks.models import Attachment, AttachmentBlob, FileDeletion
+
+# Katalogi storage z plikami załączników (stare ścieżki + bloby i ich pliki tymczasowe)
+SCANNED_DIRS = ['attachments', 'blobs']
+
+
+class Command(BaseCommand):
+    help = 'Usuwa pliki załączników bez odwołań (kolejka + uzgodnienie z dyskiem).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help='Pomijaj pliki młodsze niż tyle godzin (trwające uploady).')
+        parser.add_argument('--purge-deleted-tasks', action='store_true',
+                            help='Usuń też załączniki tasków usuniętych miękko.')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        self.storage = Attachment._meta.get_field('file').storage
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+
+        purged = 0
+        if options['purge_deleted_tasks'] and not self.dry_run:
+            while True:
+                count = AttachmentDAO.purge_for_deleted_tasks(self.batch_size)
+                if not count:
+                    break
+                purged += count
+
+        cutoff = time.time() - options['grace_hours'] * 3600
+        orphans = self._enqueue_orphans(cutoff)
+        deleted = 0 if self.dry_run else self._drain_queue()
+
+        self.stdout.write(
+            f'Purged attachments: {purged}, orphaned files: {orphans}, '
+            f'deleted files: {deleted}' + (' (dry run)' if self.dry_run else ''))
+
+    # ===== UZGODNIENIE Z DYSKIEM =====
+
+    def _walk(self, relative_dir):
+        """Strumieniowo: (nazwa w storage, mtime) każdego pliku pod katalogiem."""
+        stack = [relative_dir]
+        while stack:
+            current = stack.pop()
+            try:
+                entries = os.scandir(self.storage.path(current))
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    name = f'{current}/{entry.name}'
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(name)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield name, entry.stat().st_mtime
+
+    def _enqueue_orphans(self, cutoff):
+        orphans = 0
+        batch = []
+        for relative_dir in SCANNED_DIRS:
+            for name, mtime in self._walk(relative_dir):
+                if mtime < cutoff:
+                    batch.append(name)
+                if len(batch) >= self.batch_size:
+                    orphans += self._enqueue_unreferenced(batch)
+                    batch = []
+        if batch:
+            orphans += self._enqueue_unreferenced(batch)
+        return orphans
+
+    def _enqueue_unreferenced(self, names):
+        referenced = set(Attachment.objects.filter(file__in=names).values_list('file', flat=True))
+        queued = set(FileDeletion.objects.filter(name__in=names).values_list('name', flat=True))
+        orphans = [name for name in names if name not in referenced and name not in queued]
+        if orphans and not self.dry_run:
+            FileDeletion.objects.bulk_create([FileDeletion(name=name) for name in orphans])
+        return len(orphans)
+
+    # ===== KOLEJKA USUWANIA =====
+
+    def _drain_queue(self):
+        deleted = 0
+        last_pk = 0
+        while True:
+            batch = list(FileDeletion.objects.filter(pk__gt=last_pk).order_by('pk')[:self.batch_size])
+            if not batch:
+                return deleted
+            last_pk = batch[-1].pk
+            for entry in batch:
+                deleted += self._delete_entry(entry)
+
+    def _delete_entry(self, entry):
+        """
+        Usuń plik, o ile nic do niego nie wróciło (ponowny upload tej samej
+        treści). DELETE z kolejki idzie pierwszy - blokada zapisu SQLite
+        wstrzymuje równoległe _acquire_blob do końca transakcji.
+        """
+        with transaction.atomic():
+            if not FileDeletion.objects.filter(name=entry.name).delete()[0]:
+                return 0  # duplikat nazwy w kolejce - już obsłużony
+            if Attachment.objects.filter(file=entry.name).exists():
+                return 0
+            # Blob bez załączników (np. po CASCADE) - nieaktualny licznik
+            AttachmentBlob.objects.filter(name=entry.name).delete()
+            self.storage.delete(entry.name)
+        return 1
@@ -0,0 +1,129 @@
+"""
+Przeniesienie istniejących załączników do storage adresowanego treścią.
+Pliki sprzed deduplikacji są haszowane strumieniowo, duplikaty zastępowane
+jednym blobem; liczniki referencji przeliczane jednym UPDATE.
+
+    python manage.py dedupe_attachments [--batch-size 500] [--dry-run]
+"""
+
+import hashlib
+import os
+import shutil
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from tasks.dao import ChangeCounterDAO
+from tasks.models import Attachment, AttachmentBlob
+
+
+class Command(BaseCommand):
+    help = 'Deduplikacja plików załączników (storage adresowany SHA-256).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        self.storage = Attachment._meta.get_field('file').storage
+        self.dry_run = options['dry_run']
+        self.batch_size = options['batch_size']
+        prefix = f'{self.storage.BLOB_DIR}/'
+        legacy = Attachment.objects.exclude(file__startswith=prefix).order_by('pk')
+
+        stats = {'moved': 0, 'duplicates': 0, 'missing': 0}
+        last_pk = 0
+        while True:
+            # Stronicowanie po pk - stała pamięć niezależnie od liczby załączników
+            batch = list(legacy.filter(pk__gt=last_pk).only('pk', 'file')[:self.batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            self._process_batch(batch, stats)
+
+        if not self.dry_run:
+            self._rebuild_ref_counts()
+        self.stdout.write(
+            f"Moved: {stats['moved']}, duplicates removed: {stats['duplicates']}, "
+            f"missing files: {stats['missing']}" + (' (dry run)' if self.dry_run else ''))
+
+    def _process_batch(self, batch, stats):
+        changed, old_paths = [], []
+        for attachment in batch:
+            old_path = self.storage.path(attachment.file.name)
+            if not os.path.exists(old_path):
+                stats['missing'] += 1
+                continue
+            sha256, size = self._hash_file(old_path)
+            blob_name = self.storage.blob_name(sha256)
+            if self.storage.exists(blob_name):
+                stats['duplicates'] += 1
+            else:
+                stats['moved'] += 1
+                if not self.dry_run:
+                    self._link(old_path, self.storage.path(blob_name))
+            attachment.file.name = blob_name
+            attachment.sha256 = sha256
+            attachment.size = size
+            changed.append(attachment)
+            old_paths.append(old_path)
+
+        if self.dry_run or not changed:
+            return
+        with transaction.atomic():
+            Attachment.objects.bulk_update(changed, ['file', 'sha256', 'size'])
+            # Ścieżki plików w API się zmieniły - nowa wersja danych (ETag, cache)
+            ChangeCounterDAO.bump()
+        # Stare ścieżki dopiero po zatwierdzeniu - blob jest już pod nową nazwą
+        for old_path in set(old_paths):
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+    @staticmethod
+    def _hash_file(path, chunk_size=1024 * 1024):
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as source:
+            for chunk in iter(lambda: source.read(chunk_size), b''):
+                digest.update(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size
+
+    @staticmethod
+    def _link(source, target):
+        """Twardy link (bez kopiowania danych); kopia gdy system plików nie wspiera."""
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+
+    def _rebuild_ref_counts(self):
+        """
+        Liczniki referencji = liczba załączników per SHA-256. Brakujące bloby
+        dodawane paczkami, liczniki jednym UPDATE z podzapytaniem - bez
+        wczytywania wszystkich blobów do pamięci.
+        """
+        missing = (
+            Attachment.objects.exclude(sha256='')
+            .exclude(sha256__in=AttachmentBlob.objects.values('pk'))
+            .values('sha256').annotate(size=Max('size')).order_by()
+        )
+        refs = (
+            Attachment.objects.filter(sha256=OuterRef('pk'))
+            .values('sha256').annotate(refs=Count('pk')).values('refs')
+        )
+        with transaction.atomic():
+            batch = []
+            for row in missing.iterator(chunk_size=self.batch_size):
+                batch.append(AttachmentBlob(
+                    sha256=row['sha256'], name=self.storage.blob_name(row['sha256']),
+                    size=row['size'] or 0, ref_count=0))
+                if len(batch) >= self.batch_size:
+                    AttachmentBlob.objects.bulk_create(batch)
+                    batch = []
+            AttachmentBlob.objects.bulk_create(batch)
+            # Bloby bez załączników (np. przerwany proces) - licznik 0
+            AttachmentBlob.objects.update(ref_count=Coalesce(Subquery(refs), 0))
@@ -0,0 +1,32 @@
+"""
+Eksport aktywnych tasków do CSV/NDJSON (strumieniowo, stała pamięć).
+
+    python manage.py export_tasks --format ndjson --output tasks.ndjson
+"""
+
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks import services as srs
+from tasks.transfer import CONTENT_TYPES
+
+
+class Command(BaseCommand):
+    help = 'Eksportuje aktywne taski do CSV albo NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(CONTENT_TYPES), default='csv')
+        parser.add_argument('--output', default='-', help='Plik wyjściowy (- = stdout).')
+        parser.add_argument('--chunk-size', type=int, default=settings.TASK_EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunks = srs.export_tasks(options['format'], options['chunk_size'])
+        if options['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as target:
+            for chunk in chunks:
+                target.write(chunk)
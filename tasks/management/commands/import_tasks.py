@@ -0,0 +1,32 @@
+"""
+Import tasków (i brakujących priorytetów) z CSV/NDJSON paczkami bulk_create.
+Format z rozszerzenia pliku, chyba że podano --format.
+
+    python manage.py import_tasks tasks.ndjson --batch-size 2000
+"""
+
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import services as srs
+from tasks.transfer import CONTENT_TYPES
+
+
+class Command(BaseCommand):
+    help = 'Importuje taski z pliku CSV albo NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=list(CONTENT_TYPES))
+        parser.add_argument('--batch-size', type=int, default=settings.TASK_IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if not srs.is_valid_transfer_format(fmt):
+            raise CommandError(f'Unknown format {fmt!r}, use --format ({", ".join(CONTENT_TYPES)}).')
+        with open(options['path'], 'rb') as source:
+            report = srs.import_tasks(source, fmt, options['batch_size'])
+        self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
@@ -0,0 +1,18 @@
+"""
+Przeliczenie liczników statystyk (priority_stats, daily_completion_stats)
+od zera - po imporcie danych z pominięciem triggerów albo dla pewności.
+
+    python manage.py rebuild_task_stats
+"""
+
+from django.core.management.base import BaseCommand
+
+from tasks import services as srs
+
+
+class Command(BaseCommand):
+    help = 'Przelicza tabele liczników statystyk tasków od zera.'
+
+    def handle(self, *args, **options):
+        priorities, days = srs.rebuild_task_stats()
+        self.stdout.write(f'Rebuilt stats: {priorities} priorities, {days} days')
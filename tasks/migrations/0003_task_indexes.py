@@ -0,0 +1,78 @@
+# Generated by Django 4.2.25 on 2026-10-17 22:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_attachment'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='priority',
+            options={'ordering': ['-weight'], 'verbose_name': 'Priority', 'verbose_name_plural': 'Priorities'},
+        ),
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['-priority__weight', 'date_added'], 'verbose_name': 'Task', 'verbose_name_plural': 'Tasks'},
+        ),
+        migrations.AlterField(
+            model_name='priority',
+            name='name',
+            field=models.CharField(max_length=100, verbose_name='Name'),
+        ),
+        migrations.AlterField(
+            model_name='priority',
+            name='weight',
+            field=models.IntegerField(verbose_name='Weight'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='completion_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Completion Date'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='content',
+            field=models.TextField(blank=True, null=True, verbose_name='Content'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='date_added',
+            field=models.DateField(default=django.utils.timezone.now, verbose_name='Date Added'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='priority',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='tasks', to='tasks.priority', verbose_name='Priority'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='title',
+            field=models.CharField(max_length=200, verbose_name='Title'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completion_date__isnull', True), ('deleted', False)), fields=['title', 'id'], name='tasks_open_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completion_date__isnull', True), ('deleted', False)), fields=['date_added', 'id'], name='tasks_open_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completion_date__isnull', False), ('deleted', False)), fields=['title', 'id'], name='tasks_done_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completion_date__isnull', False), ('deleted', False)), fields=['date_added', 'id'], name='tasks_done_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completion_date__isnull', False), ('deleted', False)), fields=['completion_date', 'id'], name='tasks_done_completion_idx'),
+        ),
+    ]
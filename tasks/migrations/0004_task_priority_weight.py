@@ -0,0 +1,44 @@
+# Generated by Django 4.2.25 on 2026-10-17 22:49
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_priority_weight(apps, schema_editor):
+    """Jedno UPDATE ... SET priority_weight = (SELECT weight ...) dla wszystkich tasków."""
+    Task = apps.get_model('tasks', 'Task')
+    Priority = apps.get_model('tasks', 'Priority')
+    weight = Priority.objects.filter(pk=OuterRef('priority_id')).values('weight')[:1]
+    Task.objects.update(priority_weight=Subquery(weight))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['-priority_weight', 'date_added'], 'verbose_name': 'Task', 'verbose_name_plural': 'Tasks'},
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority_weight',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_priority_weight, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completion_date__isnull', True), ('deleted', False)), fields=['-priority_weight', 'date_added'], name='tasks_open_default_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completion_date__isnull', True), ('deleted', False)), fields=['priority_weight', 'id'], name='tasks_open_weight_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completion_date__isnull', False), ('deleted', False)), fields=['priority_weight', 'id'], name='tasks_done_weight_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.25 on 2026-10-17 23:00
+
+from django.db import migrations, models
+import tasks.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_attachment_sha256_size'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'attachment_blobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='file',
+            field=models.FileField(storage=tasks.storage.get_attachment_storage, upload_to='attachments/%Y/%m/%d/', verbose_name='File'),
+        ),
+        migrations.AddIndex(
+            model_name='attachment',
+            index=models.Index(fields=['sha256'], name='attachments_sha256_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+"""
+Indeks pełnotekstowy tasków: SQLite FTS5 (external content = tabela tasks).
+Synchronizacja triggerami - obejmuje też zapisy z admina i UPDATE masowe.
+Uwaga: migracja przebudowująca tabelę tasks (SQLite remake) usuwa triggery,
+trzeba je wtedy odtworzyć (CREATE_TRIGGERS).
+"""
+
+from django.db import migrations
+
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE tasks_fts USING fts5(
+    title, content,
+    content='tasks', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+CREATE_TRIGGERS = [
+    """
+    CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, content ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO tasks_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+DROP = [
+    'DROP TRIGGER IF EXISTS tasks_fts_au',
+    'DROP TRIGGER IF EXISTS tasks_fts_ad',
+    'DROP TRIGGER IF EXISTS tasks_fts_ai',
+    'DROP TABLE IF EXISTS tasks_fts',
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # inne bazy: TaskDAO.search używa LIKE
+    schema_editor.execute(CREATE_TABLE)
+    for statement in CREATE_TRIGGERS:
+        schema_editor.execute(statement)
+    # Zindeksuj istniejące taski
+    schema_editor.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_file_deletion_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
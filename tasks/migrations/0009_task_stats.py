@@ -0,0 +1,112 @@
+# Generated by Django 4.2.25 on 2026-10-17 23:17
+"""
+Liczniki tasków (priority_stats, daily_completion_stats) utrzymywane
+triggerami na tasks - obejmują przejścia stanu, operacje masowe, formularze
+i admina bez dodatkowych zapytań z Pythona. Liczone są tylko nieusunięte taski.
+Jak przy tasks_fts (0008): migracja przebudowująca tabelę tasks musi
+odtworzyć triggery; manage.py rebuild_task_stats przelicza liczniki od zera.
+"""
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Dodanie wkładu wiersza `row` (new/old) do liczników - UPSERT
+_ADD = """
+    INSERT INTO priority_stats(priority_id, open_count, completed_count)
+    SELECT {row}.priority_id, {row}.completion_date IS NULL, {row}.completion_date IS NOT NULL
+    WHERE {row}.deleted = 0
+    ON CONFLICT(priority_id) DO UPDATE SET
+        open_count = open_count + excluded.open_count,
+        completed_count = completed_count + excluded.completed_count;
+    INSERT INTO daily_completion_stats(date, completed_count)
+    SELECT {row}.completion_date, 1
+    WHERE {row}.deleted = 0 AND {row}.completion_date IS NOT NULL
+    ON CONFLICT(date) DO UPDATE SET completed_count = completed_count + 1;
+"""
+
+# Odjęcie wkładu wiersza (wiersze liczników istnieją - wkład był dodany)
+_REMOVE = """
+    UPDATE priority_stats SET
+        open_count = open_count - ({row}.completion_date IS NULL),
+        completed_count = completed_count - ({row}.completion_date IS NOT NULL)
+    WHERE priority_id = {row}.priority_id AND {row}.deleted = 0;
+    UPDATE daily_completion_stats SET completed_count = completed_count - 1
+    WHERE date = {row}.completion_date AND {row}.deleted = 0;
+"""
+
+CREATE_TRIGGERS = [
+    f"CREATE TRIGGER task_stats_ai AFTER INSERT ON tasks BEGIN {_ADD.format(row='new')} END",
+    f"CREATE TRIGGER task_stats_ad AFTER DELETE ON tasks BEGIN {_REMOVE.format(row='old')} END",
+    f"""
+    CREATE TRIGGER task_stats_au AFTER UPDATE OF deleted, completion_date, priority_id ON tasks
+    WHEN old.deleted IS NOT new.deleted
+        OR old.completion_date IS NOT new.completion_date
+        OR old.priority_id IS NOT new.priority_id
+    BEGIN {_REMOVE.format(row='old')} {_ADD.format(row='new')} END
+    """,
+]
+
+DROP_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS task_stats_au',
+    'DROP TRIGGER IF EXISTS task_stats_ad',
+    'DROP TRIGGER IF EXISTS task_stats_ai',
+]
+
+POPULATE = [
+    """
+    INSERT INTO priority_stats(priority_id, open_count, completed_count)
+    SELECT priority_id, SUM(completion_date IS NULL), SUM(completion_date IS NOT NULL)
+    FROM tasks WHERE deleted = 0 GROUP BY priority_id
+    """,
+    """
+    INSERT INTO daily_completion_stats(date, completed_count)
+    SELECT completion_date, COUNT(*)
+    FROM tasks WHERE deleted = 0 AND completion_date IS NOT NULL GROUP BY completion_date
+    """,
+]
+
+
+def create_stats_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # inne bazy: StatsDAO liczy agregaty na bieżąco
+    for statement in CREATE_TRIGGERS + POPULATE:
+        schema_editor.execute(statement)
+
+
+def drop_stats_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCompletionStats',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('completed_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'daily_completion_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='PriorityStats',
+            fields=[
+                ('priority', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='tasks.priority')),
+                ('open_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'priority_stats',
+            },
+        ),
+        migrations.RunPython(create_stats_triggers, drop_stats_triggers),
+    ]
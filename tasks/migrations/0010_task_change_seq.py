@@ -0,0 +1,49 @@
+# Generated by Django 4.2.25 on 2026-10-17 23:47
+"""
+Numer zmiany (change_seq) na tasks i priorities - synchronizacja przyrostowa
+(api/tasks/changes/). Kolumny dodawane przez ALTER TABLE ADD COLUMN zamiast
+AddField: na SQLite AddField z domyślną wartością przebudowuje tabelę tasks,
+co usuwa triggery tasks_fts (0008) i liczników (0009).
+Backfill: change_seq = id (rosnąco, jeden UPDATE na tabelę) - kolejne zapisy
+dostają MAX(change_seq) + 1 (tasks.models.next_change_seq).
+"""
+
+from django.db import migrations, models
+
+
+def _add_column(model_name: str, table: str) -> migrations.RunSQL:
+    return migrations.RunSQL(
+        f'ALTER TABLE {table} ADD COLUMN change_seq bigint NOT NULL DEFAULT 0',
+        f'ALTER TABLE {table} DROP COLUMN change_seq',
+        state_operations=[migrations.AddField(
+            model_name=model_name,
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        )],
+    )
+
+
+def backfill_change_seq(apps, schema_editor):
+    for model_name in ('Priority', 'Task'):
+        apps.get_model('tasks', model_name).objects.update(change_seq=models.F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_stats'),
+    ]
+
+    operations = [
+        _add_column('priority', 'priorities'),
+        _add_column('task', 'tasks'),
+        migrations.RunPython(backfill_change_seq, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='priority',
+            index=models.Index(fields=['change_seq'], name='priorities_change_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['change_seq', 'id'], name='tasks_change_seq_idx'),
+        ),
+    ]
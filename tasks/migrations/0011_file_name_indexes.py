@@ -0,0 +1,29 @@
+# Generated by Django 4.2.25 on 2026-10-18 00:07
+
+from django.db import migrations, models
+import tasks.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_change_seq'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attachment',
+            name='file',
+            field=models.FileField(db_index=True, storage=tasks.storage.get_attachment_storage, upload_to='attachments/%Y/%m/%d/', verbose_name='File'),
+        ),
+        migrations.AlterField(
+            model_name='attachmentblob',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='filedeletion',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
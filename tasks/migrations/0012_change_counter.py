@@ -0,0 +1,90 @@
+# Generated by Django 4.2.25 on 2026-10-18 00:16
+"""
+Licznik numerów zmian (change_counter) i tombstone'y trwale usuniętych
+wierszy (change_tombstones) dla synchronizacji przyrostowej. Triggery na
+tasks i priorities przesuwają licznik przy INSERT i zmianie change_seq,
+a DELETE zapisuje tombstone z nowym numerem - licznik nigdy nie maleje,
+więc po usunięciu wiersza z najwyższym numerem nie jest on nadawany ponownie.
+Jak 0008/0009: migracja przebudowująca tabelę tasks/priorities musi odtworzyć triggery.
+"""
+
+from django.db import migrations, models
+
+TRACKED_TABLES = ['tasks', 'priorities']
+
+# Licznik = max(licznik, nowy numer) - UPSERT (wiersz id=1)
+_ADVANCE = """
+    INSERT INTO change_counter(id, value) VALUES (1, new.change_seq)
+    ON CONFLICT(id) DO UPDATE SET value = MAX(value, excluded.value);
+"""
+
+_TOMBSTONE = """
+    INSERT INTO change_counter(id, value) VALUES (1, 1)
+    ON CONFLICT(id) DO UPDATE SET value = value + 1;
+    INSERT INTO change_tombstones(table_name, object_id, change_seq)
+    SELECT '{table}', old.id, value FROM change_counter WHERE id = 1;
+"""
+
+
+def _triggers(table: str) -> list:
+    return [
+        f"CREATE TRIGGER {table}_change_seq_ai AFTER INSERT ON {table} BEGIN {_ADVANCE} END",
+        f"CREATE TRIGGER {table}_change_seq_au AFTER UPDATE OF change_seq ON {table} BEGIN {_ADVANCE} END",
+        f"CREATE TRIGGER {table}_tombstone_ad AFTER DELETE ON {table} "
+        f"BEGIN {_TOMBSTONE.format(table=table)} END",
+    ]
+
+
+def create_change_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # inne bazy: next_change_seq liczy MAX(change_seq) + 1
+    top = max(
+        apps.get_model('tasks', model_name).objects.aggregate(top=models.Max('change_seq'))['top'] or 0
+        for model_name in ('Priority', 'Task')
+    )
+    apps.get_model('tasks', 'ChangeCounter').objects.create(id=1, value=top)
+    for table in TRACKED_TABLES:
+        for statement in _triggers(table):
+            schema_editor.execute(statement)
+
+
+def drop_change_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in TRACKED_TABLES:
+        for name in ('change_seq_ai', 'change_seq_au', 'tombstone_ad'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_{name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_file_name_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'change_counter',
+            },
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(max_length=32)),
+                ('object_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'change_tombstones',
+                'indexes': [models.Index(fields=['table_name', 'change_seq', 'object_id'], name='tombstones_change_seq_idx')],
+            },
+        ),
+        migrations.RunPython(create_change_triggers, drop_change_triggers),
+    ]
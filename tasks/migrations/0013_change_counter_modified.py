@@ -0,0 +1,75 @@
+# Generated by Django 4.2.25 on 2026-10-18 00:17
+"""
+Czas ostatniej zmiany w change_counter - wersja danych tasków (ETag,
+Last-Modified, klucze cache) czytana z bazy, wspólna dla wszystkich procesów.
+Triggery z 0012 odtworzone tak, by ustawiały też `modified`.
+"""
+
+from django.db import migrations, models
+from django.utils import timezone
+
+TRACKED_TABLES = ['tasks', 'priorities']
+
+_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+_ADVANCE = f"""
+    INSERT INTO change_counter(id, value, modified) VALUES (1, new.change_seq, {_NOW})
+    ON CONFLICT(id) DO UPDATE SET value = MAX(value, excluded.value), modified = excluded.modified;
+"""
+
+_TOMBSTONE = f"""
+    INSERT INTO change_counter(id, value, modified) VALUES (1, 1, {_NOW})
+    ON CONFLICT(id) DO UPDATE SET value = value + 1, modified = excluded.modified;
+    INSERT INTO change_tombstones(table_name, object_id, change_seq)
+    SELECT '{{table}}', old.id, value FROM change_counter WHERE id = 1;
+"""
+
+_OLD_ADVANCE = """
+    INSERT INTO change_counter(id, value) VALUES (1, new.change_seq)
+    ON CONFLICT(id) DO UPDATE SET value = MAX(value, excluded.value);
+"""
+
+_OLD_TOMBSTONE = """
+    INSERT INTO change_counter(id, value) VALUES (1, 1)
+    ON CONFLICT(id) DO UPDATE SET value = value + 1;
+    INSERT INTO change_tombstones(table_name, object_id, change_seq)
+    SELECT '{table}', old.id, value FROM change_counter WHERE id = 1;
+"""
+
+
+def _replace_triggers(schema_editor, advance: str, tombstone: str):
+    for table in TRACKED_TABLES:
+        for name in ('change_seq_ai', 'change_seq_au', 'tombstone_ad'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_{name}')
+        schema_editor.execute(f"CREATE TRIGGER {table}_change_seq_ai AFTER INSERT ON {table} BEGIN {advance} END")
+        schema_editor.execute(
+            f"CREATE TRIGGER {table}_change_seq_au AFTER UPDATE OF change_seq ON {table} BEGIN {advance} END")
+        schema_editor.execute(
+            f"CREATE TRIGGER {table}_tombstone_ad AFTER DELETE ON {table} BEGIN {tombstone.format(table=table)} END")
+
+
+def add_modified_to_triggers(apps, schema_editor):
+    apps.get_model('tasks', 'ChangeCounter').objects.update(modified=timezone.now())
+    if schema_editor.connection.vendor == 'sqlite':
+        _replace_triggers(schema_editor, _ADVANCE, _TOMBSTONE)
+
+
+def remove_modified_from_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        _replace_triggers(schema_editor, _OLD_ADVANCE, _OLD_TOMBSTONE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_change_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changecounter',
+            name='modified',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(add_modified_to_triggers, remove_modified_from_triggers),
+    ]
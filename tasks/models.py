@@ -1,9 +1,70 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .storage import get_attachment_storage
 
-class Priority(models.Model):
+
+def next_change_seq(model) -> RawSQL:
+    """
+    Wyrażenie następnego numeru zmiany liczone w tym samym INSERT/UPDATE (bez
+    dodatkowego zapytania). SQLite: licznik change_counter, który triggery
+    (migracja 0012) przesuwają przy każdym zapisie i trwałym usunięciu - nie
+    maleje, więc numer nie wraca po usunięciu wiersza z najwyższym change_seq.
+    Zapisy w SQLite są szeregowane, więc numery rosną w kolejności zatwierdzeń.
+    Inne bazy (bez triggerów): MAX(change_seq) + 1 tabeli.
+    """
+    if connection.vendor == 'sqlite':
+        return RawSQL(f'(SELECT COALESCE(MAX(value), 0) + 1 FROM {ChangeCounter._meta.db_table})', [])
+    return RawSQL(f'(SELECT COALESCE(MAX(change_seq), 0) + 1 FROM {model._meta.db_table})', [])
+
+
+class ChangeCounter(models.Model):
+    """
+    Ostatni nadany numer zmiany i jego czas (jeden wiersz) - utrzymywany
+    triggerami. Wersja danych tasków dla walidatorów HTTP i kluczy cache.
+    """
+    value = models.BigIntegerField(default=0)
+    modified = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'change_counter'
+
+
+class Tombstone(models.Model):
+    """
+    Trwale usunięty task/priorytet (wpis z triggera AFTER DELETE) - synchronizacja
+    przyrostowa zgłasza go jak usunięty miękko, z własnym numerem zmiany.
+    """
+    table_name = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'change_tombstones'
+        indexes = [
+            models.Index(fields=['table_name', 'change_seq', 'object_id'], name='tombstones_change_seq_idx'),
+        ]
+
+
+class ChangeTracked(models.Model):
+    """Numer ostatniej zmiany wiersza - synchronizacja przyrostowa (api/tasks/changes/)."""
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.change_seq = next_change_seq(type(self))
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq'}
+        super().save(*args, **kwargs)
+        # Nadana wartość dociągana z bazy dopiero przy odczycie (pole odroczone)
+        del self.change_seq
+
+
+class Priority(ChangeTracked):
     name = models.CharField(_('Name'), max_length=100, null=False)
     weight = models.IntegerField(_('Weight'), null=False)
     deleted = models.BooleanField(default=False, null=False)
@@ -13,12 +74,20 @@ class Priority(models.Model):
         verbose_name = _('Priority')
         verbose_name_plural = _('Priorities')
         ordering = ['-weight']
+        indexes = [
+            models.Index(fields=['change_seq'], name='priorities_change_seq_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Task(models.Model):
+# Warunki indeksów częściowych - muszą odpowiadać filtrom TaskDAO
+OPEN_TASKS = models.Q(deleted=False, completion_date__isnull=True)
+DONE_TASKS = models.Q(deleted=False, completion_date__isnull=False)
+
+
+class Task(ChangeTracked):
     title = models.CharField(_('Title'), max_length=200, null=False)
     content = models.TextField(_('Content'), null=True, blank=True)
     date_added = models.DateField(_('Date Added'), default=timezone.now, null=False)
@@ -31,16 +100,45 @@ class Task(models.Model):
         related_name='tasks',
         verbose_name=_('Priority')
     )
+    # Kopia priority.weight - sortowanie bez JOIN do priorities
+    priority_weight = models.IntegerField(default=0, null=False, editable=False)
 
     class Meta:
         db_table = 'tasks'
         verbose_name = _('Task')
         verbose_name_plural = _('Tasks')
-        ordering = ['-priority__weight', 'date_added']
+        ordering = ['-priority_weight', 'date_added']
+        # Indeksy częściowe pod TaskDAO.get_uncompleted / get_completed
+        # i sortowania z SORT_FIELD_MAP (klucz + id jako rozstrzygnięcie)
+        indexes = [
+            models.Index(fields=['-priority_weight', 'date_added'], name='tasks_open_default_idx',
+                         condition=OPEN_TASKS),
+            models.Index(fields=['priority_weight', 'id'], name='tasks_open_weight_idx',
+                         condition=OPEN_TASKS),
+            models.Index(fields=['title', 'id'], name='tasks_open_title_idx',
+                         condition=OPEN_TASKS),
+            models.Index(fields=['date_added', 'id'], name='tasks_open_added_idx',
+                         condition=OPEN_TASKS),
+            models.Index(fields=['priority_weight', 'id'], name='tasks_done_weight_idx',
+                         condition=DONE_TASKS),
+            models.Index(fields=['title', 'id'], name='tasks_done_title_idx',
+                         condition=DONE_TASKS),
+            models.Index(fields=['date_added', 'id'], name='tasks_done_added_idx',
+                         condition=DONE_TASKS),
+            models.Index(fields=['completion_date', 'id'], name='tasks_done_completion_idx',
+                         condition=DONE_TASKS),
+            # Synchronizacja przyrostowa: keyset po (change_seq, id), MAX(change_seq)
+            models.Index(fields=['change_seq', 'id'], name='tasks_change_seq_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self.priority_id is not None:
+            self.priority_weight = self.priority.weight
+        super().save(*args, **kwargs)
+
     @property
     def is_completed(self):
         return self.completion_date is not None
@@ -54,8 +152,14 @@ class Attachment(models.Model):
         related_name='attachments',
         verbose_name=_('Task')
     )
-    file = models.FileField(_('File'), upload_to='attachments/%Y/%m/%d/')
+    # Plik = blob adresowany treścią, współdzielony przez załączniki o tym samym SHA-256.
+    # Indeks: odśmiecanie sprawdza referencje po nazwie pliku
+    file = models.FileField(_('File'), upload_to='attachments/%Y/%m/%d/', storage=get_attachment_storage,
+                            db_index=True)
     filename = models.CharField(_('Filename'), max_length=255)
+    # Liczone w locie przy strumieniowym uploadzie (tasks/uploads.py)
+    sha256 = models.CharField(_('SHA-256'), max_length=64, blank=True, default='')
+    size = models.BigIntegerField(_('Size'), null=True, blank=True)
     uploaded_at = models.DateTimeField(_('Uploaded At'), auto_now_add=True)
 
     class Meta:
@@ -63,6 +167,55 @@ class Attachment(models.Model):
         verbose_name = _('Attachment')
         verbose_name_plural = _('Attachments')
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['sha256'], name='attachments_sha256_idx'),
+        ]
 
     def __str__(self):
         return self.filename
+
+
+class AttachmentBlob(models.Model):
+    """Plik w storage adresowanym treścią + licznik odwołujących się załączników."""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, db_index=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'attachment_blobs'
+
+    def __str__(self):
+        return self.sha256
+
+
+class FileDeletion(models.Model):
+    """Kolejka odroczonego usuwania plików (manage.py collect_attachment_garbage)."""
+    name = models.CharField(max_length=255, db_index=True)
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'file_deletion_queue'
+
+    def __str__(self):
+        return self.name
+
+
+class PriorityStats(models.Model):
+    """Liczniki tasków per priorytet - utrzymywane triggerami (migracja 0009)."""
+    priority = models.OneToOneField(
+        Priority, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    open_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'priority_stats'
+
+
+class DailyCompletionStats(models.Model):
+    """Liczba ukończeń per dzień (completion_date) - utrzymywana triggerami."""
+    date = models.DateField(primary_key=True)
+    completed_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'daily_completion_stats'
@@ -0,0 +1,112 @@
+"""
+Wiersze tabel listy zadań (task_list.html, tag {% task_rows %}) bez pełnego
+renderowania szablonu wiersza dla każdego taska - przy tysiącach wierszy
+to ono dominowało czas odpowiedzi (5x {% url %} i kilka {% trans %} na wiersz).
+Strategie (TASK_ROW_RENDERER), wszystkie dają identyczny HTML:
+    compiled - szablon wiersza renderowany raz na tabelę z wartościami-znacznikami
+               i zamieniany w format str.format: URL-e i etykiety policzone raz,
+               na wiersz tylko escape i wstawienie pól
+    cached   - gotowe fragmenty z cache TASK_ROW_CACHE (jeden get_many), klucz = id + change_seq
+               taska i priorytetu + język; brakujące renderowane szablonem wiersza
+    template - szablon wiersza dla każdego taska (punkt odniesienia w bench_rows)
+"""
+
+import datetime
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template import Context, Engine
+from django.urls import get_script_prefix
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+ROW_TEMPLATE = 'tasks/_task_row.html'
+
+RENDERERS = ('compiled', 'cached', 'template')
+
+# Wartości-znaczniki pól taska w "kompilowanym" wierszu (nie występują w HTML szablonu)
+_MARKERS = SimpleNamespace(
+    id=918273645,
+    title='__task_title__',
+    date_added=datetime.date(1001, 1, 1),
+    completion_date=datetime.date(1002, 2, 2),
+    priority=SimpleNamespace(name='__priority_name__'),
+)
+_PLACEHOLDERS = [
+    ('__task_title__', '{title}'),
+    ('__priority_name__', '{priority}'),
+    ('1001-01-01', '{date_added}'),
+    ('1002-02-02', '{completion_date}'),
+    (str(_MARKERS.id), '{id}'),
+]
+
+
+def render_rows(tasks: list, completed: bool, renderer: str = None) -> str:
+    """HTML wierszy tabeli (bezpieczny) strategią renderer (domyślnie TASK_ROW_RENDERER)."""
+    renderer = renderer or settings.TASK_ROW_RENDERER
+    if renderer == 'compiled':
+        html = _render_compiled(tasks, completed)
+    elif renderer == 'cached':
+        html = _render_cached(tasks, completed)
+    else:
+        html = ''.join(_render_template(task, completed) for task in tasks)
+    return mark_safe(html)
+
+
+def _row_template():
+    # Szablon silnika, nie backendu - bez pomiaru 'render' dla każdego wiersza
+    return Engine.get_default().get_template(ROW_TEMPLATE)
+
+
+def _render_template(task, completed: bool) -> str:
+    return _row_template().render(Context({'task': task, 'completed': completed}))
+
+
+# ===== COMPILED =====
+
+def compile_row(completed: bool) -> str:
+    """
+    Szablon wiersza jako format str.format dla aktywnego języka i prefiksu URL
+    (render ze znacznikami, potem znaczniki -> pola). Liczone raz na tabelę.
+    """
+    html = _render_template(_MARKERS, completed).replace('{', '{{').replace('}', '}}')
+    for marker, placeholder in _PLACEHOLDERS:
+        html = html.replace(marker, placeholder)
+    return html
+
+
+def _render_compiled(tasks: list, completed: bool) -> str:
+    row = compile_row(completed).format
+    # |date:"Y-m-d" dla DateField = isoformat()
+    return ''.join(row(
+        id=task.pk,
+        title=conditional_escape(task.title),
+        date_added=task.date_added.isoformat(),
+        priority=conditional_escape(task.priority.name),
+        completion_date=task.completion_date.isoformat() if completed else '',
+    ) for task in tasks)
+
+
+# ===== CACHED =====
+
+def row_cache_key(task) -> str:
+    """
+    Klucz fragmentu: zmiana taska lub priorytetu (nazwa) podbija change_seq,
+    więc stary fragment przestaje być czytany i sam wygasa - bez kasowania.
+    """
+    return (f'tasks:row:{get_language()}:{get_script_prefix()}:'
+            f'{task.pk}:{task.change_seq}:{task.priority.change_seq}')
+
+
+def _render_cached(tasks: list, completed: bool) -> str:
+    cache = caches[settings.TASK_ROW_CACHE]
+    keys = {row_cache_key(task): task for task in tasks}
+    fragments = cache.get_many(keys)
+    missing = {key: _render_template(task, completed)
+               for key, task in keys.items() if key not in fragments}
+    if missing:
+        cache.set_many(missing, timeout=settings.TASK_ROW_CACHE_TIMEOUT)
+        fragments.update(missing)
+    return ''.join(fragments[key] for key in keys)
@@ -4,8 +4,22 @@ Zasada Single Responsibility: Services łączy dane z różnych DAO i przygotowu
 Zasada DRY: Każda funkcja get_*_data() jest wywoływana z wielu miejsc (views, API).
 """
 
+import base64
+import csv
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from asgiref.sync import sync_to_async
+from django.db import transaction
 from django.utils import timezone
-from .dao import TaskDAO, PriorityDAO, AttachmentDAO
+from . import cache, events, transfer
+from .dao import (
+    TaskDAO, PriorityDAO, AttachmentDAO, StatsDAO, TombstoneDAO, AsyncTaskDAO, AsyncAttachmentDAO,
+)
+from .models import Task, Priority  # tylko max_length pól przy imporcie
+from .uploads import StoredUploadedFile
 
 
 # ==================== TASK SERVICES ====================
@@ -14,13 +28,46 @@ def get_task_list_data() -> dict:
     """
     Pobierz dane dla widoku listy zadań.
     Używane w: task_list view, potencjalnie w API.
+    Read-through cache wersjonowany licznikiem zmian z bazy (tasks/cache.py).
+    """
+    return cache.get_or_build('task_list', _build_task_list_data)
+
+
+def _build_task_list_data() -> dict:
+    return _task_list_data(list(TaskDAO.get_uncompleted()))
+
+
+def _task_list_data(uncompleted: list) -> dict:
+    """
+    Kontekst listy z pobranych tasków (DRY - wersja sync i async).
+    Ukończone nie są ładowane - przeglądarka pobiera je stronami z API
+    (tabela zwinięta), liczba z liczników StatsDAO (get_task_stats).
     """
     return {
-        'uncompleted_tasks': TaskDAO.get_uncompleted(),
-        'completed_tasks': TaskDAO.get_completed(),
+        'uncompleted_tasks': uncompleted,
+        'uncompleted_sort_data': _build_client_sort_data(uncompleted),
     }
 
 
+def _build_client_sort_data(tasks: list):
+    """
+    Kompaktowe dane do sortowania tabeli w przeglądarce (json_script).
+    Kolumny = klucze SORT_FIELD_MAP. None gdy wierszy jest więcej niż
+    TASK_CLIENT_SORT_MAX_ROWS - wtedy JS sortuje przez API.
+    """
+    if len(tasks) > settings.TASK_CLIENT_SORT_MAX_ROWS:
+        return None
+    fields = list(SORT_FIELD_MAP)
+    rows = []
+    for task in tasks:
+        row = []
+        for field in fields:
+            value = _sort_value(task, field)
+            row.append(value.isoformat() if isinstance(value, datetime.date) else value)
+        rows.append(row)
+    return {'fields': fields, 'rows': rows}
+
+
 def get_task_detail_data(task_id: int) -> dict:
     """
     Pobierz dane dla widoku szczegółów zadania.
@@ -32,6 +79,24 @@ def get_task_detail_data(task_id: int) -> dict:
     }
 
 
+def save_task_form(form):
+    """Zapisz formularz taska (tworzenie/edycja)."""
+    task = form.save()
+    events.publish('save', task=_task_event_data(task))
+    return task
+
+
+def _task_event_data(task) -> dict:
+    """Wiersz taska w zdarzeniu na żywo (pola jak w API, bez załączników)."""
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'date_added': task.date_added,
+        'completion_date': task.completion_date,
+        'priority': {'id': task.priority.pk, 'name': task.priority.name, 'weight': task.priority.weight},
+    }
+
+
 def get_task_for_form(task_id: int) -> dict:
     """Pobierz task do formularza edycji."""
     return {'task': TaskDAO.get_by_id(task_id)}
@@ -53,21 +118,205 @@ def get_task_for_restore(task_id: int) -> dict:
 
 
 def complete_task(task_id: int):
-    """Ukończ zadanie."""
-    task = TaskDAO.get_for_completion(task_id)
-    TaskDAO.complete(task, timezone.now().date())
+    """Ukończ zadanie (DoesNotExist gdy brak lub już ukończone)."""
+    TaskDAO.complete(task_id, timezone.now().date())
 
 
 def restore_task(task_id: int):
-    """Przywróć zadanie do nieukończonych."""
-    task = TaskDAO.get_for_restore(task_id)
-    TaskDAO.restore(task)
+    """Przywróć zadanie do nieukończonych (DoesNotExist gdy nieukończone)."""
+    TaskDAO.restore(task_id)
 
 
 def delete_task(task_id: int):
     """Usuń zadanie (soft delete)."""
-    task = TaskDAO.get_by_id(task_id)
-    TaskDAO.soft_delete(task)
+    TaskDAO.soft_delete(task_id)
+
+
+# Operacje masowe (API): akcja -> funkcja DAO
+BULK_MAX_IDS = 5000
+
+BULK_ACTIONS = {
+    'complete': lambda ids: TaskDAO.bulk_complete(ids, timezone.now().date()),
+    'restore': TaskDAO.bulk_restore,
+    'delete': TaskDAO.bulk_soft_delete,
+}
+
+
+def bulk_task_action(action: str, ids: list) -> dict:
+    """
+    Wykonaj akcję na wielu taskach (set-based UPDATE).
+    Zwraca zmienione ID i pominięte (brak, usunięte albo zły stan).
+    """
+    ids = list(dict.fromkeys(ids))
+    updated = BULK_ACTIONS[action](ids)
+    updated_set = set(updated)
+    return {
+        'action': action,
+        'updated': sorted(updated),
+        'skipped': [pk for pk in ids if pk not in updated_set],
+    }
+
+
+def is_valid_bulk_action(action: str) -> bool:
+    """Sprawdź czy akcja masowa jest obsługiwana."""
+    return action in BULK_ACTIONS
+
+# ==================== IMPORT / EKSPORT ====================
+
+# Raport importu: ile błędów zwracamy szczegółowo (zliczane są wszystkie)
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+
+def import_tasks(stream, fmt: str, batch_size: int = None) -> dict:
+    """
+    Import tasków ze strumienia CSV/NDJSON (transfer.py) paczkami bulk_create.
+    Priorytety rozwiązywane po nazwie ze słownika w pamięci (jedno zapytanie
+    na import), brakujące tworzone z priority_weight z wiersza.
+    Błędne wiersze są pomijane i raportowane; nieczytelny plik przerywa import
+    (wcześniejsze paczki zostają zapisane).
+    """
+    batch_size = batch_size or settings.TASK_IMPORT_BATCH_SIZE
+    priorities = PriorityDAO.get_by_names()
+    report = {'created': 0, 'failed': 0, 'errors': []}
+    batch = []
+    number = 0
+    try:
+        for number, row in transfer.read_rows(stream, fmt):
+            try:
+                batch.append(_task_from_row(row, priorities))
+            except ValueError as exc:
+                _report_import_error(report, number, str(exc))
+                continue
+            if len(batch) >= batch_size:
+                report['created'] += TaskDAO.bulk_insert(batch)
+                batch = []
+    except (csv.Error, UnicodeDecodeError) as exc:
+        _report_import_error(report, number + 1, f'Malformed file: {exc}')
+    if batch:
+        report['created'] += TaskDAO.bulk_insert(batch)
+    return report
+
+
+def _report_import_error(report: dict, number: int, message: str):
+    report['failed'] += 1
+    if len(report['errors']) < IMPORT_MAX_REPORTED_ERRORS:
+        report['errors'].append({'row': number, 'error': message})
+
+
+def _task_from_row(row, priorities: dict) -> dict:
+    """Wiersz importu -> pola taska (ValueError gdy wiersz błędny)."""
+    if isinstance(row, ValueError):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError('Expected an object')
+    title = _text_field(row, 'title', Task, required=True)
+    name = _text_field(row, 'priority', Priority, model_field='name', required=True)
+    priority = priorities.get(name)
+    if priority is None:
+        priority = PriorityDAO.create(name, _int_field(row, 'priority_weight'))
+        priorities[name] = priority
+    return {
+        'title': title,
+        'content': row.get('content') or '',
+        'date_added': _date_field(row, 'date_added') or timezone.now().date(),
+        'completion_date': _date_field(row, 'completion_date'),
+        'priority': priority,
+    }
+
+
+def _text_field(row: dict, key: str, model, model_field: str = None, required: bool = False) -> str:
+    value = row.get(key)
+    value = str(value).strip() if value is not None else ''
+    if required and not value:
+        raise ValueError(f'Missing {key}')
+    max_length = model._meta.get_field(model_field or key).max_length
+    if len(value) > max_length:
+        raise ValueError(f'{key} longer than {max_length} characters')
+    return value
+
+
+def _int_field(row: dict, key: str) -> int:
+    value = row.get(key)
+    if value in (None, ''):
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid {key}: {value!r}')
+
+
+def _date_field(row: dict, key: str):
+    value = row.get(key)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f'Invalid {key}: {value!r}')
+
+
+def export_tasks(fmt: str, chunk_size: int = None):
+    """
+    Eksport aktywnych tasków jako bloki tekstu (generator). Kursor czytany
+    paczkami przez QuerySet.iterator - stała pamięć niezależnie od liczby tasków.
+    """
+    chunk_size = chunk_size or settings.TASK_EXPORT_CHUNK_SIZE
+    rows = (
+        dict(zip(transfer.FIELDS, values))
+        for values in TaskDAO.get_for_export().iterator(chunk_size=chunk_size)
+    )
+    return transfer.write_rows(rows, fmt)
+
+
+def is_valid_transfer_format(fmt: str) -> bool:
+    """Sprawdź czy format importu/eksportu jest obsługiwany."""
+    return transfer.is_valid_format(fmt)
+
+
+# ==================== STATS SERVICES ====================
+
+# Zakres historii ukończeń w statystykach (dni, łącznie z dzisiejszym)
+STATS_DAYS = 30
+
+
+def get_task_stats() -> dict:
+    """
+    Statystyki dla nagłówka listy zadań i API: liczniki per priorytet
+    i ukończenia per dzień. Z tabel liczników (bez GROUP BY po tasks),
+    cache wersjonowany licznikiem zmian - klucz zawiera datę (zmiana o północy).
+    """
+    today = timezone.now().date()
+    return cache.get_or_build(f'task_stats:{today.isoformat()}', lambda: _build_task_stats(today))
+
+
+def _build_task_stats(today) -> dict:
+    since = today - datetime.timedelta(days=STATS_DAYS - 1)
+    priorities = [
+        {
+            'id': row['priority_id'],
+            'name': row['priority__name'],
+            'weight': row['priority__weight'],
+            'open': row['open_count'],
+            'completed': row['completed_count'],
+        }
+        for row in StatsDAO.get_priority_counts()
+    ]
+    completions = {row['date']: row['completed_count'] for row in StatsDAO.get_daily_completions(since)}
+    days = (since + datetime.timedelta(days=offset) for offset in range(STATS_DAYS))
+    return {
+        'open': sum(row['open'] for row in priorities),
+        'completed': sum(row['completed'] for row in priorities),
+        'completed_today': completions.get(today, 0),
+        'priorities': priorities,
+        'daily_completions': [
+            {'date': day.isoformat(), 'completed': completions.get(day, 0)} for day in days
+        ],
+    }
+
+
+def rebuild_task_stats() -> tuple:
+    """Przelicz tabele liczników od zera. Zwraca (priorytety, dni)."""
+    return StatsDAO.rebuild()
 
 
 # ==================== PRIORITY SERVICES ====================
@@ -82,6 +331,15 @@ def get_priority_for_form(priority_id: int) -> dict:
     return {'priority': PriorityDAO.get_by_id(priority_id)}
 
 
+def save_priority_form(form):
+    """Zapisz formularz priorytetu; zmiana wagi aktualizuje taski (jeden UPDATE)."""
+    with transaction.atomic():
+        priority = form.save()
+        if 'weight' in form.changed_data:
+            PriorityDAO.sync_task_weights(priority)
+    return priority
+
+
 def get_priority_for_delete(priority_id: int) -> dict:
     """Pobierz priorytet do potwierdzenia usunięcia."""
     return {'priority': PriorityDAO.get_by_id(priority_id)}
@@ -89,8 +347,7 @@ def get_priority_for_delete(priority_id: int) -> dict:
 
 def delete_priority(priority_id: int):
     """Usuń priorytet (soft delete)."""
-    priority = PriorityDAO.get_by_id(priority_id)
-    PriorityDAO.soft_delete(priority)
+    PriorityDAO.soft_delete(priority_id)
 
 
 # ==================== ATTACHMENT SERVICES ====================
@@ -100,6 +357,11 @@ def get_attachment_form_data(task_id: int) -> dict:
     return {'task': TaskDAO.get_by_id(task_id)}
 
 
+def get_attachment_for_download(attachment_id: int) -> dict:
+    """Pobierz załącznik do pobrania pliku."""
+    return {'attachment': AttachmentDAO.get_by_id(attachment_id)}
+
+
 def get_attachment_for_delete(attachment_id: int) -> dict:
     """Pobierz załącznik do potwierdzenia usunięcia."""
     return {'attachment': AttachmentDAO.get_by_id(attachment_id)}
@@ -108,15 +370,17 @@ def get_attachment_for_delete(attachment_id: int) -> dict:
 def create_attachment(task_id: int, file, filename: str):
     """Dodaj załącznik do taska."""
     task = TaskDAO.get_by_id(task_id)
-    AttachmentDAO.create(task, file, filename)
+    if isinstance(file, StoredUploadedFile):
+        # Plik już leży w storage (upload strumieniowy) - bez ponownej kopii
+        temp_name, sha256, size = file.storage_name, file.sha256, file.size
+    else:
+        temp_name, sha256, size = AttachmentDAO.store_temp(file)
+    AttachmentDAO.create(task, temp_name, filename, sha256, size)
 
 
 def delete_attachment(attachment_id: int) -> int:
     """Usuń załącznik. Zwraca task_id do przekierowania."""
-    attachment = AttachmentDAO.get_by_id(attachment_id)
-    task_id = attachment.task.pk
-    AttachmentDAO.delete(attachment)
-    return task_id
+    return AttachmentDAO.delete(attachment_id)
 
 
 # ==================== API SERVICES (dla sortowania TAS-2) ====================
@@ -126,41 +390,117 @@ SORT_FIELD_MAP = {
     'id': 'id',
     'title': 'title',
     'date_added': 'date_added',
-    'priority': 'priority__weight',
+    'priority': 'priority_weight',
     'completion_date': 'completion_date',
 }
 
 
-def get_sorted_uncompleted_tasks(sort_by: str, sort_order: str) -> dict:
-    """Pobierz nieukończone taski z sortowaniem dla API."""
-    order_by = _build_order_by(sort_by, sort_order)
-    return {
-        'tasks': TaskDAO.get_uncompleted(order_by=order_by),
-        'sort_by': sort_by,
-        'sort_order': sort_order,
-    }
+# Stronicowanie keyset (kursor = klucz sortowania + id)
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    """Nieprawidłowy lub niepasujący do sortowania kursor."""
+
+
+# Wartość z kursora nie pasuje do typu kolumny
+CURSOR_VALUE_ERRORS = (ValidationError, ValueError, TypeError)
+
+
+def get_sorted_uncompleted_tasks(sort_by: str, sort_order: str,
+                                 cursor: str = None, page_size: int = None) -> dict:
+    """Pobierz stronę nieukończonych tasków z sortowaniem dla API."""
+    return _get_sorted_page(TaskDAO.get_uncompleted(), sort_by, sort_order, cursor, page_size)
+
+
+def get_sorted_completed_tasks(sort_by: str, sort_order: str,
+                               cursor: str = None, page_size: int = None) -> dict:
+    """Pobierz stronę ukończonych tasków z sortowaniem dla API."""
+    return _get_sorted_page(TaskDAO.get_completed(), sort_by, sort_order, cursor, page_size)
 
 
-def get_sorted_completed_tasks(sort_by: str, sort_order: str) -> dict:
-    """Pobierz ukończone taski z sortowaniem dla API."""
-    order_by = _build_order_by(sort_by, sort_order)
+def _get_sorted_page(queryset, sort_by: str, sort_order: str,
+                     cursor: str = None, page_size: int = None) -> dict:
+    """Pobierz jedną stronę (DRY - używane przez oba endpointy)."""
+    page_size = _clamp_page_size(page_size)
+    after = _decode_cursor(cursor, sort_by, sort_order) if cursor else None
+    try:
+        tasks = TaskDAO.get_page(TaskDAO.with_attachments(queryset), SORT_FIELD_MAP[sort_by],
+                                 sort_order == 'desc', after, page_size)
+    except CURSOR_VALUE_ERRORS:
+        raise InvalidCursorError(cursor)
+    return _sorted_page_result(tasks, sort_by, sort_order, page_size)
+
+
+def _sorted_page_result(tasks: list, sort_by: str, sort_order: str, page_size: int) -> dict:
+    """Strona + kursor następnej (pobrany nadmiarowy rekord = jest kolejna strona)."""
+    next_cursor = None
+    if len(tasks) > page_size:
+        tasks = tasks[:page_size]
+        next_cursor = _encode_cursor(tasks[-1], sort_by, sort_order)
+    
     return {
-        'tasks': TaskDAO.get_completed(order_by=order_by),
+        'tasks': tasks,
         'sort_by': sort_by,
         'sort_order': sort_order,
+        'page_size': page_size,
+        'next_cursor': next_cursor,
     }
 
 
-def _build_order_by(sort_by: str, sort_order: str) -> list:
-    """Zbuduj listę order_by z parametrów. (DRY - używane przez oba endpointy)"""
-    if sort_by not in SORT_FIELD_MAP:
-        return None
-    
-    field = SORT_FIELD_MAP[sort_by]
-    if sort_order == 'desc':
-        field = f'-{field}'
-    
-    return [field]
+def _clamp_page_size(page_size: int = None) -> int:
+    """Rozmiar strony ograniczony do [1, API_MAX_PAGE_SIZE]."""
+    if not page_size:
+        return API_PAGE_SIZE
+    return max(1, min(page_size, API_MAX_PAGE_SIZE))
+
+
+def _encode_cursor(task, sort_by: str, sort_order: str) -> str:
+    """Zakoduj klucz ostatniego rekordu strony jako nieprzezroczysty kursor."""
+    value = _sort_value(task, sort_by)
+    if isinstance(value, datetime.date):
+        value = value.isoformat()
+    return _pack_cursor([sort_by, sort_order, value, task.pk])
+
+
+def _pack_cursor(payload: list) -> str:
+    """Lista JSON -> nieprzezroczysty kursor (base64 bez paddingu)."""
+    data = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def _unpack_cursor(cursor: str) -> list:
+    """Kursor -> lista JSON (InvalidCursorError gdy uszkodzony)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise InvalidCursorError(cursor)
+    if not isinstance(payload, list):
+        raise InvalidCursorError(cursor)
+    return payload
+
+
+def _sort_value(task, sort_by: str):
+    """Wartość klucza sortowania dla taska."""
+    value = task
+    for attr in SORT_FIELD_MAP[sort_by].split('__'):
+        value = getattr(value, attr)
+    return value
+
+
+def _decode_cursor(cursor: str, sort_by: str, sort_order: str) -> tuple:
+    """Odkoduj kursor -> (wartość, id). Kursor musi pasować do sortowania."""
+    try:
+        cursor_sort_by, cursor_order, value, pk = _unpack_cursor(cursor)
+    except ValueError:
+        raise InvalidCursorError(cursor)
+    if (cursor_sort_by, cursor_order) != (sort_by, sort_order):
+        raise InvalidCursorError(cursor)
+    if not isinstance(pk, int) or not isinstance(value, (int, str, type(None))):
+        raise InvalidCursorError(cursor)
+    return value, pk
 
 
 def is_valid_sort_field(sort_by: str) -> bool:
@@ -171,3 +511,158 @@ def is_valid_sort_field(sort_by: str) -> bool:
 def get_allowed_sort_fields() -> list:
     """Pobierz listę dozwolonych pól sortowania."""
     return list(SORT_FIELD_MAP.keys())
+
+
+# ==================== WYSZUKIWANIE (API) ====================
+
+SEARCH_STATES = ('uncompleted', 'completed')
+
+
+def search_tasks(query: str, state: str = None,
+                 cursor: str = None, page_size: int = None) -> dict:
+    """
+    Strona wyników wyszukiwania pełnotekstowego (ranking trafności).
+    Kursor = pozycja w rankingu, ważny tylko dla tego samego zapytania i stanu.
+    """
+    page_size = _clamp_page_size(page_size)
+    offset = _decode_search_cursor(cursor, query, state) if cursor else 0
+    tasks = TaskDAO.search(query, state, page_size, offset)
+    next_cursor = None
+    if len(tasks) > page_size:
+        tasks = tasks[:page_size]
+        next_cursor = _pack_cursor(['search', query, state, offset + page_size])
+    
+    return {
+        'tasks': tasks,
+        'query': query,
+        'state': state,
+        'page_size': page_size,
+        'next_cursor': next_cursor,
+    }
+
+
+def _decode_search_cursor(cursor: str, query: str, state: str) -> int:
+    """Odkoduj kursor wyszukiwania -> przesunięcie w rankingu."""
+    try:
+        kind, cursor_query, cursor_state, offset = _unpack_cursor(cursor)
+    except ValueError:
+        raise InvalidCursorError(cursor)
+    if (kind, cursor_query, cursor_state) != ('search', query, state):
+        raise InvalidCursorError(cursor)
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise InvalidCursorError(cursor)
+    return offset
+
+
+def is_valid_search_state(state: str) -> bool:
+    """Sprawdź czy filtr stanu wyszukiwania jest prawidłowy (None = wszystkie)."""
+    return state is None or state in SEARCH_STATES
+
+
+# ==================== SYNCHRONIZACJA PRZYROSTOWA (API) ====================
+# Token = (change_seq, id) ostatniego wysłanego taska + najwyższy change_seq
+# wysłanych priorytetów. Klient bez tokenu dostaje pełny stan (tylko aktywne),
+# potem wyłącznie wiersze zmienione od tokenu, a usunięte (miękko albo trwale -
+# tombstone) jako same ID.
+
+def get_task_changes(token: str = None, page_size: int = None) -> dict:
+    """
+    Taski i priorytety zmienione od tokenu (utworzone, edytowane, ukończone,
+    przywrócone, usunięte). Zmiana priorytetu nie zmienia tasków - klient
+    podmienia zagnieżdżony priorytet z listy priorities.
+    """
+    page_size = _clamp_page_size(page_size)
+    after, priority_seq = _decode_change_token(token) if token else (None, None)
+    # (change_seq, id, task albo None dla usuniętego trwale) - jeden porządek kluczy
+    changes = [(task.change_seq, task.pk, task) for task in TaskDAO.get_changes(after, page_size)]
+    priorities = [(priority.change_seq, priority.pk, priority)
+                  for priority in PriorityDAO.get_changes(priority_seq)]
+    if token:
+        changes += [(seq, pk, None) for seq, pk in TombstoneDAO.get_task_changes(after, page_size)]
+        priorities += [(seq, pk, None) for seq, pk in TombstoneDAO.get_priority_changes(priority_seq)]
+    changes.sort(key=lambda change: change[:2])
+    priorities.sort(key=lambda change: change[:2])
+    
+    has_more = len(changes) > page_size
+    changes = changes[:page_size]
+    if changes:
+        after = changes[-1][:2]
+    priority_seq = max([seq for seq, _, _ in priorities], default=priority_seq or 0)
+    
+    return {
+        'tasks': [task for _, _, task in changes if task and not task.deleted],
+        'deleted_tasks': [pk for _, pk, task in changes if not task or task.deleted],
+        'priorities': [priority for _, _, priority in priorities if priority and not priority.deleted],
+        'deleted_priorities': [pk for _, pk, priority in priorities if not priority or priority.deleted],
+        'page_size': page_size,
+        'has_more': has_more,
+        'next_token': _pack_cursor(['changes', *(after or (0, 0)), priority_seq]),
+    }
+
+
+def _decode_change_token(token: str) -> tuple:
+    """Odkoduj token synchronizacji -> ((change_seq, id), change_seq priorytetów)."""
+    try:
+        kind, task_seq, task_id, priority_seq = _unpack_cursor(token)
+    except ValueError:
+        raise InvalidCursorError(token)
+    values = (task_seq, task_id, priority_seq)
+    if kind != 'changes' or not all(isinstance(value, int) and not isinstance(value, bool)
+                                    for value in values):
+        raise InvalidCursorError(token)
+    return (task_seq, task_id), priority_seq
+
+
+# ==================== ASYNC SERVICES (widoki ASGI) ====================
+# Odpowiedniki funkcji powyżej dla widoków async (views.py, api_views.py) - te same wyniki
+# i klucze cache, dane z AsyncTaskDAO (async ORM).
+
+async def aget_task_list_data() -> dict:
+    """Async get_task_list_data (cache wspólny z wersją sync)."""
+    return await cache.aget_or_build('task_list', _abuild_task_list_data)
+
+
+async def _abuild_task_list_data() -> dict:
+    return _task_list_data(await AsyncTaskDAO.get_uncompleted())
+
+
+async def aget_task_stats() -> dict:
+    """
+    Async get_task_stats. Dwa małe zapytania liczników w jednym przejściu
+    do wątku (sync_to_async) zamiast osobnego dla każdego.
+    """
+    today = timezone.now().date()
+    return await cache.aget_or_build(
+        f'task_stats:{today.isoformat()}', lambda: sync_to_async(_build_task_stats)(today))
+
+
+async def aget_task_detail_data(task_id: int) -> dict:
+    """Async get_task_detail_data (DoesNotExist gdy brak taska)."""
+    return {
+        'task': await AsyncTaskDAO.get_by_id(task_id),
+        'attachments': await AsyncAttachmentDAO.get_for_task(task_id),
+    }
+
+
+async def aget_sorted_uncompleted_tasks(sort_by: str, sort_order: str,
+                                        cursor: str = None, page_size: int = None) -> dict:
+    """Async get_sorted_uncompleted_tasks."""
+    return await _aget_sorted_page(TaskDAO.get_uncompleted(), sort_by, sort_order, cursor, page_size)
+
+
+async def aget_sorted_completed_tasks(sort_by: str, sort_order: str,
+                                      cursor: str = None, page_size: int = None) -> dict:
+    """Async get_sorted_completed_tasks."""
+    return await _aget_sorted_page(TaskDAO.get_completed(), sort_by, sort_order, cursor, page_size)
+
+
+async def _aget_sorted_page(queryset, sort_by: str, sort_order: str,
+                            cursor: str = None, page_size: int = None) -> dict:
+    page_size = _clamp_page_size(page_size)
+    after = _decode_cursor(cursor, sort_by, sort_order) if cursor else None
+    try:
+        tasks = await AsyncTaskDAO.get_page(TaskDAO.with_attachments(queryset), SORT_FIELD_MAP[sort_by],
+                                            sort_order == 'desc', after, page_size)
+    except CURSOR_VALUE_ERRORS:
+        raise InvalidCursorError(cursor)
+    return _sorted_page_result(tasks, sort_by, sort_order, page_size)
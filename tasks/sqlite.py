@@ -0,0 +1,27 @@
+"""
+Profil połączeń SQLite: PRAGMY z TASK_SQLITE_PRAGMAS ustawiane przy każdym
+nowym połączeniu (sygnał connection_created). Z CONN_MAX_AGE połączenie -
+i koszt PRAGM - przypada na wątek workera, nie na request.
+"""
+
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Receiver connection_created; inne silniki baz są pomijane."""
+    pragmas = getattr(settings, 'TASK_SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def read_pragmas(connection, names) -> dict:
+    """Bieżące wartości PRAGM połączenia (diagnostyka, testy, benchmark)."""
+    with connection.cursor() as cursor:
+        values = {}
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            values[name] = cursor.fetchone()[0]
+        return values
@@ -0,0 +1,72 @@
+"""
+Storage załączników adresowany treścią (SHA-256).
+Ta sama treść = jeden plik blobs/ab/cd/<sha256>, współdzielony przez wszystkie
+załączniki; licznik referencji trzyma AttachmentBlob (tasks/dao.py).
+"""
+
+import hashlib
+import os
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage, w którym nazwa pliku to skrót jego treści."""
+
+    BLOB_DIR = 'blobs'
+    TEMP_DIR = 'blobs/tmp'
+
+    def blob_name(self, sha256: str) -> str:
+        return f'{self.BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+    def open_temp(self):
+        """Nowy plik tymczasowy w storage (ten sam system plików co bloby)."""
+        name = f'{self.TEMP_DIR}/{uuid.uuid4().hex}'
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o644)
+        return name, os.fdopen(fd, 'wb')
+
+    def write_temp(self, content) -> tuple:
+        """Zapisz treść do pliku tymczasowego, licząc SHA-256. Zwraca (nazwa, sha256, rozmiar)."""
+        name, target = self.open_temp()
+        digest = hashlib.sha256()
+        size = 0
+        with target:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                target.write(chunk)
+                size += len(chunk)
+        return name, digest.hexdigest(), size
+
+    def commit_temp(self, temp_name: str, sha256: str) -> str:
+        """
+        Przenieś plik tymczasowy pod nazwę bloba (rename, bez kopii).
+        Blob już istnieje = duplikat, plik tymczasowy jest usuwany.
+        """
+        name = self.blob_name(sha256)
+        if self.exists(name):
+            self.delete(temp_name)
+        else:
+            path = self.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self.path(temp_name), path)
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        # Nazwę wyznacza treść (_save) - nie dopisujemy sufiksów
+        return name
+
+    def _save(self, name, content):
+        temp_name, sha256, _ = self.write_temp(content)
+        return self.commit_temp(temp_name, sha256)
+
+
+attachment_storage = ContentAddressedStorage()
+
+
+def get_attachment_storage():
+    return attachment_storage
@@ -0,0 +1,11 @@
+from django import template
+
+from tasks.rows import render_rows
+
+register = template.Library()
+
+
+@register.simple_tag
+def task_rows(tasks, completed=False):
+    """Wiersze tabeli listy zadań (strategia TASK_ROW_RENDERER, tasks/rows.py)."""
+    return render_rows(tasks, completed)
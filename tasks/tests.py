@@ -1,3 +1,1334 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import importlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Max
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone, translation
+
+from . import events, instrumentation, rows, services as srs
+from .dao import TaskDAO
+from .forms import PriorityForm
+from .models import Task, Priority, Attachment, AttachmentBlob, FileDeletion
+from .sqlite import apply_pragmas, read_pragmas
+
+
+class TaskApiQueryCountTests(TestCase):
+    """Liczba zapytań API nie może rosnąć z liczbą tasków/załączników."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.priority = Priority.objects.create(name='High', weight=10)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _create_tasks(self, count, completed=False):
+        for i in range(count):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                priority=self.priority,
+                completion_date=timezone.now().date() if completed else None,
+            )
+            for j in range(2):
+                Attachment.objects.create(task=task, file=f'attachments/{i}_{j}.txt', filename=f'{j}.txt')
+
+    def _assert_constant_queries(self, url_name, completed):
+        url = reverse(url_name)
+        # sesja + użytkownik + wersja danych (ETag) + strona tasków + załączniki (prefetch)
+        self._create_tasks(2, completed)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()['tasks']), 2)
+
+        self._create_tasks(20, completed)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        tasks = response.json()['tasks']
+        self.assertEqual(len(tasks), 22)
+        self.assertTrue(all(len(task['attachments']) == 2 for task in tasks))
+
+    def test_uncompleted_api_queries_independent_of_page_size(self):
+        self._assert_constant_queries('api_tasks_uncompleted', completed=False)
+
+    def test_completed_api_queries_independent_of_page_size(self):
+        self._assert_constant_queries('api_tasks_completed', completed=True)
+
+
+class TaskApiPaginationTests(TestCase):
+    """Przejście next_cursor po wszystkich stronach: bez duplikatów i luk przy remisach i NULL."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        low = Priority.objects.create(name='Low', weight=1)
+        high = Priority.objects.create(name='High', weight=10)
+        today = timezone.now().date()
+        for i in range(14):
+            Task.objects.create(
+                title=['Alpha', 'Beta', 'Gamma'][i % 3],
+                priority=[low, high][i % 2],
+                date_added=today - datetime.timedelta(days=i % 4),
+                completion_date=today - datetime.timedelta(days=i % 2) if i % 3 == 0 else None,
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _walk(self, url, sort_by, sort_order):
+        ids, cursor = [], None
+        for _ in range(20):
+            params = {'sort_by': sort_by, 'sort_order': sort_order, 'page_size': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).json()
+            ids.extend(task['id'] for task in data['tasks'])
+            cursor = data['next_cursor']
+            if cursor is None:
+                return ids
+        self.fail('next_cursor does not terminate')
+
+    def test_cursor_walk_covers_every_row_once_in_order(self):
+        endpoints = [('api_tasks_uncompleted', TaskDAO.get_uncompleted()),
+                     ('api_tasks_completed', TaskDAO.get_completed())]
+        for url_name, queryset in endpoints:
+            tasks = list(queryset)
+            for sort_by, field in srs.SORT_FIELD_MAP.items():
+                for sort_order in ('asc', 'desc'):
+                    with self.subTest(url=url_name, sort_by=sort_by, sort_order=sort_order):
+                        # klucz + id w tym samym kierunku (NULL completion_date: same remisy)
+                        expected = [task.pk for task in sorted(
+                            tasks, key=lambda task: (getattr(task, field), task.pk),
+                            reverse=sort_order == 'desc')]
+                        self.assertEqual(self._walk(reverse(url_name), sort_by, sort_order), expected)
+
+    def test_cursor_from_other_sort_is_rejected(self):
+        url = reverse('api_tasks_uncompleted')
+        cursor = self.client.get(url, {'sort_by': 'title', 'page_size': 3}).json()['next_cursor']
+        for params in ({'sort_by': 'priority'}, {'sort_by': 'title', 'sort_order': 'asc'}):
+            with self.subTest(**params):
+                self.assertEqual(self.client.get(url, {**params, 'cursor': cursor}).status_code, 400)
+
+
+class TaskIndexQueryPlanTests(TestCase):
+    """EXPLAIN QUERY PLAN: sortowania TaskDAO obsłużone indeksem, bez sortowania w B-tree."""
+
+    def _assert_uses_index(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {index_name}', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def _page_query(self, queryset, field, descending, after=None):
+        prefix = '-' if descending else ''
+        if after is not None:
+            queryset = queryset.filter(TaskDAO._after_key(field, descending, *after))
+        return queryset.order_by(f'{prefix}{field}', f'{prefix}id')[:50]
+
+    def test_default_orders_use_index(self):
+        self._assert_uses_index(TaskDAO.get_uncompleted(), 'tasks_open_default_idx')
+        self._assert_uses_index(TaskDAO.get_completed(), 'tasks_done_completion_idx')
+
+    def test_sorted_pages_use_partial_indexes(self):
+        cases = [
+            (TaskDAO.get_uncompleted(), 'priority_weight', 5, 'tasks_open_weight_idx'),
+            (TaskDAO.get_completed(), 'priority_weight', 5, 'tasks_done_weight_idx'),
+            (TaskDAO.get_uncompleted(), 'title', 'Task', 'tasks_open_title_idx'),
+            (TaskDAO.get_uncompleted(), 'date_added', '2024-01-01', 'tasks_open_added_idx'),
+            (TaskDAO.get_completed(), 'title', 'Task', 'tasks_done_title_idx'),
+            (TaskDAO.get_completed(), 'date_added', '2024-01-01', 'tasks_done_added_idx'),
+            (TaskDAO.get_completed(), 'completion_date', '2024-01-01', 'tasks_done_completion_idx'),
+        ]
+        for queryset, field, value, index_name in cases:
+            for descending in (False, True):
+                with self.subTest(field=field, index=index_name, descending=descending):
+                    self._assert_uses_index(
+                        self._page_query(queryset, field, descending), index_name)
+                    self._assert_uses_index(
+                        self._page_query(queryset, field, descending, (value, 1)), index_name)
+
+    def test_garbage_collection_lookups_use_index(self):
+        # collect_attachment_garbage: referencje i kolejka sprawdzane po nazwie pliku
+        names = ['attachments/a.bin', 'attachments/b.bin']
+        cases = [
+            Attachment.objects.filter(file__in=names),
+            Attachment.objects.filter(file=names[0]),
+            FileDeletion.objects.filter(name__in=names),
+            FileDeletion.objects.filter(name=names[0]),
+            AttachmentBlob.objects.filter(name=names[0]),
+        ]
+        for queryset in cases:
+            with self.subTest(query=str(queryset.query)):
+                self.assertIn('USING INDEX', queryset.explain())
+
+
+class PriorityWeightSyncTests(TestCase):
+    """Task.priority_weight musi odpowiadać Priority.weight."""
+
+    def setUp(self):
+        self.low = Priority.objects.create(name='Low', weight=1)
+        self.high = Priority.objects.create(name='High', weight=10)
+
+    def test_task_save_copies_weight(self):
+        task = Task.objects.create(title='A', priority=self.low)
+        self.assertEqual(task.priority_weight, 1)
+        task.priority = self.high
+        task.save()
+        task.refresh_from_db()
+        self.assertEqual(task.priority_weight, 10)
+
+    def test_weight_change_updates_tasks_in_bulk(self):
+        for i in range(5):
+            Task.objects.create(title=f'Task {i}', priority=self.low)
+        Task.objects.create(title='High task', priority=self.high)
+        form = PriorityForm({'name': 'Low', 'weight': 20}, instance=self.low)
+        self.assertTrue(form.is_valid())
+        # SAVEPOINT + UPDATE priorities + UPDATE tasks + RELEASE
+        with self.assertNumQueries(4):
+            srs.save_priority_form(form)
+        self.assertEqual(
+            set(Task.objects.filter(priority=self.low).values_list('priority_weight', flat=True)), {20})
+        self.assertEqual(TaskDAO.get_uncompleted()[0].priority, self.low)
+
+    def test_admin_writes_go_through_services(self):
+        """Zmiany z admina: synchronizacja wagi, nowa wersja danych w cache, zdarzenia na żywo."""
+        admin = User.objects.create_superuser('admin', password='secret')
+        self.client.force_login(admin)
+        task = Task.objects.create(title='A', priority=self.high)
+        other = Task.objects.create(title='B', priority=self.high)
+        cache.clear()
+        srs.get_task_list_data()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:tasks_priority_change', args=[self.high.pk]),
+                             {'name': 'High', 'weight': 0})
+        task.refresh_from_db()
+        self.assertEqual(task.priority_weight, 0)
+        # lista z cache przeliczona po zmianie
+        self.assertEqual(srs.get_task_list_data()['uncompleted_tasks'][0].priority_weight, 0)
+
+        with mock.patch.object(events, 'publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:tasks_task_delete', args=[task.pk]), {'post': 'yes'})
+            self.client.post(reverse('admin:tasks_task_changelist'), {
+                'action': 'delete_selected', 'post': 'yes', '_selected_action': [task.pk, other.pk]})
+        self.assertEqual([call.args[0] for call in publish.call_args_list], ['delete', 'delete'])
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+        self.assertTrue(Task.objects.get(pk=other.pk).deleted)
+
+
+class TaskListCacheTests(TestCase):
+    """Dane listy zadań z cache, unieważniane licznikiem zmian z bazy."""
+
+    def setUp(self):
+        cache.clear()
+        self.priority = Priority.objects.create(name='High', weight=10)
+        self.task = Task.objects.create(title='A', priority=self.priority)
+
+    def test_second_read_is_cache_hit(self):
+        srs.get_task_list_data()
+        # tylko wersja danych (klucz cache)
+        with self.assertNumQueries(1):
+            data = srs.get_task_list_data()
+        self.assertEqual(data['uncompleted_tasks'], [self.task])
+
+    def test_mutation_invalidates_cached_lists(self):
+        srs.get_task_list_data()
+        with self.captureOnCommitCallbacks(execute=True):
+            srs.complete_task(self.task.pk)
+        data = srs.get_task_list_data()
+        self.assertEqual(data['uncompleted_tasks'], [])
+        self.assertNotIn('completed_tasks', data)
+
+    def test_write_from_other_process_invalidates(self):
+        """Zapis poza tym procesem (inny worker, SQL) - licznik w bazie zmienia klucz cache."""
+        srs.get_task_list_data()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE tasks SET title = %s, change_seq = change_seq + 1 WHERE id = %s', ['B', self.task.pk])
+        self.assertEqual(srs.get_task_list_data()['uncompleted_tasks'][0].title, 'B')
+
+    def test_completed_history_is_not_loaded(self):
+        """Strona listy: koszt niezależny od liczby ukończonych (wiersze doładowuje API)."""
+        self.client.force_login(User.objects.create_user('tester', password='secret'))
+        today = timezone.now().date()
+
+        def page_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('task_list'))
+            return response, len(queries)
+
+        _, expected = page_queries()
+        Task.objects.bulk_create(
+            Task(title=f'Old {i}', priority=self.priority, priority_weight=10, completion_date=today)
+            for i in range(30))
+        response, count = page_queries()
+        self.assertEqual(count, expected)
+        self.assertNotContains(response, 'Old 1')
+        self.assertContains(response, '<details id="completed-section"')
+        self.assertContains(response, '(30)')
+
+        api = self.client.get(reverse('api_tasks_completed'), {'page_size': 20}).json()
+        self.assertEqual(len(api['tasks']), 20)
+        self.assertIsNotNone(api['next_cursor'])
+
+
+class ConditionalGetTests(TestCase):
+    """ETag: 304 bez zapytań o dane, nowy ETag po modyfikacji."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.priority = Priority.objects.create(name='High', weight=10)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.task = Task.objects.create(title='A', priority=self.priority)
+
+    def _assert_revalidates(self, url):
+        self.client.get(url)  # pierwsza wizyta ustawia cookie CSRF (część ETag)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        # tylko sesja + użytkownik + wersja danych, bez zapytań o taski
+        with self.assertNumQueries(3):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            srs.complete_task(self.task.pk)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_task_list(self):
+        self._assert_revalidates(reverse('task_list'))
+
+    def test_api_uncompleted(self):
+        self._assert_revalidates(reverse('api_tasks_uncompleted'))
+
+    def test_api_completed(self):
+        self._assert_revalidates(reverse('api_tasks_completed') + '?sort_by=title')
+
+    def test_etag_shared_between_processes(self):
+        """Walidatory z bazy: zapis innego procesu zmienia ETag mimo pustego/obcego cache."""
+        url = reverse('api_tasks_uncompleted')
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE tasks SET title = %s, change_seq = change_seq + 1 WHERE id = %s', ['B', self.task.pk])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tasks'][0]['title'], 'B')
+
+    def test_attachment_changes_etag(self):
+        """Załączniki są w odpowiedzi API - dodanie i usunięcie unieważnia ETag."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        url = reverse('api_tasks_uncompleted')
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+
+        with self.settings(MEDIA_ROOT=media_root), self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('attachment_add', args=[self.task.pk]),
+                             {'file': SimpleUploadedFile('a.txt', b'data')})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['tasks'][0]['attachments']), 1)
+
+        etag = response['ETag']
+        with self.settings(MEDIA_ROOT=media_root), self.captureOnCommitCallbacks(execute=True):
+            srs.delete_attachment(self.task.attachments.get().pk)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tasks'][0]['attachments'], [])
+
+
+class BulkTaskApiTests(TestCase):
+    """Operacje masowe: jeden UPDATE na paczkę, raport pominiętych ID."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.priority = Priority.objects.create(name='High', weight=10)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.open_tasks = [Task.objects.create(title=f'Open {i}', priority=self.priority) for i in range(3)]
+        self.done_task = Task.objects.create(
+            title='Done', priority=self.priority, completion_date=timezone.now().date())
+
+    def _post(self, action, ids):
+        return self.client.post(
+            reverse('api_tasks_bulk', args=[action]), {'ids': ids}, content_type='application/json')
+
+    def test_bulk_complete_reports_skipped(self):
+        ids = [task.pk for task in self.open_tasks] + [self.done_task.pk, 999999]
+        response = self._post('complete', ids)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], sorted(task.pk for task in self.open_tasks))
+        self.assertEqual(response.json()['skipped'], [self.done_task.pk, 999999])
+        self.assertFalse(TaskDAO.get_uncompleted().exists())
+
+    def test_bulk_queries_independent_of_id_count(self):
+        ids = [task.pk for task in self.open_tasks]
+        # SAVEPOINT + SELECT id + UPDATE + RELEASE
+        with self.assertNumQueries(4):
+            srs.bulk_task_action('delete', ids)
+        self.assertFalse(Task.objects.filter(deleted=False, pk__in=ids).exists())
+
+    def test_invalid_payload(self):
+        self.assertEqual(self._post('complete', ['x']).status_code, 400)
+        self.assertEqual(self._post('archive', [1]).status_code, 404)
+
+
+class TaskTransitionTests(TestCase):
+    """Przejścia stanu: jeden warunkowy UPDATE zmienianych kolumn."""
+
+    def setUp(self):
+        self.priority = Priority.objects.create(name='High', weight=10)
+        self.task = Task.objects.create(title='A', content='x' * 1000, priority=self.priority)
+
+    def test_complete_is_single_column_update(self):
+        with self.assertNumQueries(1) as queries:
+            srs.complete_task(self.task.pk)
+        sql = queries.captured_queries[0]['sql']
+        self.assertTrue(sql.startswith('UPDATE'))
+        self.assertIn('"completion_date" IS NULL', sql)
+        self.assertNotIn('"content"', sql)
+
+    def test_transition_from_wrong_state_raises(self):
+        with self.assertRaises(Task.DoesNotExist):
+            srs.restore_task(self.task.pk)
+        srs.complete_task(self.task.pk)
+        with self.assertRaises(Task.DoesNotExist):
+            srs.complete_task(self.task.pk)
+        srs.restore_task(self.task.pk)
+        srs.delete_task(self.task.pk)
+        with self.assertRaises(Task.DoesNotExist):
+            srs.delete_task(self.task.pk)
+
+    def test_delete_priority_is_single_update(self):
+        with self.assertNumQueries(1):
+            srs.delete_priority(self.priority.pk)
+        with self.assertRaises(Priority.DoesNotExist):
+            srs.delete_priority(self.priority.pk)
+
+
+class ConfirmViewPostQueryTests(TestCase):
+    """POST w widokach potwierdzeń: jedna operacja na bazie, 404 gdy nic nie pasuje."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.priority = Priority.objects.create(name='High', weight=10)
+        self.task = Task.objects.create(title='A', priority=self.priority)
+
+    def _assert_post(self, url_name, pk, expected_queries):
+        url = reverse(url_name, args=[pk])
+        # sesja + użytkownik + operacja
+        with self.assertNumQueries(expected_queries):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.post(url).status_code, 404)
+
+    def test_task_complete(self):
+        self._assert_post('task_complete', self.task.pk, 3)
+
+    def test_task_restore(self):
+        srs.complete_task(self.task.pk)
+        # + wiersz przywróconego taska do zdarzenia na żywo
+        self._assert_post('task_restore', self.task.pk, 4)
+
+    def test_task_delete(self):
+        self._assert_post('task_delete', self.task.pk, 3)
+
+    def test_priority_delete(self):
+        self._assert_post('priority_delete', self.priority.pk, 3)
+
+    def test_attachment_delete(self):
+        attachment = Attachment.objects.create(
+            task=self.task, file='attachments/missing.txt', filename='missing.txt')
+        # 8: sesja + użytkownik + SAVEPOINT + SELECT task_id/plik + DELETE
+        # + UPDATE change_seq taska + INSERT do kolejki usuwania plików + RELEASE.
+        # Plik sprzed deduplikacji (bez sha256) - bez UPDATE licznika referencji bloba;
+        # dla pliku z blobem dochodzi UPDATE ref_count (i DELETE bloba przy ostatniej referencji)
+        self._assert_post('attachment_delete', attachment.pk, 8)
+        self.assertFalse(Attachment.objects.filter(pk=attachment.pk).exists())
+
+
+class MediaAccessTests(TestCase):
+    """Pliki załączników tylko przez widok pobierania (logowanie), bez /media/."""
+
+    def test_media_url_is_not_served(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        os.makedirs(os.path.join(media_root, 'attachments'))
+        with open(os.path.join(media_root, 'attachments', 'a.txt'), 'wb') as target:
+            target.write(b'data')
+        settings_override = self.settings(DEBUG=True, MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # urls.py czytany raz przy imporcie - przeładowanie z DEBUG=True
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+        self.addCleanup(clear_url_caches)
+
+        user = User.objects.create_user('tester', password='secret')
+        task = Task.objects.create(title='A', priority=Priority.objects.create(name='High', weight=10))
+        attachment = Attachment.objects.create(task=task, file='attachments/a.txt', filename='a.txt')
+        self.assertEqual(self.client.get(settings.MEDIA_URL + attachment.file.name).status_code, 404)
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(settings.MEDIA_URL + attachment.file.name).status_code, 404)
+
+        self.client.logout()
+        response = self.client.get(reverse('attachment_download', args=[attachment.pk]))
+        self.assertEqual(response.status_code, 302)
+
+
+class StreamingUploadTests(TestCase):
+    """Upload strumieniowy: plik zapisany raz w storage, hash liczony w locie."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.priority = Priority.objects.create(name='High', weight=10)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = self.settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = media_root
+        self.client.force_login(self.user)
+        self.task = Task.objects.create(title='A', priority=self.priority)
+        self.url = reverse('attachment_add', args=[self.task.pk])
+
+    def _stored_files(self):
+        return [os.path.join(root, name) for root, _, names in os.walk(self.media_root) for name in names]
+
+    def test_upload_is_written_once_with_hash(self):
+        content = os.urandom(3 * 1024 * 1024 + 17)
+        response = self.client.post(self.url, {'file': SimpleUploadedFile('report.bin', content)})
+        self.assertEqual(response.status_code, 302)
+        attachment = Attachment.objects.get(task=self.task)
+        self.assertEqual(attachment.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(attachment.size, len(content))
+        self.assertEqual(attachment.filename, 'report.bin')
+        self.assertEqual(self._stored_files(), [attachment.file.path])
+        with attachment.file.open('rb') as stored:
+            self.assertEqual(stored.read(), content)
+
+    def test_too_large_upload_is_rejected_without_leftovers(self):
+        with self.settings(ATTACHMENT_MAX_UPLOAD_SIZE=1024):
+            response = self.client.post(
+                self.url, {'file': SimpleUploadedFile('big.bin', b'x' * 4 * 1024 * 1024)})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].has_error('file'))
+        self.assertFalse(Attachment.objects.exists())
+        self.assertEqual(self._stored_files(), [])
+
+    def test_identical_uploads_share_one_blob(self):
+        other_task = Task.objects.create(title='B', priority=self.priority)
+        content = b'same document' * 1000
+        for task in (self.task, other_task):
+            self.client.post(
+                reverse('attachment_add', args=[task.pk]),
+                {'file': SimpleUploadedFile('doc.txt', content)})
+        first, second = Attachment.objects.order_by('pk')
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(len(self._stored_files()), 1)
+        self.assertEqual(AttachmentBlob.objects.get(pk=first.sha256).ref_count, 2)
+
+        srs.delete_attachment(first.pk)
+        self.assertEqual(self._stored_files(), [second.file.path])
+        self.assertEqual(AttachmentBlob.objects.get(pk=first.sha256).ref_count, 1)
+
+        srs.delete_attachment(second.pk)
+        self.assertFalse(AttachmentBlob.objects.exists())
+        # Plik usuwa dopiero odśmiecanie (kolejka)
+        self.assertEqual(self._stored_files(), [second.file.path])
+        call_command('collect_attachment_garbage', stdout=io.StringIO())
+        self.assertEqual(self._stored_files(), [])
+        self.assertFalse(FileDeletion.objects.exists())
+
+    def test_concurrent_delete_releases_blob_once(self):
+        other_task = Task.objects.create(title='B', priority=self.priority)
+        for task in (self.task, other_task):
+            self.client.post(reverse('attachment_add', args=[task.pk]),
+                             {'file': SimpleUploadedFile('doc.txt', b'shared')})
+        attachment = Attachment.objects.order_by('pk').first()
+        # Drugie żądanie: wiersz odczytany, ale DELETE nie trafia (usunął go już pierwszy)
+        with mock.patch('django.db.models.query.QuerySet.delete', return_value=(0, {})):
+            with self.assertRaises(Attachment.DoesNotExist):
+                srs.delete_attachment(attachment.pk)
+        self.assertEqual(AttachmentBlob.objects.get(pk=attachment.sha256).ref_count, 2)
+        self.assertFalse(FileDeletion.objects.exists())
+
+    def test_dedupe_moves_legacy_files_and_rebuilds_ref_counts(self):
+        legacy = []
+        for i, content in enumerate([b'same', b'same', b'other']):
+            name = f'attachments/2024/01/01/legacy_{i}.txt'
+            path = os.path.join(self.media_root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as handle:
+                handle.write(content)
+            legacy.append(Attachment.objects.create(task=self.task, file=name, filename=f'{i}.txt'))
+        stale = AttachmentBlob.objects.create(sha256='0' * 64, name='blobs/stale', size=1, ref_count=3)
+
+        call_command('dedupe_attachments', '--batch-size', '1', stdout=io.StringIO())
+        same = hashlib.sha256(b'same').hexdigest()
+        self.assertEqual(
+            dict(AttachmentBlob.objects.values_list('sha256', 'ref_count')),
+            {same: 2, hashlib.sha256(b'other').hexdigest(): 1, stale.sha256: 0})
+        self.assertEqual(Attachment.objects.get(pk=legacy[1].pk).file.name, AttachmentBlob.objects.get(pk=same).name)
+        self.assertEqual(len(self._stored_files()), 2)
+
+    def test_garbage_collection_removes_orphans_and_deleted_task_files(self):
+        self.client.post(self.url, {'file': SimpleUploadedFile('doc.txt', b'task file')})
+        kept = Task.objects.create(title='B', priority=self.priority)
+        self.client.post(
+            reverse('attachment_add', args=[kept.pk]), {'file': SimpleUploadedFile('k.txt', b'kept')})
+        orphan = os.path.join(self.media_root, 'attachments', 'old.bin')
+        os.makedirs(os.path.dirname(orphan))
+        with open(orphan, 'wb') as handle:
+            handle.write(b'orphan')
+        srs.delete_task(self.task.pk)
+
+        call_command('collect_attachment_garbage', '--purge-deleted-tasks',
+                     '--grace-hours', '0', stdout=io.StringIO())
+        kept_attachment = Attachment.objects.get()
+        self.assertEqual(kept_attachment.task, kept)
+        self.assertEqual(self._stored_files(), [kept_attachment.file.path])
+        self.assertEqual(list(AttachmentBlob.objects.values_list('pk', flat=True)), [kept_attachment.sha256])
+
+
+class AttachmentDownloadTests(TestCase):
+    """Pobieranie: Range, ETag = SHA-256, offload do serwera WWW."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.priority = Priority.objects.create(name='High', weight=10)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = self.settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_login(self.user)
+        task = Task.objects.create(title='A', priority=self.priority)
+        self.content = bytes(range(256)) * 40
+        srs.create_attachment(task.pk, SimpleUploadedFile('data.bin', self.content), 'data.bin')
+        self.attachment = Attachment.objects.get()
+        self.url = reverse('attachment_download', args=[self.attachment.pk])
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{self.attachment.sha256}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('filename="data.bin"', response['Content-Disposition'])
+
+    def test_if_none_match_returns_304(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"{self.attachment.sha256}"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        size = len(self.content)
+        cases = [
+            ('bytes=0-99', 0, 99),
+            ('bytes=10000-', 10000, size - 1),
+            ('bytes=-24', size - 24, size - 1),
+            ('bytes=100-999999', 100, size - 1),
+        ]
+        for header, start, end in cases:
+            with self.subTest(range=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+                self.assertEqual(b''.join(response.streaming_content), self.content[start:end + 1])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual(response.status_code, 416)
+        # If-Range z nieaktualnym ETag -> cały plik
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_x_accel_redirect_offload(self):
+        with self.settings(ATTACHMENT_SENDFILE_BACKEND='x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.attachment.file.name}')
+        self.assertEqual(response.content, b'')
+
+
+class TaskSearchTests(TestCase):
+    """Wyszukiwanie FTS5: ranking bm25, filtr stanu, synchronizacja triggerami."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.priority = Priority.objects.create(name='High', weight=10)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.in_title = Task.objects.create(title='Raport kwartalny', content='Podsumowanie', priority=self.priority)
+        self.in_content = Task.objects.create(
+            title='Spotkanie', content='Omówić raport z działem sprzedaży', priority=self.priority)
+        self.done = Task.objects.create(
+            title='Stary raport', priority=self.priority, completion_date=timezone.now().date())
+
+    def _search(self, **params):
+        return self.client.get(reverse('api_tasks_search'), params)
+
+    def _ids(self, response):
+        return [task['id'] for task in response.json()['tasks']]
+
+    def test_ranking_and_state_filter(self):
+        response = self._search(q='raport', state='uncompleted')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._ids(response), [self.in_title.pk, self.in_content.pk])
+        self.assertEqual(self._ids(self._search(q='raport', state='completed')), [self.done.pk])
+        self.assertEqual(len(self._ids(self._search(q='raport'))), 3)
+
+    def test_prefix_diacritics_and_fts_syntax_are_handled(self):
+        self.assertEqual(self._ids(self._search(q='omowic sprzed')), [self.in_content.pk])
+        self.assertEqual(self._ids(self._search(q='"raport" AND (NEAR')), [])
+        self.assertEqual(self._search(q='   ').status_code, 400)
+        self.assertEqual(self._search(q='raport', state='deleted').status_code, 400)
+
+    def test_index_follows_task_writes(self):
+        self.in_title.title = 'Budżet'
+        self.in_title.save()
+        srs.delete_task(self.in_content.pk)
+        self.assertEqual(self._ids(self._search(q='raport')), [self.done.pk])
+        self.assertEqual(self._ids(self._search(q='budzet')), [self.in_title.pk])
+
+    def test_cursor_pages_through_ranking(self):
+        first = self._search(q='raport', page_size=2).json()
+        self.assertEqual(len(first['tasks']), 2)
+        second = self._search(q='raport', page_size=2, cursor=first['next_cursor']).json()
+        self.assertEqual(len(second['tasks']), 1)
+        self.assertIsNone(second['next_cursor'])
+        self.assertEqual(self._search(q='inne', cursor=first['next_cursor']).status_code, 400)
+
+
+class TaskStatsTests(TestCase):
+    """Liczniki statystyk utrzymywane triggerami = agregaty liczone od zera."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.high = Priority.objects.create(name='High', weight=10)
+        cls.low = Priority.objects.create(name='Low', weight=1)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.tasks = [Task.objects.create(title=f'Task {i}', priority=self.high) for i in range(4)]
+        self.low_task = Task.objects.create(title='Low', priority=self.low)
+
+    def _counts(self):
+        return {(row['id'], row['open'], row['completed']) for row in srs.get_task_stats()['priorities']}
+
+    def test_counters_follow_transitions_bulk_and_edits(self):
+        today = timezone.now().date()
+        with self.captureOnCommitCallbacks(execute=True):
+            srs.complete_task(self.tasks[0].pk)
+            srs.bulk_task_action('complete', [self.tasks[1].pk, self.tasks[2].pk])
+            srs.restore_task(self.tasks[1].pk)
+            srs.delete_task(self.tasks[3].pk)
+            self.low_task.priority = self.high
+            self.low_task.save()
+            cache.clear()
+        stats = srs.get_task_stats()
+        self.assertEqual(self._counts(), {(self.high.pk, 2, 2)})
+        self.assertEqual(stats['completed_today'], 2)
+        self.assertEqual(stats['daily_completions'][-1], {'date': today.isoformat(), 'completed': 2})
+
+        live = self._counts()
+        srs.rebuild_task_stats()
+        cache.clear()
+        self.assertEqual(self._counts(), live)
+
+    def test_stats_read_does_not_scan_tasks(self):
+        # wersja danych + liczniki per priorytet + ukończenia per dzień
+        with self.assertNumQueries(3):
+            srs.get_task_stats()
+        response = self.client.get(reverse('api_tasks_stats'))
+        self.assertEqual(response.json()['open'], 5)
+        self.assertContains(self.client.get(reverse('task_list')), 'class="task-stats"')
+
+    def test_revalidation_after_midnight(self):
+        """Okno statystyk przesuwa się o północy bez zapisu - nowy ETag i Last-Modified."""
+        url = reverse('api_tasks_stats')
+        response = self.client.get(url)
+        etag, modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        tomorrow = timezone.now() + datetime.timedelta(days=1)
+        with mock.patch('django.utils.timezone.now', return_value=tomorrow):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['daily_completions'][-1]['date'], tomorrow.date().isoformat())
+
+
+class TaskTransferTests(TestCase):
+    """Import/eksport CSV i NDJSON: paczki bulk_create, strumień przy eksporcie."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.priority = Priority.objects.create(name='High', weight=10)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _import(self, fmt, body):
+        return self.client.post(
+            reverse('api_tasks_import', args=[fmt]), body, content_type='text/plain').json()
+
+    def test_ndjson_import_batches_and_reports_errors(self):
+        lines = [json.dumps({'title': f'T{i}', 'priority': 'High'}) for i in range(5)]
+        lines += [
+            json.dumps({'title': 'New prio', 'priority': 'Low', 'priority_weight': 1,
+                        'completion_date': '2024-05-01'}),
+            '{broken',
+            json.dumps({'title': '', 'priority': 'High'}),
+            json.dumps({'title': 'Bad date', 'priority': 'High', 'date_added': '2024-13-01'}),
+        ]
+        with self.settings(TASK_IMPORT_BATCH_SIZE=3):
+            report = self._import('ndjson', '\n'.join(lines))
+        self.assertEqual(report['created'], 6)
+        self.assertEqual([error['row'] for error in report['errors']], [7, 8, 9])
+        low = Priority.objects.get(name='Low')
+        self.assertEqual(Task.objects.get(title='New prio').priority_weight, low.weight)
+        self.assertEqual(TaskDAO.get_completed().count(), 1)
+
+    def test_csv_round_trip_through_streaming_export(self):
+        Task.objects.create(title='Zażółć, "gęślą"', content='line 1\nline 2', priority=self.priority)
+        Task.objects.create(title='Done', priority=self.priority, completion_date=timezone.now().date())
+        response = self.client.get(reverse('api_tasks_export', args=['csv']))
+        self.assertTrue(response.streaming)
+        exported = b''.join(response.streaming_content).decode()
+
+        Task.objects.all().delete()
+        # słownik priorytetów + SAVEPOINT/INSERT/RELEASE na paczkę
+        with self.assertNumQueries(4):
+            report = srs.import_tasks(io.BytesIO(exported.encode()), 'csv')
+        self.assertEqual(report, {'created': 2, 'failed': 0, 'errors': []})
+        imported = self.client.get(reverse('api_tasks_export', args=['csv']))
+        self.assertEqual(b''.join(imported.streaming_content).decode(), exported)
+        self.assertEqual(self.client.get(reverse('api_tasks_export', args=['xml'])).status_code, 404)
+
+
+@override_settings(TASK_INSTRUMENTATION=True, TASK_QUERY_BUDGET_ACTION='raise')
+class InstrumentationTests(TestCase):
+    """Server-Timing, metryki Prometheus i budżety zapytań kluczowych widoków."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret', is_staff=True)
+        cls.priority = Priority.objects.create(name='High', weight=10)
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.registry.reset()
+        self.client.force_login(self.user)
+        self.task = Task.objects.create(title='Raport', priority=self.priority)
+
+    def test_views_stay_within_query_budgets(self):
+        urls = [
+            reverse('task_list'),
+            reverse('task_detail', args=[self.task.pk]),
+            reverse('api_tasks_uncompleted'),
+            reverse('api_tasks_completed'),
+            reverse('api_tasks_search') + '?q=raport',
+            reverse('api_tasks_stats'),
+            reverse('api_tasks_changes'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", serialize;')
+
+        metrics = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('tasks_http_requests_total{view="task_list"} 1', metrics)
+        self.assertIn('tasks_http_request_duration_seconds_count{view="api_tasks_stats"} 1', metrics)
+        self.assertRegex(metrics, r'tasks_stage_seconds_total\{view="task_list",stage="render"\} 0\.\d*[1-9]')
+
+    async def test_async_views_stay_within_query_budgets(self):
+        urls = [
+            reverse('task_list_async'),
+            reverse('task_detail_async', args=[self.task.pk]),
+            reverse('api_tasks_uncompleted_async'),
+            reverse('api_tasks_completed_async'),
+        ]
+        await sync_to_async(self.async_client.force_login)(self.user)
+        for url in urls:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                # Zapytania async ORM (wątek sync_to_async) też są liczone
+                self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    def test_exceeded_budget_fails(self):
+        with self.settings(TASK_QUERY_BUDGETS={'task_list': 1}):
+            with self.assertRaises(instrumentation.QueryBudgetExceeded):
+                self.client.get(reverse('task_list'))
+
+
+class SqliteProfileTests(TestCase):
+    """PRAGMY z TASK_SQLITE_PRAGMAS ustawiane przy nowym połączeniu."""
+
+    def test_pragmas_applied_on_connection(self):
+        # Baza testowa jest w pamięci (journal_mode=memory), pozostałe PRAGMY jak w produkcji
+        self.assertEqual(
+            read_pragmas(connection, ['synchronous', 'busy_timeout', 'cache_size', 'temp_store']),
+            {'synchronous': 1, 'busy_timeout': 5000, 'cache_size': -20000, 'temp_store': 2},
+        )
+
+    def test_pragmas_follow_settings(self):
+        try:
+            with self.settings(TASK_SQLITE_PRAGMAS={'busy_timeout': 1234}):
+                apply_pragmas(sender=None, connection=connection)
+                self.assertEqual(read_pragmas(connection, ['busy_timeout']), {'busy_timeout': 1234})
+        finally:
+            # Wewnątrz transakcji testu da się przywrócić tylko tę PRAGMĘ (synchronous nie)
+            with self.settings(TASK_SQLITE_PRAGMAS={'busy_timeout': 5000}):
+                apply_pragmas(sender=None, connection=connection)
+
+
+class AsyncViewTests(TestCase):
+    """Warianty async (ASGI) zwracają to samo co widoki sync."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        high = Priority.objects.create(name='High', weight=10)
+        low = Priority.objects.create(name='Low', weight=1)
+        today = timezone.now().date()
+        for i in range(5):
+            task = Task.objects.create(title=f'Open {i}', priority=high if i % 2 else low)
+            Attachment.objects.create(task=task, file=f'attachments/{i}.txt', filename=f'{i}.txt')
+            Task.objects.create(title=f'Done {i}', priority=high, completion_date=today)
+        cls.task = task
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    async def test_api_matches_sync(self):
+        pairs = [
+            ('api_tasks_uncompleted', 'api_tasks_uncompleted_async', '?sort_by=title&sort_order=asc&page_size=2'),
+            ('api_tasks_completed', 'api_tasks_completed_async', '?page_size=3'),
+        ]
+        for sync_name, async_name, query in pairs:
+            with self.subTest(view=async_name):
+                expected = await self._sync_get(reverse(sync_name) + query)
+                response = await self.async_client.get(reverse(async_name) + query)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+                next_page = await self.async_client.get(
+                    reverse(async_name), {'cursor': response.json()['next_cursor'],
+                                          **dict(p.split('=') for p in query[1:].split('&'))})
+                self.assertEqual(next_page.status_code, 200)
+                self.assertNotEqual(next_page.json()['tasks'][0]['id'], response.json()['tasks'][0]['id'])
+
+    async def test_html_views_render_same_data(self):
+        response = await self.async_client.get(reverse('task_list_async'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['stats']['open'], 5)
+        self.assertEqual(len(response.context['uncompleted_tasks']), 5)
+        self.assertContains(response, 'completed-section')
+        self.assertNotContains(response, 'Done 4')
+
+        response = await self.async_client.get(reverse('task_detail_async', args=[self.task.pk]))
+        self.assertContains(response, self.task.title)
+        self.assertEqual(len(response.context['attachments']), 1)
+
+        response = await self.async_client.get(reverse('task_detail_async', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_conditional_get(self):
+        url = reverse('api_tasks_uncompleted_async')
+        response = await self.async_client.get(url)
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_invalid_params_and_auth(self):
+        url = reverse('api_tasks_completed_async')
+        self.assertEqual((await self.async_client.get(url, {'sort_by': 'content'})).status_code, 400)
+        self.assertEqual((await self.async_client.get(url, {'cursor': 'zzz'})).status_code, 400)
+        self.assertEqual((await self.async_client.post(url)).status_code, 405)
+
+        self.async_client.cookies.clear()
+        self.assertEqual((await self.async_client.get(url)).status_code, 403)
+        response = await self.async_client.get(reverse('task_list_async'))
+        self.assertRedirects(response, f"/admin/login/?next={reverse('task_list_async')}",
+                             fetch_redirect_response=False)
+
+    async def _sync_get(self, url):
+        return await sync_to_async(self.client.get)(url)
+
+
+class _ImmediateLoop:
+    """Pętla zastępcza dla subskrypcji w testach sync - dostarcza od razu."""
+
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+
+class LiveEventsTests(TestCase):
+    """Zdarzenia na żywo: emisja z DAO i formularzy, broker, strumień SSE."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.priority = Priority.objects.create(name='High', weight=10)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+        self.task = Task.objects.create(title='Raport', priority=self.priority)
+        self.subscription = events.broker.subscribe(_ImmediateLoop())
+        self.addCleanup(events.broker.unsubscribe, self.subscription)
+
+    def _received(self) -> list:
+        received = []
+        while not self.subscription.queue.empty():
+            received.append(self.subscription.queue.get_nowait())
+        return received
+
+    def test_transitions_publish_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_complete', args=[self.task.pk]))
+            # Przed zatwierdzeniem transakcji nic nie wychodzi
+            self.assertEqual(self._received(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_restore', args=[self.task.pk]))
+            self.client.post(reverse('task_delete', args=[self.task.pk]))
+
+        received = self._received()
+        self.assertEqual([event['type'] for event in received], ['complete', 'restore', 'delete'])
+        self.assertEqual(received[0]['ids'], [self.task.pk])
+        self.assertEqual(received[0]['completion_date'], timezone.now().date())
+        self.assertEqual(len({event['id'] for event in received}), 3)
+
+    def test_bulk_and_form_save_publish(self):
+        other = Task.objects.create(title='Inny', priority=self.priority)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('api_tasks_bulk', args=['complete']),
+                             {'ids': [self.task.pk, other.pk]}, content_type='application/json')
+            self.client.post(reverse('task_update', args=[self.task.pk]), {
+                'title': 'Raport v2', 'content': '', 'date_added': '2026-01-02', 'priority': self.priority.pk,
+            })
+
+        bulk, save = self._received()
+        self.assertEqual((bulk['type'], sorted(bulk['ids'])), ('complete', sorted([self.task.pk, other.pk])))
+        self.assertEqual(save['type'], 'save')
+        self.assertEqual(save['task']['title'], 'Raport v2')
+        self.assertEqual(save['task']['priority'], {'id': self.priority.pk, 'name': 'High', 'weight': 10})
+        self.assertIsNotNone(save['task']['completion_date'])
+
+    def test_restore_event_carries_rows(self):
+        """Przywrócenie niesie wiersze - klient wstawia task, którego nie miał w leniwej tabeli ukończonych."""
+        done = Task.objects.create(title='Stary', priority=self.priority, completion_date=timezone.now().date())
+        done.refresh_from_db()
+        TaskDAO.complete(self.task.pk, timezone.now().date())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_restore', args=[done.pk]))
+            self.client.post(reverse('api_tasks_bulk', args=['restore']),
+                             {'ids': [self.task.pk]}, content_type='application/json')
+
+        single, bulk = self._received()
+        self.assertEqual(single['tasks'], [{
+            'id': done.pk, 'title': 'Stary', 'date_added': done.date_added, 'completion_date': None,
+            'priority': {'id': self.priority.pk, 'name': 'High', 'weight': 10},
+        }])
+        self.assertEqual([(task['id'], task['completion_date']) for task in bulk['tasks']], [(self.task.pk, None)])
+
+    def test_resume_from_last_event_id(self):
+        first, second, third = (events.broker.publish('delete', {'ids': [pk]}) for pk in (1, 2, 3))
+        resumed = events.broker.subscribe(_ImmediateLoop(), first['id'])
+        self.addCleanup(events.broker.unsubscribe, resumed)
+        self.assertEqual(resumed.backlog, [second, third])
+
+        for last_event_id in (0, third['id'] + 1):
+            with self.subTest(last_event_id=last_event_id):
+                stale = events.broker.subscribe(_ImmediateLoop(), last_event_id)
+                events.broker.unsubscribe(stale)
+                self.assertEqual([event['type'] for event in stale.backlog], ['reset'])
+
+    def test_slow_subscriber_gets_reset(self):
+        slow = events.broker.subscribe(_ImmediateLoop(), queue_size=2)
+        self.addCleanup(events.broker.unsubscribe, slow)
+        for pk in range(3):
+            events.broker.publish('delete', {'ids': [pk]})
+        self.assertEqual(slow.queue.get_nowait()['type'], 'reset')
+        self.assertTrue(slow.queue.empty())
+
+    def test_stream_requires_asgi(self):
+        self.assertEqual(self.client.get(reverse('task_events')).status_code, 204)
+
+    async def test_sse_stream(self):
+        response = await self.async_client.get(reverse('task_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content.__aiter__()
+        self.assertEqual(await stream.__anext__(), b'retry: 3000\n\n')
+
+        event = events.broker.publish('complete', {'ids': [self.task.pk], 'completion_date': timezone.now().date()})
+        chunk = (await stream.__anext__()).decode()
+        self.assertTrue(chunk.startswith(f'id: {event["id"]}\ndata: {{"type":"complete","ids":[{self.task.pk}]'))
+
+    async def test_closed_stream_unsubscribes(self):
+        count = events.broker.subscriber_count()
+        stream = events.stream()
+        await stream.__anext__()
+        self.assertEqual(events.broker.subscriber_count(), count + 1)
+        await stream.aclose()
+        self.assertEqual(events.broker.subscriber_count(), count)
+
+    @override_settings(TASK_EVENTS_MAX_AGE=0.2, TASK_EVENTS_HEARTBEAT=0.05)
+    async def test_stream_ends_after_max_age(self):
+        """Porzucone połączenie (bez aclose) kończy się samo; ostatnie id do wznowienia."""
+        count = events.broker.subscriber_count()
+        stream = events.stream()
+        await stream.__anext__()
+        event = events.broker.publish('delete', {'ids': [self.task.pk]})
+        chunks = [chunk async for chunk in stream]
+        self.assertEqual(events.broker.subscriber_count(), count)
+        self.assertTrue(chunks[0].startswith(f'id: {event["id"]}\n'))
+        self.assertIn(': ping\n\n', chunks)
+        self.assertEqual(chunks[-1], f'id: {event["id"]}\n\n')
+        resumed = events.broker.subscribe(_ImmediateLoop(), event['id'])
+        events.broker.unsubscribe(resumed)
+        self.assertEqual(resumed.backlog, [])
+
+
+class TaskChangesApiTests(TestCase):
+    """Synchronizacja przyrostowa: tylko wiersze zmienione od tokenu, usunięte jako ID."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.priority = Priority.objects.create(name='High', weight=10)
+        self.tasks = [Task.objects.create(title=f'Task {i}', priority=self.priority) for i in range(3)]
+
+    def _sync(self, token=None, **params):
+        if token:
+            params['token'] = token
+        response = self.client.get(reverse('api_tasks_changes'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _drain(self, token=None, **params):
+        """Wszystkie strony od tokenu -> (ID tasków, ID usuniętych, nowy token)."""
+        task_ids, deleted = [], []
+        while True:
+            data = self._sync(token, **params)
+            task_ids += [task['id'] for task in data['tasks']]
+            deleted += data['deleted_tasks']
+            token = data['next_token']
+            if not data['has_more']:
+                return task_ids, deleted, token
+
+    def test_initial_sync_then_only_changes(self):
+        data = self._sync()
+        self.assertEqual([task['id'] for task in data['tasks']], [task.pk for task in self.tasks])
+        self.assertEqual([priority['name'] for priority in data['priorities']], ['High'])
+        token = data['next_token']
+
+        empty = self._sync(token)
+        self.assertEqual((empty['tasks'], empty['deleted_tasks'], empty['priorities']), ([], [], []))
+        self.assertEqual(empty['next_token'], token)
+
+        first, second, third = self.tasks
+        srs.complete_task(first.pk)
+        srs.delete_task(second.pk)
+        created = Task.objects.create(title='New', priority=self.priority)
+        data = self._sync(token)
+        self.assertEqual([task['id'] for task in data['tasks']], [first.pk, created.pk])
+        self.assertTrue(data['tasks'][0]['is_completed'])
+        self.assertEqual(data['deleted_tasks'], [second.pk])
+
+        srs.restore_task(first.pk)
+        data = self._sync(data['next_token'])
+        self.assertEqual([task['id'] for task in data['tasks']], [first.pk])
+        self.assertIsNone(data['tasks'][0]['completion_date'])
+
+    def test_bulk_changes_page_without_gaps(self):
+        token = self._sync()['next_token']
+        ids = [task.pk for task in self.tasks]
+        self.assertEqual(srs.bulk_task_action('complete', ids)['updated'], ids)
+        # jedna paczka = ten sam change_seq; strony rozdziela id
+        self.assertEqual(len(set(Task.objects.values_list('change_seq', flat=True))), 1)
+        task_ids, deleted, token = self._drain(token, page_size=2)
+        self.assertEqual((task_ids, deleted), (ids, []))
+        self.assertEqual(self._drain(token), ([], [], token))
+
+    def test_priority_changes_and_tombstones(self):
+        token = self._sync()['next_token']
+        PriorityForm(instance=self.priority, data={'name': 'Urgent', 'weight': 10}).save()
+        data = self._sync(token)
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual(data['priorities'], [{'id': self.priority.pk, 'name': 'Urgent', 'weight': 10}])
+
+        low = Priority.objects.create(name='Low', weight=1)
+        srs.delete_priority(low.pk)
+        data = self._sync(data['next_token'])
+        self.assertEqual((data['priorities'], data['deleted_priorities']), ([], [low.pk]))
+
+    def test_attachment_change_marks_task(self):
+        token = self._sync()['next_token']
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with self.settings(MEDIA_ROOT=media_root):
+            srs.create_attachment(self.tasks[1].pk, SimpleUploadedFile('a.txt', b'abc'), 'a.txt')
+        data = self._sync(token)
+        self.assertEqual([task['id'] for task in data['tasks']], [self.tasks[1].pk])
+        self.assertEqual(len(data['tasks'][0]['attachments']), 1)
+
+    def test_hard_delete_reaches_feed_and_sequence_is_not_reused(self):
+        token = self._sync()['next_token']
+        last = self.tasks[-1]
+        srs.complete_task(last.pk)
+        data = self._sync(token)
+        self.assertEqual([task['id'] for task in data['tasks']], [last.pk])
+        token = data['next_token']
+
+        # Wiersz z najwyższym change_seq usunięty trwale (np. admin) - tombstone z nowym numerem
+        last.refresh_from_db()
+        top = last.change_seq
+        Task.objects.filter(pk=last.pk).delete()
+        created = Task.objects.create(title='New', priority=self.priority)
+        created.refresh_from_db()
+        self.assertGreater(created.change_seq, top + 1)
+
+        task_ids, deleted, token = self._drain(token, page_size=1)
+        self.assertEqual((task_ids, deleted), ([created.pk], [last.pk]))
+        data = self._sync(self._sync()['next_token'])
+        self.assertEqual(data['deleted_tasks'], [])
+        self.assertEqual(self._sync(token)['deleted_tasks'], [])
+        self.assertEqual(self._sync(token, page_size=1)['next_token'], token)
+
+    def test_priority_hard_delete_is_reported(self):
+        token = self._sync()['next_token']
+        low = Priority.objects.create(name='Low', weight=1)
+        low_pk = low.pk
+        low.delete()
+        data = self._sync(token)
+        self.assertEqual((data['priorities'], data['deleted_priorities']), ([], [low_pk]))
+
+    def test_transition_sets_sequence_in_same_update(self):
+        before = Task.objects.aggregate(top=Max('change_seq'))['top']
+        with self.assertNumQueries(1):
+            srs.complete_task(self.tasks[0].pk)
+        self.tasks[0].refresh_from_db()
+        self.assertEqual(self.tasks[0].change_seq, before + 1)
+
+    def test_invalid_token(self):
+        for token in ['garbage', srs._pack_cursor(['changes', 'x', 1, 0]),
+                      srs._pack_cursor(['search', 'q', None, 0])]:
+            with self.subTest(token=token):
+                response = self.client.get(reverse('api_tasks_changes'), {'token': token})
+                self.assertEqual(response.status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api_tasks_changes')).status_code, 403)
+
+
+class TaskRowRenderingTests(TestCase):
+    """Wiersze listy zadań: strategie tasks/rows.py dają ten sam HTML co szablon wiersza."""
+
+    def setUp(self):
+        cache.clear()
+        self.row_cache = caches[settings.TASK_ROW_CACHE]
+        self.row_cache.clear()
+        self.priority = Priority.objects.create(name='<High> & "low"', weight=10)
+        Task.objects.create(title='Zadanie {0} <b>', priority=self.priority)
+        Task.objects.create(title='Done', priority=self.priority, completion_date=timezone.now().date())
+
+    def _rows(self, renderer, completed=False):
+        tasks = list(TaskDAO.get_completed() if completed else TaskDAO.get_uncompleted())
+        return rows.render_rows(tasks, completed, renderer)
+
+    def test_renderers_match_template(self):
+        for language in ('en', 'pl'):
+            for completed in (False, True):
+                with self.subTest(language=language, completed=completed), translation.override(language):
+                    expected = self._rows('template', completed)
+                    self.assertEqual(self._rows('compiled', completed), expected)
+                    self.assertEqual(self._rows('cached', completed), expected)
+                    self.assertEqual(self._rows('cached', completed), expected)
+        html = self._rows('compiled')
+        self.assertIn('Zadanie {0} &lt;b&gt;', html)
+        self.assertIn('&lt;High&gt; &amp; &quot;low&quot;', html)
+
+    def test_cached_rows_follow_task_and_priority_changes(self):
+        self._rows('cached')
+        task = TaskDAO.get_uncompleted().get()
+        key = rows.row_cache_key(task)
+        self.assertIn('Zadanie', self.row_cache.get(key))
+        # trafienie = fragment z cache bez renderowania
+        self.row_cache.set(key, '<tr data-task-id="cached"></tr>')
+        self.assertEqual(self._rows('cached'), '<tr data-task-id="cached"></tr>')
+
+        task.title = 'Renamed'
+        task.save()
+        self.assertIn('Renamed', self._rows('cached'))
+        PriorityForm(instance=self.priority, data={'name': 'Urgent', 'weight': 10}).save()
+        self.assertIn('Urgent', self._rows('cached'))
+        self.assertNotEqual(rows.row_cache_key(TaskDAO.get_uncompleted().get()), key)
+
+    def test_task_list_page_uses_row_renderer(self):
+        user = User.objects.create_user('tester', password='secret')
+        self.client.force_login(user)
+        pages = {}
+        for renderer in rows.RENDERERS:
+            with self.settings(TASK_ROW_RENDERER=renderer):
+                cache.clear()
+                self.row_cache.clear()
+                content = self.client.get(reverse('task_list')).content
+                # tabele (reszta strony zawiera token CSRF, inny w każdej odpowiedzi)
+                pages[renderer] = content[content.index(b'<tbody>'):content.rindex(b'</tbody>')]
+        self.assertEqual(pages['compiled'], pages['template'])
+        self.assertEqual(pages['cached'], pages['template'])
+        self.assertContains(self.client.get(reverse('task_list')), reverse('task_complete', args=[
+            Task.objects.get(completion_date__isnull=True).pk]))
@@ -0,0 +1,98 @@
+"""
+Strumieniowy upload załączników.
+Chunki trafiają od razu do pliku w katalogu storage (bez bufora w pamięci
+i bez kopii przez FILE_UPLOAD_TEMP_DIR), SHA-256 liczony w locie, limit rozmiaru
+sprawdzany zanim odczytamy resztę żądania. Plik staje się blobem
+(rename pod nazwę = SHA-256) dopiero w AttachmentDAO.create.
+"""
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers, StopUpload
+
+from .models import Attachment
+
+
+class StoredUploadedFile(UploadedFile):
+    """Plik już zapisany w storage (plik tymczasowy storage + jego SHA-256)."""
+
+    def __init__(self, storage_name, sha256, name, content_type, size, charset,
+                 content_type_extra=None):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.storage_name = storage_name
+        self.sha256 = sha256
+
+
+class StreamingAttachmentUploadHandler(FileUploadHandler):
+    """
+    Handler uploadu dla Attachment.file. Działa dla storage z plikami
+    tymczasowymi (ContentAddressedStorage) - inaczej oddaje dane kolejnym handlerom.
+    """
+
+    chunk_size = 1024 * 1024  # 1 MB
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.field = Attachment._meta.get_field('file')
+        self.max_size = settings.ATTACHMENT_MAX_UPLOAD_SIZE
+        self.too_large = False
+        self._file = None
+        self._path = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Zbyt duże żądanie odrzucamy przy pierwszym pliku, bez czytania treści
+        if content_length and content_length > self.max_size + self.chunk_size:
+            self.too_large = True
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        if self.too_large:
+            raise StopUpload(connection_reset=True)
+        storage = self.field.storage
+        if not hasattr(storage, 'open_temp'):
+            return
+        self.storage_name, self._file = storage.open_temp()
+        self._path = storage.path(self.storage_name)
+        self._hash = hashlib.sha256()
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._file is None:
+            return raw_data
+        if start + len(raw_data) > self.max_size:
+            self.too_large = True
+            self._discard()
+            raise StopUpload(connection_reset=True)
+        self._hash.update(raw_data)
+        self._file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self._file is None:
+            return None
+        self._file.close()
+        self._file = None
+        self._path = None
+        return StoredUploadedFile(
+            storage_name=self.storage_name,
+            sha256=self._hash.hexdigest(),
+            name=self.file_name,
+            content_type=self.content_type,
+            size=file_size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra,
+        )
+
+    def upload_interrupted(self):
+        self._discard()
+
+    def _discard(self):
+        """Usuń niedokończony plik."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._path and os.path.exists(self._path):
+            os.remove(self._path)
+        self._path = None
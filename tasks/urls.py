@@ -12,8 +12,14 @@ urlpatterns = [
     path('task/<int:pk>/complete/', views.task_complete_confirm, name='task_complete'),
     path('task/<int:pk>/restore/', views.task_restore_confirm, name='task_restore'),  # TAS-4
     
+    # Warianty async (ASGI) - te same dane i szablony
+    path('async/', views.task_list_async, name='task_list_async'),
+    path('async/task/<int:pk>/', views.task_detail_async, name='task_detail_async'),
+    path('events/', views.task_events, name='task_events'),
+    
     # Attachment URLs (TAS-3)
     path('task/<int:task_pk>/attachment/add/', views.attachment_add, name='attachment_add'),
+    path('attachment/<int:pk>/download/', views.attachment_download, name='attachment_download'),
     path('attachment/<int:pk>/delete/', views.attachment_delete, name='attachment_delete'),
     
     # Priority URLs
@@ -22,7 +28,20 @@ urlpatterns = [
     path('priority/<int:pk>/edit/', views.priority_update, name='priority_update'),
     path('priority/<int:pk>/delete/', views.priority_delete_confirm, name='priority_delete'),
     
+    # Metryki instrumentacji (Prometheus)
+    path('metrics/', views.metrics, name='metrics'),
+    
     # REST API URLs (TAS-2)
     path('api/tasks/uncompleted/', api_views.api_tasks_uncompleted, name='api_tasks_uncompleted'),
     path('api/tasks/completed/', api_views.api_tasks_completed, name='api_tasks_completed'),
+    path('async/api/tasks/uncompleted/', api_views.api_tasks_uncompleted_async,
+         name='api_tasks_uncompleted_async'),
+    path('async/api/tasks/completed/', api_views.api_tasks_completed_async,
+         name='api_tasks_completed_async'),
+    path('api/tasks/stats/', api_views.api_tasks_stats, name='api_tasks_stats'),
+    path('api/tasks/search/', api_views.api_tasks_search, name='api_tasks_search'),
+    path('api/tasks/changes/', api_views.api_tasks_changes, name='api_tasks_changes'),
+    path('api/tasks/bulk/<str:action>/', api_views.api_tasks_bulk, name='api_tasks_bulk'),
+    path('api/tasks/export/<str:fmt>/', api_views.api_tasks_export, name='api_tasks_export'),
+    path('api/tasks/import/<str:fmt>/', api_views.api_tasks_import, name='api_tasks_import'),
 ]
@@ -6,20 +6,31 @@ Cała logika jest w services.py, dostęp do bazy w dao.py.
 
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import Http404
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
 from django.utils.translation import gettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_safe
 
 from .models import Task, Priority, Attachment
 from .forms import TaskForm, PriorityForm, AttachmentForm
 from . import services as srs  # TAS-5: używamy warstwy services
+from . import events, instrumentation
+from .conditional import async_task_data_conditional, task_data_conditional
+from .decorators import async_login_required
+from .downloads import serve_attachment
+from .uploads import StreamingAttachmentUploadHandler
 
 
 # ==================== TASK VIEWS ====================
 
 @login_required
+@task_data_conditional
 def task_list(request):
-    """Lista zadań."""
-    return render(request, 'tasks/task_list.html', srs.get_task_list_data())
+    """Lista zadań (z nagłówkiem statystyk)."""
+    context = {**srs.get_task_list_data(), 'stats': srs.get_task_stats()}
+    return render(request, 'tasks/task_list.html', context)
 
 
 @login_required
@@ -38,7 +49,7 @@ def task_create(request):
     if request.method == 'POST':
         form = TaskForm(request.POST)
         if form.is_valid():
-            form.save()
+            srs.save_task_form(form)
             return redirect('task_list')
     else:
         form = TaskForm()
@@ -56,7 +67,7 @@ def task_update(request, pk):
     if request.method == 'POST':
         form = TaskForm(request.POST, instance=context['task'])
         if form.is_valid():
-            form.save()
+            srs.save_task_form(form)
             return redirect('task_list')
     else:
         form = TaskForm(instance=context['task'])
@@ -67,13 +78,12 @@ def task_update(request, pk):
 def task_delete_confirm(request, pk):
     """Potwierdzenie usunięcia zadania."""
     try:
+        if request.method == 'POST':
+            srs.delete_task(pk)
+            return redirect('task_list')
         context = srs.get_task_for_delete(pk)
     except Task.DoesNotExist:
         raise Http404(_("Task not found"))
-    
-    if request.method == 'POST':
-        srs.delete_task(pk)
-        return redirect('task_list')
     return render(request, 'tasks/task_delete_confirm.html', context)
 
 
@@ -81,13 +91,12 @@ def task_delete_confirm(request, pk):
 def task_complete_confirm(request, pk):
     """Potwierdzenie ukończenia zadania."""
     try:
+        if request.method == 'POST':
+            srs.complete_task(pk)
+            return redirect('task_list')
         context = srs.get_task_for_complete(pk)
     except Task.DoesNotExist:
         raise Http404(_("Task not found or already completed"))
-    
-    if request.method == 'POST':
-        srs.complete_task(pk)
-        return redirect('task_list')
     return render(request, 'tasks/task_complete_confirm.html', context)
 
 
@@ -95,21 +104,69 @@ def task_complete_confirm(request, pk):
 def task_restore_confirm(request, pk):
     """Potwierdzenie przywrócenia zadania (TAS-4)."""
     try:
+        if request.method == 'POST':
+            srs.restore_task(pk)
+            return redirect('task_list')
         context = srs.get_task_for_restore(pk)
     except Task.DoesNotExist:
         raise Http404(_("Task not found or not completed"))
-    
-    if request.method == 'POST':
-        srs.restore_task(pk)
-        return redirect('task_list')
     return render(request, 'tasks/task_restore_confirm.html', context)
 
 
+# ==================== TASK VIEWS - ASYNC (ASGI) ====================
+# Natywne widoki async dla listy i szczegółów: dane przez async ORM
+# (services.aget_*), bez przejścia przez wątek dla całego widoku.
+# Szablony te same co w wersji sync.
+
+@async_login_required
+@async_task_data_conditional
+async def task_list_async(request):
+    """Lista zadań - wariant async task_list."""
+    context = {**await srs.aget_task_list_data(), 'stats': await srs.aget_task_stats()}
+    return render(request, 'tasks/task_list.html', context)
+
+
+@async_login_required
+async def task_detail_async(request, pk):
+    """Szczegóły zadania - wariant async task_detail."""
+    try:
+        context = await srs.aget_task_detail_data(pk)
+    except Task.DoesNotExist:
+        raise Http404(_("Task not found"))
+    return render(request, 'tasks/task_detail.html', context)
+
+
+@async_login_required
+async def task_events(request):
+    """
+    Zmiany tasków na żywo (Server-Sent Events) dla listy zadań.
+    Strumień bez końca wymaga ASGI - pod WSGI 204 (EventSource nie łączy się ponownie).
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    last_event_id = events.parse_last_event_id(request.headers.get('Last-Event-ID'))
+    response = StreamingHttpResponse(events.stream(last_event_id), content_type='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # nginx: bez buforowania odpowiedzi, zdarzenia od razu do klienta
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
 # ==================== ATTACHMENT VIEWS (TAS-3) ====================
 
 @login_required
+@csrf_exempt
 def attachment_add(request, task_pk):
-    """Dodawanie załącznika."""
+    """Dodawanie załącznika (upload strumieniowy prosto do storage)."""
+    # Handler musi być ustawiony przed odczytem request.POST/FILES,
+    # dlatego CSRF sprawdzany dopiero w _attachment_add (csrf_protect)
+    upload_handler = StreamingAttachmentUploadHandler(request)
+    request.upload_handlers.insert(0, upload_handler)
+    return _attachment_add(request, task_pk, upload_handler)
+
+
+@csrf_protect
+def _attachment_add(request, task_pk, upload_handler):
     try:
         context = srs.get_attachment_form_data(task_pk)
     except Task.DoesNotExist:
@@ -117,7 +174,9 @@ def attachment_add(request, task_pk):
     
     if request.method == 'POST':
         form = AttachmentForm(request.POST, request.FILES)
-        if form.is_valid():
+        if upload_handler.too_large:
+            form.add_error('file', _('File is too large.'))
+        elif form.is_valid():
             srs.create_attachment(task_pk, request.FILES['file'], request.FILES['file'].name)
             return redirect('task_detail', pk=task_pk)
     else:
@@ -127,17 +186,27 @@ def attachment_add(request, task_pk):
     return render(request, 'tasks/attachment_form.html', context)
 
 
+@login_required
+@require_safe
+def attachment_download(request, pk):
+    """Pobieranie pliku załącznika (Range, ETag, X-Sendfile/X-Accel-Redirect)."""
+    try:
+        context = srs.get_attachment_for_download(pk)
+    except Attachment.DoesNotExist:
+        raise Http404(_("Attachment not found"))
+    return serve_attachment(request, context['attachment'])
+
+
 @login_required
 def attachment_delete(request, pk):
     """Usuwanie załącznika."""
     try:
+        if request.method == 'POST':
+            task_pk = srs.delete_attachment(pk)
+            return redirect('task_detail', pk=task_pk)
         context = srs.get_attachment_for_delete(pk)
     except Attachment.DoesNotExist:
         raise Http404(_("Attachment not found"))
-    
-    if request.method == 'POST':
-        task_pk = srs.delete_attachment(pk)
-        return redirect('task_detail', pk=task_pk)
     return render(request, 'tasks/attachment_delete_confirm.html', context)
 
 
@@ -155,7 +224,7 @@ def priority_create(request):
     if request.method == 'POST':
         form = PriorityForm(request.POST)
         if form.is_valid():
-            form.save()
+            srs.save_priority_form(form)
             return redirect('priority_list')
     else:
         form = PriorityForm()
@@ -173,7 +242,7 @@ def priority_update(request, pk):
     if request.method == 'POST':
         form = PriorityForm(request.POST, instance=context['priority'])
         if form.is_valid():
-            form.save()
+            srs.save_priority_form(form)
             return redirect('priority_list')
     else:
         form = PriorityForm(instance=context['priority'])
@@ -184,11 +253,25 @@ def priority_update(request, pk):
 def priority_delete_confirm(request, pk):
     """Potwierdzenie usunięcia priorytetu."""
     try:
+        if request.method == 'POST':
+            srs.delete_priority(pk)
+            return redirect('priority_list')
         context = srs.get_priority_for_delete(pk)
     except Priority.DoesNotExist:
         raise Http404(_("Priority not found"))
-    
-    if request.method == 'POST':
-        srs.delete_priority(pk)
-        return redirect('priority_list')
     return render(request, 'tasks/priority_delete_confirm.html', context)
+
+
+# ==================== METRICS ====================
+
+@require_safe
+def metrics(request):
+    """Metryki instrumentacji (format Prometheus) - tylko gdy TASK_INSTRUMENTATION."""
+    if not settings.TASK_INSTRUMENTATION:
+        raise Http404
+    if not instrumentation.is_metrics_request_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        instrumentation.registry.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )